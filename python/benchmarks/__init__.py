@@ -0,0 +1,7 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmarks, run from the python directory as modules, e.g. python -m
+benchmarks.reader, or python -m benchmarks.run for the suite of workloads
+"""
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+The per-call cost of reading a form from a string, as read-string does: with
+the pyparsing grammar built afresh on each call (as it used to be), with the
+shared grammar, and with the hand-written reader.
+
+    python -m benchmarks.reader [calls]
+"""
+
+import sys
+import timeit
+
+from yalix import parser, reader
+
+MESSAGES = [
+    '42',
+    '"a status message"',
+    '(order 1234 "widgets" 3 19.99 #t)',
+    "(event (id 99) (tags 'urgent 'billing) (payload (a 1) (b 2) (c (3 4 5))))"
+]
+
+METHODS = [
+    ('pyparsing, grammar per call', lambda text: parser.scheme_parser().parseString(text, parseAll=True).asList()[0]),
+    ('pyparsing, shared grammar', lambda text: parser.read(text)[0]),
+    ('reader', reader.read_form)
+]
+
+
+def per_call(method, text, calls):
+    """ The mean time taken by a call, in microseconds """
+    return min(timeit.repeat(lambda: method(text), number=calls, repeat=3)) / calls * 1e6
+
+
+def main(calls=200):
+    print('{0:30s}'.format('Message') + ''.join('{0:>30s}'.format(name) for name, _ in METHODS))
+    for text in MESSAGES:
+        label = text if len(text) <= 27 else text[:24] + '...'
+        timings = [per_call(method, text, calls if name == 'reader' else max(1, calls // 20))
+                   for name, method in METHODS]
+        print('{0:30s}'.format(label) + ''.join('{0:>27.1f} µs'.format(t) for t in timings))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Times the workloads (see benchmarks.workloads) under each engine, reporting
+operations per second and the peak memory allocated by an operation, as
+traced by tracemalloc. The results can be saved as a JSON baseline, and later
+runs compared against it: a workload slower, or allocating more, than the
+baseline by more than the tolerance is a regression, and the run exits with
+status 1.
+
+    python -m benchmarks.run --save baseline.json
+    python -m benchmarks.run --baseline baseline.json --engine vm fib tak
+"""
+
+import argparse
+import json
+import sys
+import timeit
+import tracemalloc
+
+from yalix import utils
+from yalix.globals import create_initial_env, __engines__
+
+from .workloads import WORKLOADS
+
+
+def ops_per_sec(operation, repeat=3):
+    """ The best of the repeated timings, each of enough operations to take 0.2s or more """
+    timer = timeit.Timer(operation)
+    number, _ = timer.autorange()
+    return number / min(timer.repeat(repeat=repeat, number=number))
+
+
+def peak_kib(operation):
+    """ The peak memory traced while the operation runs once, in KiB """
+    tracemalloc.start()
+    try:
+        operation()
+        return tracemalloc.get_traced_memory()[1] / 1024.0
+    finally:
+        tracemalloc.stop()
+
+
+def measure(engines, names, repeat=3, out=None):
+    """ The results of each workload under each engine, as {engine: {workload: {measure: value}}} """
+    out = out or sys.stdout
+    results = dict()
+    for engine in engines:
+        with utils.capture():
+            env = create_initial_env(engine=engine)
+        results[engine] = dict()
+        for name in names:
+            operation = WORKLOADS[name].prepare(engine, env)
+            results[engine][name] = {'ops_per_sec': ops_per_sec(operation, repeat), 'peak_kib': peak_kib(operation)}
+            out.write('{0:12s} {1:14s} {2[ops_per_sec]:12.2f} ops/s {2[peak_kib]:12.1f} KiB\n'.format(
+                engine, name, results[engine][name]))
+    return results
+
+
+def compare(results, baseline, tolerance=0.1, out=None):
+    """
+    Writes the change in each measure from the baseline, returning the
+    regressions: the (engine, workload, measure) beyond the tolerance
+    """
+    out = out or sys.stdout
+    regressions = []
+    for engine, workloads in sorted(results.items()):
+        for name, measures in sorted(workloads.items()):
+            before = baseline.get(engine, {}).get(name)
+            if before is None:
+                continue
+            speed = measures['ops_per_sec'] / before['ops_per_sec'] - 1
+            memory = measures['peak_kib'] / before['peak_kib'] - 1 if before['peak_kib'] else 0.0
+            flags = []
+            if speed < -tolerance:
+                regressions.append((engine, name, 'ops_per_sec'))
+                flags.append('slower')
+            if memory > tolerance:
+                regressions.append((engine, name, 'peak_kib'))
+                flags.append('more memory')
+            line = '{0:12s} {1:14s} {2:+10.1%} ops/s {3:+10.1%} KiB  {4}'.format(
+                engine, name, speed, memory, ', '.join(flags))
+            out.write(line.rstrip() + '\n')
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.run', description=__doc__.strip().split('\n\n')[0])
+    parser.add_argument('workloads', nargs='*', metavar='workload',
+                        help='the workloads to run (default: all): ' + ', '.join(WORKLOADS))
+    parser.add_argument('--engine', action='append', choices=list(__engines__),
+                        help='an engine to run them under (default: all)')
+    parser.add_argument('--repeat', type=int, default=3, help='timings to take the best of (default: 3)')
+    parser.add_argument('--save', metavar='FILE', help='save the results as a JSON baseline')
+    parser.add_argument('--baseline', metavar='FILE', help='compare the results against a JSON baseline')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='the fractional change counted as a regression (default: 0.1)')
+    args = parser.parse_args(argv)
+    for name in args.workloads:
+        if name not in WORKLOADS:
+            parser.error('unknown workload: ' + name)
+
+    results = measure(args.engine or list(__engines__), args.workloads or list(WORKLOADS), args.repeat)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        print()
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print('{0} regression(s) beyond {1:.0%}'.format(len(regressions), args.tolerance))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+The workloads timed by benchmarks.run: classic interpreter benchmarks written
+in yalix, each a setup program (evaluated once) and an expression (evaluated
+on every operation) with its expected value, plus the startup time of a
+bootstrapped environment.
+"""
+
+import collections
+
+from yalix import utils
+from yalix.globals import create_initial_env, __engines__
+from yalix.reader import read, read_form
+
+
+class Workload(object):
+    """ An expression, timed once the setup program has been evaluated """
+
+    def __init__(self, name, expression, expected, setup=''):
+        self.name = name
+        self.expression = expression
+        self.expected = expected
+        self.setup = setup
+
+    def prepare(self, engine, env):
+        """
+        A function of no arguments which evaluates the expression once, the
+        setup having been evaluated in the environment. Raises an
+        AssertionError if the expression evaluates to anything unexpected
+        """
+        evaluate = __engines__[engine]
+        for form in read(self.setup):
+            evaluate(form)(env)
+
+        code = evaluate(read_form(self.expression))
+        value = code(env)
+        if value != self.expected:
+            raise AssertionError('{0}: expected {1}, got {2}'.format(self.name, self.expected, value))
+        return lambda: code(env)
+
+
+class Startup(Workload):
+    """ Bootstraps an environment, with the core libraries read from their cache """
+
+    def __init__(self, name):
+        Workload.__init__(self, name, None, None)
+
+    def prepare(self, engine, env):
+        def bootstrap():
+            with utils.capture():
+                return create_initial_env(engine=engine)
+        return bootstrap
+
+
+WORKLOADS = collections.OrderedDict((workload.name, workload) for workload in [
+    Workload('fib', '(fib 16)', 987, """
+        (define (fib n)
+          (if (< n 2)
+            n
+            (+ (fib (- n 1)) (fib (- n 2)))))"""),
+
+    Workload('tak', '(tak 12 8 4)', 5, """
+        (define (tak x y z)
+          (if (not (< y x))
+            z
+            (tak (tak (- x 1) y z)
+                 (tak (- y 1) z x)
+                 (tak (- z 1) x y))))"""),
+
+    Workload('ackermann', '(ack 3 3)', 61, """
+        (define (ack m n)
+          (if (= m 0)
+            (+ n 1)
+            (if (= n 0)
+              (ack (- m 1) 1)
+              (ack (- m 1) (ack m (- n 1))))))"""),
+
+    Workload('nqueens', '(queens 6)', 4, """
+        (define (queens-safe? row dist placed)
+          (if (nil? placed)
+            #t
+            (let* ((q (car placed)))
+              (if (= q row)
+                #f
+                (if (= q (+ row dist))
+                  #f
+                  (if (= q (- row dist))
+                    #f
+                    (queens-safe? row (+ dist 1) (cdr placed))))))))
+
+        (define (queens-count n k placed)
+          (if (= k n)
+            1
+            (queens-place n k placed 0)))
+
+        (define (queens-place n k placed row)
+          (if (= row n)
+            0
+            (+ (if (queens-safe? row 1 placed)
+                 (queens-count n (+ k 1) (cons row placed))
+                 0)
+               (queens-place n k placed (+ row 1)))))
+
+        (define (queens n)
+          (queens-count n 0 nil))"""),
+
+    Workload('lazy-pipeline', '(fold + 0 (filter even? (map inc (range 1000))))', 250500),
+
+    Workload('reverse', '(car (reverse (take 2000 (iterate inc 0))))', 1999),
+
+    Workload('read-string', '(read-many 100 0)', 100, """
+        (define (read-many n count)
+          (if (= n 0)
+            count
+            (read-many (- n 1)
+                       (if (nil? (read-string "(order 1234 widgets (3 19.99) #t (tags urgent billing))"))
+                         count
+                         (+ count 1)))))"""),
+
+    Startup('startup')
+])
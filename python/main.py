@@ -3,8 +3,12 @@
 
 import sys
 from yalix.repl import repl
+from yalix.batch import main
 
 
 if __name__ == '__main__':
+    # With any arguments, programs are evaluated without the REPL
+    if len(sys.argv) > 1:
+        sys.exit(main(sys.argv[1:]))
     repl()
     sys.exit()
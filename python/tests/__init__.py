@@ -0,0 +1,14 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import atexit
+import os
+import shutil
+import tempfile
+from yalix.cache import CACHE_DIR_VARIABLE
+
+# The core libraries bootstrapped by the tests are cached in a temporary
+# directory, rather than in the user's cache directory
+_cache_dir = tempfile.mkdtemp(prefix='yalix-cache-')
+os.environ[CACHE_DIR_VARIABLE] = _cache_dir
+atexit.register(shutil.rmtree, _cache_dir, True)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import unittest
+import yalix.utils as utils
+from yalix.batch import run, main, EVALUATION_ERROR, READ_ERROR
+
+
+class BatchTests(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def program(self, name, text):
+        path = os.path.join(self.dir, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return path
+
+    def run_files(self, *files, **kwargs):
+        err = io.StringIO()
+        with utils.capture() as out:
+            status = run(files, err=err, **kwargs)
+        return status, out[0], err.getvalue()
+
+    def test_files_share_environment(self):
+        first = self.program('first.ylx', '(define (sq x) (* x x))\n')
+        second = self.program('second.ylx', '(print (sq 7))\n')
+        status, out, err = self.run_files(first, second)
+        self.assertEqual(0, status)
+        self.assertEqual('49\n', out)
+        self.assertEqual('', err)
+
+    def test_quiet_bootstrap(self):
+        status, out, _ = self.run_files(engine='compiler')
+        self.assertEqual(0, status)
+        self.assertFalse('Loading library' in out)
+
+    def test_echo(self):
+        program = self.program('echo.ylx', '(+ 1 2) (map inc (range 3))')
+        results = []
+        status, _, _ = self.run_files(program, engine='vm', echo=results.append)
+        self.assertEqual(0, status)
+        self.assertEqual(['3', '(1 2 3)'], results)
+
+    def test_evaluation_error(self):
+        program = self.program('fails.ylx', '(print 1)\n(error "failed")\n(print 2)\n')
+        status, out, err = self.run_files(program)
+        self.assertEqual(EVALUATION_ERROR, status)
+        self.assertEqual('1\n', out)
+        self.assertTrue('fails.ylx: EvaluationError: failed' in err)
+
+    def test_read_errors(self):
+        program = self.program('unbalanced.ylx', '(print 1')
+        self.assertEqual(READ_ERROR, self.run_files(program)[0])
+        self.assertEqual(READ_ERROR, self.run_files(os.path.join(self.dir, 'missing.ylx'))[0])
+
+    def test_snapshot_errors(self):
+        garbage = self.program('garbage.snapshot', 'not a snapshot')
+        empty = self.program('empty.snapshot', '')
+        old = os.path.join(self.dir, 'old.snapshot')
+        with open(old, 'wb') as f:
+            pickle.dump((0, 0, None), f)
+
+        for snapshot in [os.path.join(self.dir, 'missing.snapshot'), garbage, empty, old]:
+            status, _, err = self.run_files(snapshot=snapshot)
+            self.assertEqual(READ_ERROR, status)
+            self.assertTrue(err.startswith(snapshot + ': '))
+            self.assertEqual(1, err.count('\n'))
+
+    def test_stdin(self):
+        stdin = sys.stdin
+        sys.stdin = io.StringIO('(print (fold + 0 (range 5)))')
+        try:
+            with utils.capture() as out:
+                status = main(['--no-cache', '-'])
+        finally:
+            sys.stdin = stdin
+        self.assertEqual(0, status)
+        self.assertEqual('10\n', out[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
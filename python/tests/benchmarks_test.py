@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+import unittest
+from benchmarks.run import compare
+from benchmarks.workloads import WORKLOADS, Workload
+from yalix.interpreter import Closure
+from tests.support import ENV
+
+
+class WorkloadTests(unittest.TestCase):
+
+    def test_expected_values(self):
+        # Each prepare evaluates the workload once, checking its value
+        env = ENV.overlay()
+        for name, workload in WORKLOADS.items():
+            if name != 'startup':
+                self.assertTrue(callable(workload.prepare('interpreter', env)))
+        self.assertIsInstance(env['fib'], Closure)
+
+    def test_unexpected_value(self):
+        with self.assertRaises(AssertionError):
+            Workload('wrong', '(+ 1 1)', 3).prepare('interpreter', ENV.overlay())
+
+    def test_compare(self):
+        baseline = {'vm': {'fib': {'ops_per_sec': 100.0, 'peak_kib': 10.0},
+                           'tak': {'ops_per_sec': 100.0, 'peak_kib': 10.0}}}
+        results = {'vm': {'fib': {'ops_per_sec': 95.0, 'peak_kib': 10.5},
+                          'tak': {'ops_per_sec': 80.0, 'peak_kib': 12.0},
+                          'nqueens': {'ops_per_sec': 1.0, 'peak_kib': 1.0}}}
+        out = io.StringIO()
+        regressions = compare(results, baseline, tolerance=0.1, out=out)
+        self.assertEqual([('vm', 'tak', 'ops_per_sec'), ('vm', 'tak', 'peak_kib')], regressions)
+        self.assertTrue('-20.0% ops/s' in out.getvalue())
+        self.assertFalse('nqueens' in out.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
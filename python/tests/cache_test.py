@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from yalix.cache import cache_dir, cache_path, read_cached, CACHE_DIR_VARIABLE
+from yalix.environment import Env
+from yalix.globals import bootstrap_lisp_functions, bootstrap_python_functions, bootstrap_special_forms, \
+    interpret
+from yalix.interpreter import Symbol
+from yalix.reader import read_form, read_stream
+
+
+class CountingReader(object):
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, stream):
+        self.calls += 1
+        return read_stream(stream)
+
+
+class CacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'lib.ylx')
+        self.write('(define x 1)\n(define (f y) (+ x y))\n')
+        self.environ = mock.patch.dict(os.environ, {CACHE_DIR_VARIABLE: os.path.join(self.dir, 'cache')})
+        self.environ.start()
+
+    def tearDown(self):
+        self.environ.stop()
+        shutil.rmtree(self.dir)
+
+    def write(self, text, mtime=None):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        if mtime is not None:
+            os.utime(self.path, ns=(mtime, mtime))
+
+    def test_cache_path(self):
+        path = cache_path(self.path)
+        self.assertEqual(os.path.join(self.dir, 'cache'), os.path.dirname(path))
+        self.assertTrue(path.endswith('-lib.ylxc'))
+        self.assertNotEqual(path, cache_path(os.path.join(self.dir, 'other', 'lib.ylx')))
+
+    def test_user_cache_dir(self):
+        # Never alongside the sources, unless YALIX_CACHE_DIR says so
+        with mock.patch.dict(os.environ, {CACHE_DIR_VARIABLE: '', 'XDG_CACHE_HOME': self.dir}):
+            self.assertEqual(os.path.join(self.dir, 'yalix'), cache_dir())
+        with mock.patch.dict(os.environ, {CACHE_DIR_VARIABLE: '', 'XDG_CACHE_HOME': '', 'HOME': self.dir}):
+            self.assertEqual(os.path.join(self.dir, '.cache', 'yalix'), cache_dir())
+
+    def test_fresh_cache_is_not_read_again(self):
+        read = CountingReader()
+        first = read_cached(self.path, 'reader', read)
+        second = read_cached(self.path, 'reader', read)
+        self.assertEqual(1, read.calls)
+        self.assertTrue(os.path.exists(cache_path(self.path)))
+        self.assertFalse(os.path.exists(self.path + 'c'))
+        self.assertEqual([Symbol('define'), Symbol('f')], [second[1][0], second[1][1][0]])
+        self.assertEqual(first[1].__source__, second[1].__source__)
+        self.assertEqual(1, second[1].__source__.line_offset)
+
+    def test_changed_source_is_read_again(self):
+        read = CountingReader()
+        read_cached(self.path, 'reader', read)
+        self.write('(define x 2)\n')
+        forms = read_cached(self.path, 'reader', read)
+        self.assertEqual(2, read.calls)
+        self.assertEqual(1, len(forms))
+
+    def test_same_mtime_different_content(self):
+        read = CountingReader()
+        self.write('(define x 1)\n', mtime=10 ** 18)
+        read_cached(self.path, 'reader', read)
+        self.write('(define x 3)\n', mtime=10 ** 18)
+        self.assertEqual(3, read_cached(self.path, 'reader', read)[0][2].value)
+        self.assertEqual(2, read.calls)
+
+    def test_keyed_by_reader(self):
+        read = CountingReader()
+        read_cached(self.path, 'reader', read)
+        read_cached(self.path, 'pyparsing', read)
+        self.assertEqual(2, read.calls)
+
+    def test_corrupt_cache_is_rewritten(self):
+        os.makedirs(os.path.dirname(cache_path(self.path)))
+        with open(cache_path(self.path), 'wb') as f:
+            f.write(b'not a pickle')
+        read = CountingReader()
+        self.assertEqual(2, len(read_cached(self.path, 'reader', read)))
+        self.assertEqual(2, len(read_cached(self.path, 'reader', read)))
+        self.assertEqual(1, read.calls)
+
+    def test_unwritable_cache_location(self):
+        with mock.patch.dict(os.environ, {CACHE_DIR_VARIABLE: os.path.join(self.path, 'not-a-dir')}):
+            read = CountingReader()
+            self.assertEqual(2, len(read_cached(self.path, 'reader', read)))
+            self.assertEqual(2, len(read_cached(self.path, 'reader', read)))
+            self.assertEqual(2, read.calls)
+
+    def test_bootstrap_from_cache(self):
+        for _ in range(2):
+            env = Env()
+            bootstrap_special_forms(env)
+            bootstrap_python_functions(env)
+            bootstrap_lisp_functions(env, self.path)
+            self.assertEqual(3, interpret(read_form('(f 2)'))(env))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,6 +3,7 @@
 
 import unittest
 from yalix.completer import Completer
+from yalix.environment import Env
 
 
 class CompleterTests(unittest.TestCase):
@@ -45,6 +46,14 @@ class CompleterTests(unittest.TestCase):
         m = self.collect(c, 'tom')
         self.assertEqual([], m)
 
+    def test_complete_overlay(self):
+        core = Env()
+        core['apple'] = 'APPLE'
+        session = core.overlay()
+        session['apricot'] = 'APRICOT'
+        self.assertEqual(['apple', 'apricot'], self.collect(Completer(session), 'ap'))
+        self.assertEqual(['apple'], self.collect(Completer(core), 'ap'))
+
 
 if __name__ == '__main__':
     unittest.main()
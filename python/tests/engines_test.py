@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pickle
+import sys
+import unittest
+import yalix.compiler as compiler
+import yalix.vm as vm
+from yalix.exceptions import EvaluationError
+from yalix.globals import interpret
+from yalix.interpreter import Closure, Repr
+from yalix.parser import scheme_parser
+from tests.support import bootstrap
+
+
+def parse(text):
+    return scheme_parser().parseString(text, parseAll=True).asList()[0]
+
+
+class EngineParity(object):
+    """
+    The behaviour each compiling engine must share with the interpreter,
+    run against an environment bootstrapped with that engine
+    """
+
+    engine = None
+    compile = None
+    closure = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.env = bootstrap(cls.engine)
+
+    def evaluate(self, text):
+        return self.compile(parse(text))(self.env)
+
+    def test_core_libraries_compiled(self):
+        self.assertIsInstance(self.env['map'], self.closure)
+        self.assertIsInstance(self.env['fold'], self.closure)
+
+    def test_same_results_as_interpreter(self):
+        for text in [
+                '(+ 1 2 3 4)',
+                '(- 10 1 2)',
+                '(factorial 10)',
+                '(list 1 (list 2 3) "a")',
+                '(reverse (range 5))',
+                '(nth (range 10) 3)',
+                '(filter even? (range 10))',
+                '(map inc (range 5))',
+                '((λ (a b . c) (list a b c)) 1 2 3 4)',
+                '((λ (. c) c))',
+                '(let* ((a 1) (b (+ a 1)) (a (* a b 10))) (list a b))',
+                '(letrec ((f (λ (n) (if (zero? n) 0 (+ n (f (dec n))))))) (f 10))',
+                '(let (x 3) (second `(x ~x)))',
+                '(list (let (x 1) x) (let* ((a 2) (b a)) b))',
+                '(begin 1 2 3)',
+                '(if #f 1)',
+                '(if (if #t #f #t) 1 2)']:
+            expected = Repr(interpret(parse(text))(self.env)).eval(self.env)
+            self.assertEqual(expected, Repr(self.evaluate(text)).eval(self.env), text)
+
+    def test_define(self):
+        symbol = self.evaluate('(define (square x) ;^ Squares x\n (* x x))')
+        self.assertEqual('square', symbol.name)
+        self.assertEqual(49, self.evaluate('(square 7)'))
+        self.assertEqual('square (x)\n  Squares x', self.env['square'].__docstring__)
+        self.assertEqual(9, self.env['square'].__location__)
+
+    def test_closures_share_frames(self):
+        self.evaluate('(define (make-counter n) (λ () (set! n (inc n)) n))')
+        self.assertEqual(3, self.evaluate('(let (c (make-counter 0)) (c) (c) (c))'))
+
+    def test_special_form_applied_by_name(self):
+        self.assertEqual(3, self.evaluate('(if #t (let (x 3) x))'))
+        self.assertEqual(2, self.evaluate('(second (list 1 (if #f 1 2)))'))
+
+    def test_calls_interpreted_closures(self):
+        interpret(parse('(define (interpreted-twice f x) (f (f x)))'))(self.env)
+        self.assertIsInstance(self.env['interpreted-twice'], Closure)
+        self.assertNotIsInstance(self.env['interpreted-twice'], self.closure)
+        self.assertEqual(16, self.evaluate('(interpreted-twice (λ (x) (* x x)) 2)'))
+        self.assertEqual(16, interpret(parse('(interpreted-twice (λ (x) (* x x)) 2)'))(self.env))
+
+    def test_tail_recursion(self):
+        depth = sys.getrecursionlimit() * 2
+        self.evaluate('(define (count-up n acc) (if (zero? n) acc (count-up (dec n) (inc acc))))')
+        self.assertEqual(depth, self.evaluate('(count-up {0} 0)'.format(depth)))
+
+    def test_arity_errors(self):
+        with self.assertRaises(EvaluationError) as cm:
+            self.evaluate('(inc 1 2)')
+        self.assertEqual(
+            'Call to \'inc\' applied with insufficient arity: 1 args expected, 2 supplied', cm.exception.message)
+
+        with self.assertRaises(EvaluationError) as cm:
+            self.evaluate('((λ (a b . c) a) 1)')
+        self.assertTrue('insufficient arity: 2 args expected, 1 supplied' in cm.exception.message)
+
+    def test_invalid_formals_reported_when_evaluated(self):
+        proc = self.compile(parse('(λ (x y x) x)'))
+        with self.assertRaises(EvaluationError) as cm:
+            proc(self.env)
+        self.assertEqual('Formals are not distinct: (x y x)', cm.exception.message)
+
+    def test_unbound_symbol(self):
+        with self.assertRaises(EvaluationError) as cm:
+            self.evaluate('(inc froobe)')
+        self.assertEqual('\'froobe\' is unbound in environment', cm.exception.message)
+
+    def test_cannot_invoke(self):
+        with self.assertRaises(EvaluationError) as cm:
+            self.evaluate('(5 3)')
+        self.assertEqual('Cannot invoke with: \'5\'', cm.exception.message)
+
+    def test_redefinition(self):
+        self.evaluate('(define (redef-f) 1)')
+        self.evaluate('(define (redef-g) (redef-f))')
+        self.assertEqual(1, self.evaluate('(redef-g)'))
+        self.evaluate('(define (redef-f) 2)')
+        self.assertEqual(2, self.evaluate('(redef-g)'))
+
+
+class CompilerTests(EngineParity, unittest.TestCase):
+
+    engine = 'compiler'
+    compile = staticmethod(compiler.compile)
+    closure = compiler.CompiledClosure
+
+
+class VMTests(EngineParity, unittest.TestCase):
+
+    engine = 'vm'
+    compile = staticmethod(vm.compile)
+    closure = vm.VMClosure
+
+    def test_deep_recursion_uses_flat_stack(self):
+        depth = sys.getrecursionlimit() * 2
+        self.evaluate('(define (sum-to n) (if (zero? n) 0 (+ n (sum-to (dec n)))))')
+        self.assertEqual(depth * (depth + 1) // 2, self.evaluate('(sum-to {0})'.format(depth)))
+
+    def test_compiled_form_is_serializable(self):
+        code = pickle.loads(pickle.dumps(vm.compile(parse('(λ (x) (if (zero? x) "zero" (* x 2)))'))))
+        self.assertIsInstance(code, vm.Bytecode)
+        self.env['double-or-zero'] = code(self.env)
+        self.assertEqual('zero', self.evaluate('(double-or-zero 0)'))
+        self.assertEqual(8, self.evaluate('(double-or-zero 4)'))
+
+    def test_disassemble(self):
+        listing = vm.disassemble(vm.compile(parse('(if x 1 2)')))
+        self.assertEqual(['GLOBAL', 'JUMP_IF_FALSE', 'CONST', 'RETURN', 'CONST', 'RETURN'],
+                         [line.split()[1] for line in listing.split('\n')])
+
+
+if __name__ == '__main__':
+    unittest.main()
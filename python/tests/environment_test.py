@@ -82,6 +82,24 @@ class LocalStackTests(unittest.TestCase):
         # Check local stack does not have excessive content
         self.assertEqual(3, len(env.local_stack))
 
+    def test_extend_shares_enclosing_frames(self):
+        env = Env().extend('a', 3).extend('b', 17)
+        sibling_a = env.extend('c', 6)
+        sibling_b = env.extend('c', 12)
+
+        self.assertIs(env.frame, sibling_a.frame.parent)
+        self.assertIs(env.frame, sibling_b.frame.parent)
+        self.assertIs(env.global_frame, sibling_a.global_frame)
+        self.assertEqual(6, sibling_a['c'])
+        self.assertEqual(12, sibling_b['c'])
+        self.assertEqual([('a', 3), ('b', 17), ('c', 6)], sibling_a.local_stack)
+
+    def test_global_frame_shared_when_empty(self):
+        env = Env()
+        extended_env = env.extend('x', 2)
+        env['a'] = 1
+        self.assertEqual(1, extended_env['a'])
+
     def test_non_existent_set_local(self):
         env = Env()
         with self.assertRaises(ValueError):
@@ -116,6 +134,46 @@ class LocalStackTests(unittest.TestCase):
         self.assertTrue('a' in extended_env)
 
 
+class FrameTests(unittest.TestCase):
+
+    def test_extend_frame(self):
+        env = Env()
+        env['a'] = 1
+        new_env = env.extend_frame(('x', 'y'), [2, 3])
+
+        self.assertEqual(1, new_env['a'])
+        self.assertEqual(2, new_env['x'])
+        self.assertEqual(3, new_env['y'])
+        self.assertFalse('x' in env)
+
+    def test_extend_frame_no_names(self):
+        env = Env().extend_frame(('x',), [2])
+        new_env = env.extend_frame((), [])
+        self.assertIsNot(env, new_env)
+        self.assertIs(env.frame, new_env.frame)
+
+    def test_lookup(self):
+        env = Env().extend_frame(('x', 'y'), [2, 3]).extend_frame(('x',), [4])
+        self.assertEqual(4, env.lookup('x', 0, 0))
+        self.assertEqual(2, env.lookup('x', 1, 0))
+        self.assertEqual(3, env.lookup('y', 1, 1))
+
+    def test_lookup_by_name_when_address_mismatched(self):
+        env = Env().extend_frame(('x', 'y'), [2, 3])
+        self.assertEqual(3, env.lookup('y', 0, 0))
+        self.assertEqual(3, env.lookup('y', 5, 0))
+        with self.assertRaises(ValueError):
+            env.lookup('z', 0, 0)
+
+    def test_set_local_visible_through_shared_frame(self):
+        env = Env().extend_frame(('x',), [2])
+        sibling_a = env.extend_frame(('y',), [3])
+        sibling_b = env.extend_frame(('z',), [4])
+        sibling_a.set_local('x', 10)
+        self.assertEqual(10, sibling_b['x'])
+        self.assertEqual(10, sibling_b.lookup('x', 1, 0))
+
+
 class CounterTests(unittest.TestCase):
     def test_counter_increments(self):
         env = Env()
@@ -133,5 +191,40 @@ class CounterTests(unittest.TestCase):
         self.assertEqual(last_counter, start_counter + 2)
 
 
+class OverlayTests(unittest.TestCase):
+    def test_overlay_sees_shared_definitions(self):
+        core = Env()
+        core['inc'] = 'INC'
+        session = core.overlay()
+        self.assertEqual('INC', session['inc'])
+        self.assertTrue('inc' in session)
+        self.assertEqual('INC', session.extend('x', 1)['inc'])
+
+    def test_overlay_definitions_are_private(self):
+        core = Env()
+        core['inc'] = 'INC'
+        session1 = core.overlay()
+        session2 = core.overlay()
+        session1['x'] = 1
+        session1['inc'] = 'SHADOWED'
+        self.assertEqual('SHADOWED', session1['inc'])
+        self.assertEqual('INC', session2['inc'])
+        self.assertEqual('INC', core['inc'])
+        self.assertFalse('x' in session2)
+        self.assertFalse('x' in core)
+        with self.assertRaises(ValueError):
+            session2['x']
+
+    def test_overlay_items_are_merged(self):
+        core = Env()
+        core['inc'] = 'INC'
+        core['dec'] = 'DEC'
+        session = core.overlay().overlay()
+        session['inc'] = 'SHADOWED'
+        session['x'] = 1
+        self.assertEqual({'inc': 'SHADOWED', 'dec': 'DEC', 'x': 1}, dict(session.items()))
+        self.assertEqual({'inc': 'INC', 'dec': 'DEC'}, dict(core.items()))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,9 +1,14 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import operator
+import os
+import tempfile
 import unittest
+from yalix.environment import Env
 from yalix.exceptions import EvaluationError
-from yalix.interpreter import Symbol, List
+from yalix.interpreter import Atom, Closure, Cons, Lambda, NativeProcedure, Promise, Symbol, List
+from yalix.reader import read_form
 import yalix.utils as utils
 import yalix.globals as glob
 
@@ -58,6 +63,28 @@ class GlobalsTest(unittest.TestCase):
         self.assertTrue(len(env.global_frame) > 0)
         self.assertTrue('Creating initial environment' in out[0])
 
+    def test_lazy_cdr(self):
+        with utils.capture():
+            env = glob.create_initial_env()
+
+        def run(text):
+            return glob.interpret(read_form(text))(env)
+
+        self.assertTrue(run('(promise? (cdr (range 3)))'))
+        self.assertFalse(run('(promise? (rest (range 3)))'))
+        self.assertEqual(1, run('(second (range 3))'))
+        self.assertEqual(2, run('(car (force (cdr (rest (range 3)))))'))
+        self.assertIsInstance(env['rest'], NativeProcedure)
+
+    def test_improper_lists(self):
+        with utils.capture():
+            env = glob.create_initial_env()
+
+        with utils.capture() as out:
+            self.assertEqual([1, 2], glob.interpret(read_form('(str (cons 1 2))'))(env))
+            glob.interpret(read_form('(print (cons 1 (cons 2 3)))'))(env)
+        self.assertEqual('[1, 2, 3]\n', out[0])
+
     def test_format(self):
         self.assertEqual("format_no_args", glob.format_("format_no_args"))
         self.assertEqual("format_arg1_arg2", glob.format_(
@@ -80,24 +107,145 @@ class GlobalsTest(unittest.TestCase):
         self.assertFalse(glob.pair_QUESTION(None))
         self.assertFalse(glob.pair_QUESTION(2))
         self.assertFalse(glob.pair_QUESTION(List(1, 2, 3)))
-        self.assertTrue(glob.pair_QUESTION((1, 2)))
+        self.assertTrue(glob.pair_QUESTION(Cons(1, 2)))
+        self.assertFalse(glob.pair_QUESTION((1, 2)))
 
     def test_car(self):
         self.assertEquals(None, glob.car(None))
-        self.assertEquals(1, glob.car((1, 2)))
+        self.assertEquals(1, glob.car(Cons(1, 2)))
         with self.assertRaises(EvaluationError) as cm:
             glob.car(43)
         self.assertEquals("Cannot car on non-cons cell: '43'",
                           cm.exception.message)
 
+    def test_cons(self):
+        cell = glob.cons(1, 2)
+        self.assertIsInstance(cell, Cons)
+        self.assertTrue(glob.pair_QUESTION(cell))
+        self.assertEqual(1, glob.car(cell))
+        self.assertEqual(2, glob.cdr(cell))
+
+    def test_cons_lazy_tail(self):
+        env = Env()
+        env['*debug*'] = False
+        tail = Cons(2)
+        promise = Promise(Lambda(List(), Atom(tail)).eval(env))
+        cell = glob.cons(1, promise)
+        self.assertFalse(glob.realized_QUESTION(cell))
+        # cdr leaves the tail delayed, while rest forces it
+        self.assertIs(promise, glob.cdr(cell))
+        self.assertIs(tail, glob.rest(cell))
+        self.assertTrue(glob.realized_QUESTION(cell))
+        self.assertIs(tail, glob.cdr(cell))
+        self.assertEqual(None, cell.thunk)
+        self.assertEqual(None, promise.closure)
+
     def test_cdr(self):
         self.assertEquals(None, glob.cdr(None))
-        self.assertEquals(2, glob.cdr((1, 2)))
+        self.assertEquals(2, glob.cdr(Cons(1, 2)))
         with self.assertRaises(EvaluationError) as cm:
             glob.cdr(43)
         self.assertEquals("Cannot cdr on non-cons cell: '43'",
                           cm.exception.message)
 
+    def test_arithmetic(self):
+        self.assertEqual(0, glob.plus())
+        self.assertEqual(10, glob.plus(1, 2, 3, 4))
+        self.assertEqual(-5, glob.minus(5))
+        self.assertEqual(7, glob.minus(10, 1, 2))
+        self.assertEqual(1, glob.multiply())
+        self.assertEqual(24, glob.multiply(1, 2, 3, 4))
+        self.assertEqual(0.25, glob.divide(4))
+        self.assertEqual(2.5, glob.divide(10, 2, 2))
+
+    def test_comparison(self):
+        less_than = glob.comparison(operator.lt)
+        self.assertTrue(less_than(1))
+        self.assertTrue(less_than(1, 2, 3))
+        self.assertFalse(less_than(1, 3, 2))
+        self.assertTrue(glob.comparison(operator.eq)(4, 4, 4))
+
+    def test_native(self):
+        with utils.capture():
+            env = glob.create_initial_env()
+        self.assertIsInstance(env['+'], NativeProcedure)
+        self.assertTrue(env['+'].__docstring__.startswith('+ (. xs)'))
+        self.assertEqual(15, List(Symbol('+'), Atom(1), Atom(2), List(Symbol('*'), Atom(3), Atom(4))).eval(env))
+        self.assertFalse('sum' in env)
+        with self.assertRaises(EvaluationError) as cm:
+            List(Symbol('-')).eval(env)
+        self.assertEqual(
+            'Call to \'-\' applied with insufficient arity: 1 args expected, 0 supplied', cm.exception.message)
+
+    def test_lisp_fallbacks(self):
+        env = Env()
+        glob.bootstrap_special_forms(env)
+        glob.bootstrap_python_functions(env)
+        # Without the natives, the lisp definitions of the operators are made instead
+        del env.global_frame['+']
+        del env.global_frame['/']
+        with utils.capture():
+            for lib in glob.__core_libraries__:
+                glob.bootstrap_lisp_functions(env, '../core/{0}.ylx'.format(lib), cache=False, fallbacks=True)
+
+        self.assertIsInstance(env['+'], Closure)
+        self.assertEqual(10, List(Symbol('+'), Atom(1), Atom(2), Atom(3), Atom(4)).eval(env))
+        self.assertEqual(2.5, List(Symbol('/'), Atom(5), Atom(2)).eval(env))
+        self.assertEqual(2.5, List(Symbol('/'), Atom(10), Atom(2), Atom(2)).eval(env))
+        self.assertEqual(0.25, List(Symbol('/'), Atom(4)).eval(env))
+        self.assertIsInstance(env['-'], NativeProcedure)
+        self.assertEqual('+', glob.defined_name(read_form('(define (+ . xs) xs)')))
+        self.assertEqual('/', glob.defined_name(read_form('(define / div)')))
+        self.assertIsNone(glob.defined_name(read_form('(+ 1 2)')))
+
+    def test_user_definitions_of_natives(self):
+        with utils.capture():
+            env = glob.create_initial_env().overlay()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'mine.ylx')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('(define (car x) "mine")\n')
+            glob.bootstrap_lisp_functions(env, path, cache=False)
+        self.assertEqual('mine', List(Symbol('car'), Atom(1)).eval(env))
+
+    def test_interop(self):
+        add = glob.interop(operator.add, 2)
+        self.assertIsInstance(add, NativeProcedure)
+        env = Env()
+        env['*debug*'] = False
+        self.assertEqual(7, List(Atom(add), Atom(3), Atom(4)).eval(env))
+
+        with utils.capture():
+            env = glob.create_initial_env()
+        self.assertEqual(1, List(Symbol('car'), List(Symbol('cons'), Atom(1), Atom(2))).eval(env))
+        with self.assertRaises(EvaluationError) as cm:
+            List(Symbol('car'), Atom((1, 2)), Atom(3)).eval(env)
+        self.assertEqual(
+            'Call to \'car\' applied with insufficient arity: 1 args expected, 2 supplied', cm.exception.message)
+
+    def test_overlay_sessions(self):
+        with utils.capture():
+            core = glob.create_initial_env()
+        session1, session2 = core.overlay(), core.overlay()
+        List(Symbol('define'), Symbol('square'), List(Symbol('lambda'), List(Symbol('x')),
+                                                      List(Symbol('*'), Symbol('x'), Symbol('x')))).eval(session1)
+        self.assertEqual(16, List(Symbol('square'), Atom(4)).eval(session1))
+        self.assertEqual(10, List(Symbol('+'), Atom(1), Atom(2), Atom(3), Atom(4)).eval(session2))
+        self.assertFalse('square' in session2)
+        self.assertFalse('square' in core)
+
+    def test_variadic_interop(self):
+        with utils.capture():
+            env = glob.create_initial_env()
+        self.assertEqual('a1b', List(Symbol('str'), Atom('a'), Atom(1), Atom('b')).eval(env))
+        self.assertEqual('', List(Symbol('str')).eval(env))
+        self.assertEqual('1-[2, 3]', List(Symbol('format'), Atom('{0}-{1}'), Atom(1),
+                                          List(Symbol('list'), Atom(2), Atom(3))).eval(env))
+        with self.assertRaises(EvaluationError) as cm:
+            List(Symbol('format')).eval(env)
+        self.assertEqual(
+            'Call to \'format\' applied with insufficient arity: 1 args expected, 0 supplied', cm.exception.message)
+
 
 if __name__ == '__main__':
     unittest.main()
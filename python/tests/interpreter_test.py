@@ -1,25 +1,28 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import io
+import pickle
+import sys
 import unittest
 import operator
 
 from yalix.environment import Env
 from yalix.interpreter import Atom, Define, List, Symbol, InterOp, Lambda, \
     Let, Let_STAR, LetRec, If, EvaluationError, Quote, Delay, Closure, \
-    SpecialForm, Unbound, Set_PLING, Realize, Repr
+    SpecialForm, Unbound, Set_PLING, Realize, Repr, Promise, Cons, GlobalRef, cons, make_list, write_repr
 
 
 def make_env():
     env = Env()
-    env['*debug*'] = Atom(False)
+    env['*debug*'] = False
 
     Define(List(Symbol('cons'), Symbol('a'), Symbol('b')), InterOp(
-        lambda a, b: (a, b), Symbol('a'), Symbol('b'))).eval(env)
+        cons, Symbol('a'), Symbol('b'))).eval(env)
     Define(List(Symbol('first'), Symbol('a')), InterOp(
-        lambda a: a[0], Symbol('a'))).eval(env)
+        lambda a: a.head, Symbol('a'))).eval(env)
     Define(List(Symbol('rest'), Symbol('a')), InterOp(
-        lambda a: a[1], Symbol('a'))).eval(env)
+        lambda a: a.tail(), Symbol('a'))).eval(env)
     Define(Symbol('<'), Lambda(List(Symbol('a'), Symbol('b')),
            InterOp(operator.lt, Symbol('a'), Symbol('b')))).eval(env)
     Define(Symbol('*'), Lambda(List(Symbol('a'), Symbol('b')),
@@ -58,7 +61,7 @@ class BuiltinsTest(unittest.TestCase):
 
         lst = Let(List(Symbol("f"), Atom("Hello")),
                   make_linked_list(Symbol("f"), Symbol("f"))).eval(env)
-        self.assertEqual(('Hello', ('Hello', None)), lst)
+        self.assertEqual(['Hello', 'Hello'], Realize(lst).eval(env))
 
     def test_let_STAR_shadow_binding(self):
         env = make_env()
@@ -69,9 +72,7 @@ class BuiltinsTest(unittest.TestCase):
                             List(Symbol('c'), Atom('World')),
                             List(Symbol('c'), make_linked_list(Atom('Big'), Symbol('c')))),  # <-- re-def shadowing
                        make_linked_list(Symbol('a'), Symbol('c'), Symbol('b'))).eval(env)
-        self.assertEqual(
-            ('Hello', (('Big', ('World', None)), ((1, (2, (3, None))), None))),
-            lst)
+        self.assertEqual(['Hello', ['Big', 'World'], [1, 2, 3]], Realize(lst).eval(env))
 
     def test_letrec(self):
         # (define (sum n)
@@ -128,14 +129,10 @@ class BuiltinsTest(unittest.TestCase):
         Define(List(Symbol('list*'), Symbol('.'),
                Symbol('xs')), Symbol('xs')).eval(env)
         values = List(Symbol('list*'), Atom(1), Atom(2), Atom(3)).eval(env)
-        caller = Caller('n/a')
-        self.assertEqual(1, values[0])
-        values = values[1].apply(env, caller)
-        self.assertEqual(2, values[0])
-        values = values[1].apply(env, caller)
-        self.assertEqual(3, values[0])
-        values = values[1].apply(env, caller)
-        self.assertEqual(None, values)
+        # Packed eagerly into a strict list of cons cells
+        self.assertIsInstance(values, Cons)
+        self.assertEqual([1, 2, 3], Realize(values).eval(env))
+        self.assertEqual(None, List(Symbol('list*')).eval(env))
 
     def test_lambda_only_one_variadic_arg(self):
         env = make_env()
@@ -299,6 +296,44 @@ class BuiltinsTest(unittest.TestCase):
         value2 = List(Symbol('factorial2'), Atom(10)).eval(env)
         self.assertEquals(3628800, value2)
 
+    def test_tail_recursion(self):
+        # (define (count n acc)
+        #   (if (zero? n)
+        #     acc
+        #     (count (- n 1) (+ acc 1))))
+        env = make_env()
+        env['*debug*'] = False
+        Define(List(Symbol('count'), Symbol('n'), Symbol('acc')),
+               If(List(Symbol('zero?'), Symbol('n')),
+                  Symbol('acc'),
+                  List(Symbol('count'),
+                       List(Symbol('-'), Symbol('n'), Atom(1)),
+                       List(Symbol('+'), Symbol('acc'), Atom(1))))).eval(env)
+
+        depth = sys.getrecursionlimit() * 2
+        value = List(Symbol('count'), Atom(depth), Atom(0)).eval(env)
+        self.assertEqual(depth, value)
+
+    def test_mutual_tail_recursion(self):
+        # (letrec ((even? (λ (n) (if (zero? n) #t (odd? (- n 1)))))
+        #          (odd? (λ (n) (let (m (- n 1)) (if (zero? n) #f (even? m))))))
+        #   (even? n))
+        env = make_env()
+        env['*debug*'] = False
+        value = LetRec(List(List(Symbol('even?'),
+                                 Lambda(List(Symbol('n')),
+                                        If(List(Symbol('zero?'), Symbol('n')),
+                                           Atom(True),
+                                           List(Symbol('odd?'), List(Symbol('-'), Symbol('n'), Atom(1)))))),
+                            List(Symbol('odd?'),
+                                 Lambda(List(Symbol('n')),
+                                        Let(List(Symbol('m'), List(Symbol('-'), Symbol('n'), Atom(1))),
+                                            If(List(Symbol('zero?'), Symbol('n')),
+                                               Atom(False),
+                                               List(Symbol('even?'), Symbol('m'))))))),
+                       List(Symbol('even?'), Atom(sys.getrecursionlimit() * 2 + 1))).eval(env)
+        self.assertEqual(False, value)
+
     def test_define_too_many_args(self):
         env = make_env()
         with self.assertRaises(EvaluationError) as cm:
@@ -393,6 +428,59 @@ class BuiltinsTest(unittest.TestCase):
         expected = [list(range(i)) for i in range(1, 10)]
         self.assertEqual(expected, arr)
 
+    def test_realize_lazy_list(self):
+        env = make_env()
+        lazy_list = List.make_lazy_list([Atom(value) for value in range(10)]).eval(env)
+        self.assertIsInstance(lazy_list.thunk, Promise)
+        self.assertEqual(list(range(10)), Realize(lazy_list).eval(env))
+
+    def test_realize_improper_list(self):
+        env = make_env()
+        self.assertEqual([1, 2], Realize(Cons(1, 2)).eval(env))
+        self.assertEqual([1, [2, 3]], Realize(Cons(1, Cons(Cons(2, 3)))).eval(env))
+
+    def test_realize_deeply_nested_list(self):
+        env = make_env()
+        nested = None
+        for _ in range(sys.getrecursionlimit() * 2):
+            nested = Cons(nested)
+        arr = Realize(nested).eval(env)
+        for _ in range(sys.getrecursionlimit() * 2 - 1):
+            arr = arr[0]
+        self.assertEqual([None], arr)
+
+    def test_repr_deeply_nested_list(self):
+        env = make_env()
+        depth = sys.getrecursionlimit() * 2
+        nested = Cons(1)
+        for _ in range(depth):
+            nested = Cons(nested)
+        self.assertEqual('(' * depth + '(1)' + ')' * depth, Repr(nested).eval(env))
+
+    def test_repr_lazy_list(self):
+        env = make_env()
+        env['*print-length*'] = 3
+        lazy_list = List.make_lazy_list([Atom(value) for value in range(10)]).eval(env)
+        self.assertEqual('(0 1 2 ...)', Repr(lazy_list).eval(env))
+
+    def test_repr_symbols(self):
+        env = make_env()
+        self.assertEqual('(a (b c))', Repr(make_list([Symbol('a'), make_list([Symbol('b'), Symbol('c')])])).eval(env))
+
+    def test_write_repr(self):
+        env = make_env()
+        out = io.StringIO()
+        write_repr(make_list([1, make_list(['a', 2.5])]), out, env)
+        self.assertEqual('(1 (a 2.5))', out.getvalue())
+
+    def test_realize_and_repr_cons_cells(self):
+        env = make_env()
+        lazy_tail = Promise(Lambda(List(), Atom(Cons(3, None))).eval(env))
+        cells = Cons(1, Cons(Cons('a', Cons(Symbol('b'))), thunk=lazy_tail))
+        self.assertEqual('(1 (a b) 3)', Repr(cells).eval(env))
+        self.assertEqual([1, ['a', Symbol('b')], 3], Realize(cells).eval(env))
+        self.assertEqual('(1 . 2)', Repr(Cons(1, 2)).eval(env))
+
     def test_repr_exhaust_list__no_print_length(self):
         env = make_env()
         self.assertFalse('*print-length*' in env)
@@ -417,6 +505,41 @@ class BuiltinsTest(unittest.TestCase):
         text = Repr(linked_list).eval(env)
         self.assertEqual('(0 1 2 3 4 5 6 7 8 9 10 11)', text)
 
+    def test_global_ref(self):
+        env = make_env()
+        env['x'] = 1
+        ref = GlobalRef('x')
+        self.assertEqual(1, ref.eval(env))
+        self.assertEqual(1, ref.eval(env.extend('x', 'local')))
+        env['x'] = 2
+        self.assertEqual(2, ref.eval(env))
+        with self.assertRaises(EvaluationError) as cm:
+            GlobalRef('froobe').eval(env)
+        self.assertEqual('\'froobe\' is unbound in environment', cm.exception.message)
+
+    def test_global_ref_overlay(self):
+        core = make_env()
+        core['x'] = 1
+        session = core.overlay()
+        ref = GlobalRef('x')
+        self.assertEqual(1, ref.eval(session))
+        core['x'] = 2
+        self.assertEqual(2, ref.eval(session))
+        session['x'] = 3
+        self.assertEqual(3, ref.eval(session))
+        self.assertEqual(2, ref.eval(core))
+        self.assertEqual(2, ref.eval(core.overlay()))
+
+    def test_global_ref_pickled_without_cache(self):
+        env = make_env()
+        env['x'] = 1
+        ref = GlobalRef('x')
+        ref.eval(env)
+        restored = pickle.loads(pickle.dumps(ref))
+        self.assertEqual(Symbol('x'), restored)
+        self.assertIsNone(restored.cache[0])
+        self.assertEqual(1, restored.eval(env))
+
 # Should be in globals
 #    def test_gensym(self):
 #        # (gensym)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import threading
+import unittest
+import yalix.parallel as parallel
+from yalix.exceptions import EvaluationError
+from yalix.interpreter import NativeProcedure, Repr, make_list, realize
+from tests.support import ENV, bootstrap, run
+
+
+def setUpModule():
+    os.environ[parallel.WORKERS_VARIABLE] = '2'
+
+
+def tearDownModule():
+    parallel.shutdown()
+    del os.environ[parallel.WORKERS_VARIABLE]
+
+
+def show(text, env=ENV):
+    return Repr(run(text, env)).eval(env)
+
+
+class ParallelTests(unittest.TestCase):
+
+    def test_pmap(self):
+        self.assertEqual('(1 2 3 4 5 6 7 8 9 10)', show('(pmap inc (range 10))'))
+        self.assertEqual('(0 10 20)', show('(let (n 10) (pmap (lambda (x) (* x n)) (range 3)))'))
+        self.assertEqual('None', show('(pmap inc nil)'))
+        self.assertIsNotNone(parallel._pool)
+
+    def test_pfilter(self):
+        self.assertEqual('(0 3 6 9 12)', show('(pfilter (lambda (x) (= 0 (mod x 3))) (range 15))'))
+
+    def test_preduce(self):
+        self.assertEqual('4950', show('(preduce + 0 (range 100))'))
+        self.assertEqual('abcdef', show('(preduce str "" (list "a" "b" "c" "d" "e" "f"))'))
+        self.assertEqual('7', show('(preduce + 7 nil)'))
+
+    def test_definitions_since_fork(self):
+        run('(define (scale x) (* x 2))')
+        self.assertEqual('(0 2 4)', show('(pmap scale (range 3))'))
+        run('(define (scale x) (* x 3))')
+        self.assertEqual('(0 3 6)', show('(pmap scale (range 3))'))
+
+    def test_overlay(self):
+        env = ENV.overlay()
+        run('(define offset 100)', env)
+        self.assertEqual('(100 101)', show('(pmap (lambda (x) (+ x offset)) (range 2))', env))
+
+    def test_overlays_share_pool(self):
+        first, second = ENV.overlay(), ENV.overlay()
+        run('(define (helper x) (* x 10))', first)
+        run('(define (scaled x) (helper x))', first)
+        self.assertEqual('(0 10 20)', show('(pmap scaled (range 3))', first))
+        pool = parallel._pool
+
+        run('(define (helper x) (- x))', second)
+        self.assertEqual('(0 -1 -2)', show('(pmap (lambda (x) (helper x)) (range 3))', second))
+        run('(define unrelated 1)')
+        self.assertEqual('(1 2 3)', show('(pmap inc (range 3))'))
+        self.assertIs(pool, parallel._pool)
+
+    def test_threads(self):
+        other = bootstrap()
+
+        def work(index):
+            env = ENV.overlay()
+            run('(define n {0})'.format(index), env)
+            barrier.wait()
+            results[index] = show('(pmap (lambda (x) (+ x n)) (range 20))', env)
+
+        results = [None] * 4
+        barrier = threading.Barrier(5)
+        threads = [threading.Thread(target=work, args=(index,)) for index in range(4)]
+        for thread in threads:
+            thread.start()
+        # Another core environment replaces the pool meanwhile
+        barrier.wait()
+        self.assertEqual('(1 2)', show('(pmap inc (range 2))', other))
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([show('(map (lambda (x) (+ x {0})) (range 20))'.format(index)) for index in range(4)],
+                         results)
+
+    def test_unpicklable_fallback(self):
+        unpicklable = NativeProcedure(lambda x: x, 1)
+        elements = make_list([unpicklable, unpicklable])
+        self.assertEqual([unpicklable, unpicklable], realize(parallel.pmap(ENV, run('identity'), elements), ENV))
+
+    def test_deep_values_fallback(self):
+        # Too deeply nested to pickle, whether as a result or as a definition sent
+        self.assertEqual('2999', show('(first (first (pmap (lambda (x) (reverse (range 3000))) (range 4))))'))
+        env = ENV.overlay()
+        run('(define backwards (reverse (range 3000)))', env)
+        self.assertEqual('(2999 3000)', show('(pmap (lambda (x) (+ x (first backwards))) (range 2))', env))
+
+    def test_worker_error(self):
+        with self.assertRaises(EvaluationError) as cm:
+            run('(pmap car (list 1 2 3))')
+        self.assertTrue('Cannot car on non-cons cell' in str(cm.exception))
+
+
+if __name__ == '__main__':
+    unittest.main()
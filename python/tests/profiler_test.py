@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+import itertools
+import sys
+import threading
+import unittest
+import yalix.utils as utils
+from yalix.exceptions import EvaluationError
+from yalix.globals import interop
+from yalix.interpreter import List
+from yalix.profiler import Profiler, Sampler, lisp_stack, write_collapsed
+from tests.support import ENV, run
+
+
+run('(define (profiled-square x) (* x x))')
+run('(define (profiled-sum xs) (if (empty? xs) 0 (+ (first xs) (profiled-sum (rest xs)))))')
+
+
+class ProfilerTests(unittest.TestCase):
+
+    def test_call_counts(self):
+        with Profiler() as profiler:
+            self.assertEqual(30, run('(fold + 0 (map profiled-square (range 5)))'))
+
+        square = [stats for (name, _), stats in profiler.functions.items() if name == 'profiled-square']
+        self.assertEqual(1, len(square))
+        self.assertEqual(5, square[0].calls)
+        self.assertEqual('1:10', square[0].location)
+        self.assertTrue(square[0].inclusive >= square[0].exclusive > 0)
+        self.assertIsNone(List.tracer)
+
+    def test_exclusive_time(self):
+        # Each reading of the clock takes one tick
+        ticks = itertools.count()
+        with Profiler(clock=lambda: next(ticks)) as profiler:
+            run('(profiled-sum (list 1 2 3))')
+
+        # The arguments are evaluated before profiled-sum is applied
+        total = sum(stats.exclusive for stats in profiler.functions.values())
+        functions = dict((name, stats) for (name, _), stats in profiler.functions.items())
+        self.assertEqual(4, functions['profiled-sum'].calls)
+        self.assertEqual(total, functions['profiled-sum'].inclusive + functions['list'].inclusive)
+        self.assertEqual(total * 1e6, sum(profiler.stacks.values()))
+
+    def test_collapsed_stacks(self):
+        with Profiler() as profiler:
+            run('(profiled-sum (list 1 2))')
+
+        self.assertTrue('profiled-sum;profiled-sum;+' in profiler.stacks)
+        out = io.StringIO()
+        write_collapsed({'a;b': 12.4, 'a': 3.6}, out)
+        self.assertEqual('a 4\na;b 12\n', out.getvalue())
+
+    def test_unwind(self):
+        with Profiler() as profiler:
+            with self.assertRaises(EvaluationError):
+                run('(profiled-square (error "failed"))')
+            run('(profiled-square 2)')
+        self.assertEqual([], profiler._frames)
+        self.assertEqual(1, [stats for (name, _), stats in profiler.functions.items()
+                             if name == 'profiled-square'][0].calls)
+
+    def test_letrec_helpers(self):
+        # reverse applies its letrec-bound aux once per element, and once more at the end
+        with Profiler() as profiler:
+            run('(reverse (list 1 2 3))')
+        functions = dict((name, stats) for (name, _), stats in profiler.functions.items())
+        self.assertEqual(4, functions['aux'].calls)
+        self.assertTrue('reverse;aux;aux;aux;aux' in profiler.stacks)
+
+    def test_profile_form(self):
+        with utils.capture() as out:
+            self.assertEqual(14, run('(profile (+ (profiled-square 3) (profiled-square 2) 1))'))
+        self.assertTrue('exclusive (ms)' in out[0])
+        self.assertTrue('profiled-square (1:10)' in out[0])
+        self.assertIsNone(List.tracer)
+
+    def test_profile_tail_calls(self):
+        # Tail calls are eliminated while profiling, as they are otherwise
+        with utils.capture():
+            self.assertEqual(sum(range(3000)), run('(profile (fold + 0 (range 3000)))'))
+        self.assertIsNone(List.tracer)
+
+    def test_other_threads(self):
+        results = []
+        with Profiler() as profiler:
+            thread = threading.Thread(target=lambda: results.append(run('(fold + 0 (range 3000))')))
+            thread.start()
+            thread.join()
+            run('(profiled-square 2)')
+
+        self.assertEqual([sum(range(3000))], results)
+        self.assertEqual({'profiled-square', '*'}, set(name for name, _ in profiler.functions))
+
+    def test_lisp_stack(self):
+        env = ENV.overlay()
+        env['stack-here'] = interop(lambda: lisp_stack(sys._getframe()), 0)
+        run('(define (inner) (stack-here))', env)
+        run('(define (outer) (list (inner)))', env)
+        # The arguments of list (and car) are evaluated before it is applied
+        self.assertEqual(['outer', 'inner', 'stack-here'], run('(car (outer))', env))
+
+    def test_lisp_stack_tail_calls(self):
+        env = ENV.overlay()
+        env['stack-here'] = interop(lambda: lisp_stack(sys._getframe()), 0)
+        run('(define (countdown n) (if (= n 0) (stack-here) (countdown (dec n))))', env)
+        run('(define (outer) (list (countdown 100)))', env)
+        self.assertEqual(['outer', 'countdown', 'stack-here'], run('(car (outer))', env))
+
+    def test_sampler(self):
+        env = ENV.overlay()
+        run('(define (slow n) (if (= n 0) 0 (slow (dec n))))', env)
+        run('(define (outer) (+ 1 (slow 20000)))', env)
+        with Sampler(interval=0.0001) as sampler:
+            run('(outer)', env)
+        self.assertTrue(sampler.samples > 0)
+        # slow is attributed to outer, its caller; + is only applied once slow returns
+        self.assertTrue(any(stack.startswith('outer;slow') for stack in sampler.stacks), sampler.stacks)
+        self.assertTrue(all(stack.startswith('outer') for stack in sampler.stacks), sampler.stacks)
+        self.assertFalse(any('+;slow' in stack for stack in sampler.stacks), sampler.stacks)
+
+
+if __name__ == '__main__':
+    unittest.main()
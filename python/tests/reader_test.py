@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+import sys
+import threading
+import unittest
+from yalix.exceptions import ReadError
+from yalix.interpreter import Atom, List, Symbol, Quote, SyntaxQuote, Unquote, UnquoteSplice
+from yalix import parser
+from yalix.parser import scheme_parser
+from yalix.reader import read, read_form, read_stream
+
+
+def structure(ast, branded=True):
+    """ The node types, values and (optionally) branding of the AST, for comparison """
+    branding = (getattr(ast, '__source__', None), getattr(ast, '__location__', None)) if branded else None
+    if isinstance(ast, List):
+        return 'List', branding, [structure(arg, branded) for arg in ast]
+    elif isinstance(ast, Atom):
+        return 'Atom', branding, type(ast.value), ast.value
+    elif isinstance(ast, Symbol):
+        return 'Symbol', branding, ast.name
+    elif isinstance(ast, (Quote, SyntaxQuote, Unquote, UnquoteSplice)):
+        return type(ast).__name__, branding, structure(ast.expr, branded)
+    return type(ast), ast
+
+
+class ReaderTests(unittest.TestCase):
+
+    def assertSameAsParser(self, text):
+        expected = scheme_parser().parseString(text, parseAll=True).asList()
+        self.assertEqual([structure(ast) for ast in expected],
+                         [structure(ast) for ast in read(text)], text)
+
+    def test_atoms(self):
+        self.assertSameAsParser('1 -2 12L 3.5 -0.5e3 0x1F #t #f "str\\"ing" ""')
+
+    def test_symbols(self):
+        self.assertSameAsParser('a-b->c?! + - / . *debug* G__12# λ')
+
+    def test_token_boundaries(self):
+        self.assertSameAsParser('1e5 -0x1F 123abc (a)(b)')
+
+    def test_reader_macros(self):
+        self.assertSameAsParser("'a `(b ~c ~@d) ' (x) '''y ~@ z")
+
+    def test_comments_and_docstrings(self):
+        self.assertSameAsParser('; comment\n(define (f x) ;^ docs\n ;; more\n (inc x)) ; trailing')
+
+    def test_core_libraries(self):
+        for lib in ['core', 'hof', 'num', 'macros', 'repr', 'test']:
+            with open('../core/{0}.ylx'.format(lib), encoding='utf-8') as f:
+                self.assertSameAsParser(f.read())
+
+    def test_branding(self):
+        ref = read('(λ (x) x)')[0][2]
+        self.assertEqual(7, ref.__location__)
+        self.assertEqual('(λ (x) x)', ref.__source__)
+
+    def test_deeply_nested(self):
+        depth = sys.getrecursionlimit() * 2
+        ast = read('(' * depth + 'x' + ')' * depth)[0]
+        for _ in range(depth - 1):
+            ast = ast[0]
+        self.assertEqual(Symbol('x'), ast[0])
+
+    def test_unbalanced(self):
+        with self.assertRaises(ReadError) as cm:
+            read('(a (b)')
+        self.assertEqual("Expected ')' before end of input", cm.exception.message)
+
+        with self.assertRaises(ReadError) as cm:
+            read('(a)\n  (b))')
+        self.assertEqual("Unexpected ')' at line:2, col:6", str(cm.exception))
+
+        with self.assertRaises(ReadError) as cm:
+            read("(a ')")
+        self.assertEqual("Unexpected ')'", cm.exception.message)
+
+    def test_unexpected_character(self):
+        with self.assertRaises(ReadError) as cm:
+            read('(a #x)')
+        self.assertEqual("Unexpected character: '#' at line:1, col:4", str(cm.exception))
+
+
+class StreamReaderTests(unittest.TestCase):
+
+    def test_same_forms_as_read(self):
+        for lib in ['core', 'hof', 'num', 'macros', 'repr', 'test']:
+            with open('../core/{0}.ylx'.format(lib), encoding='utf-8') as f:
+                text = f.read()
+            with open('../core/{0}.ylx'.format(lib), encoding='utf-8') as f:
+                forms = list(read_stream(f))
+            self.assertEqual([structure(ast, branded=False) for ast in read(text)],
+                             [structure(ast, branded=False) for ast in forms])
+
+    def test_yields_forms_as_read(self):
+        consumed = []
+
+        def lines():
+            for line in ['(define x\n', '  1)\n', '(inc\n', 'x)\n', "'\n", 'y ; done\n', '(never read)\n']:
+                consumed.append(line)
+                yield line
+
+        forms = read_stream(lines())
+        self.assertEqual(Symbol('define'), next(forms)[0])
+        self.assertEqual(2, len(consumed))
+        self.assertEqual(Symbol('inc'), next(forms)[0])
+        self.assertEqual(4, len(consumed))
+        self.assertEqual(Symbol('y'), next(forms).expr)
+        self.assertEqual(6, len(consumed))
+
+    def test_source_is_just_the_form(self):
+        form = list(read_stream(io.StringIO('(a)\n\n(b\n c) ; comment\n')))[1]
+        self.assertEqual('(b\n c) ; comment\n', form.__source__)
+        self.assertEqual(0, form.__location__)
+        self.assertEqual(2, form.__source__.line_offset)
+
+    def test_line_numbers(self):
+        with self.assertRaises(ReadError) as cm:
+            list(read_stream(io.StringIO('(a)\n(b\n c))\n')))
+        self.assertEqual("Unexpected ')' at line:3, col:4", str(cm.exception))
+
+        with self.assertRaises(ReadError) as cm:
+            list(read_stream(io.StringIO('(a)\n(b\n (c)\n')))
+        self.assertEqual("Expected ')' before end of input at line:2, col:1", str(cm.exception))
+
+
+class ReadFormTests(unittest.TestCase):
+
+    def test_literals(self):
+        for text in ['42', '-3.5', '"a message"', '#t', 'nil', 'sym']:
+            self.assertEqual(structure(read(text)[0]), structure(read_form(text)))
+
+    def test_list(self):
+        form = read_form('(order 1234 "widgets") (ignored)')
+        self.assertEqual(Symbol('order'), form[0])
+        self.assertEqual(3, len(form))
+
+    def test_no_form(self):
+        with self.assertRaises(ReadError):
+            read_form('  ; nothing here')
+
+    def test_shared_grammar_across_threads(self):
+        results = []
+
+        def worker(n):
+            results.append(structure(parser.read('(a {0} "b")'.format(n))[0], branded=False))
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(structure(read('(a {0} "b")'.format(n))[0], branded=False) for n in range(8)),
+                         sorted(results))
+
+
+if __name__ == '__main__':
+    unittest.main()
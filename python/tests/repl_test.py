@@ -2,9 +2,13 @@
 # -*- coding: utf-8 -*-
 
 from datetime import datetime
+import os
+import tempfile
 import unittest
 import yalix.repl as repl
 import yalix.utils as utils
+from yalix.globals import create_initial_env
+from yalix.snapshot import snapshot
 
 
 def send_inputs(*args):
@@ -64,6 +68,46 @@ class ReplTests(unittest.TestCase):
         self.assertTrue('KeyboardInterrupt' in out[0])
         self.assertTrue('Bye!' in out[0])
 
+    def test_repl_compiler_engine(self):
+        commands = send_inputs("(+ 1 2 3 4)", "(map inc (range 3))")
+        results = {}
+        collector = capture_outputs(results)
+
+        with utils.capture():
+            repl.repl(inprompt=commands, outprompt=collector, engine='compiler')
+
+        self.assertEqual('10', results[1])
+        self.assertEqual('(1 2 3)', results[2])
+
+    def test_repl_pyparsing_reader(self):
+        commands = send_inputs("(+ 1 2 3 4)", "(map inc (range 3))")
+        results = {}
+        collector = capture_outputs(results)
+
+        with utils.capture():
+            repl.repl(inprompt=commands, outprompt=collector, reader='pyparsing')
+
+        self.assertEqual('10', results[1])
+        self.assertEqual('(1 2 3)', results[2])
+
+    def test_repl_from_snapshot(self):
+        with utils.capture():
+            env = create_initial_env()
+        env['answer'] = 42
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            snapshot(env, path)
+            commands = send_inputs("(+ answer 1)")
+            results = {}
+            with utils.capture() as out:
+                repl.repl(inprompt=commands, outprompt=capture_outputs(results), snapshot=path)
+        finally:
+            os.remove(path)
+
+        self.assertEqual('43', results[1])
+        self.assertTrue('Restoring snapshot' in out[0])
+
 
 if __name__ == '__main__':
     unittest.main()
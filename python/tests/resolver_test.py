@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import unittest
+from yalix.environment import Env
+from yalix.interpreter import GlobalRef, LocalRef, Symbol
+from yalix.parser import scheme_parser
+from yalix.resolver import resolve
+from tests.support import ENV
+
+
+def parse(text):
+    return scheme_parser().parseString(text, parseAll=True).asList()[0]
+
+
+def local_refs(ast):
+    """ Collects the (name, depth, slot) of each resolved reference """
+    if isinstance(ast, LocalRef):
+        return [(ast.name, ast.depth, ast.slot)]
+    refs = []
+    for attr in ['args', 'expr']:
+        children = getattr(ast, attr, ())
+        for child in (children if isinstance(children, tuple) else [children]):
+            refs.extend(local_refs(child))
+    return refs
+
+
+class ResolverTests(unittest.TestCase):
+
+    def test_free_symbols_global(self):
+        ast = resolve(parse('(inc x)'))
+        self.assertEqual([], local_refs(ast))
+        self.assertEqual(GlobalRef, type(ast[0]))
+        self.assertEqual(GlobalRef, type(ast[1]))
+        self.assertEqual(Symbol('x'), ast[1])
+
+    def test_quoted_symbols_untouched(self):
+        ast = resolve(parse("(list 'x `(y ~z))"))
+        self.assertEqual(Symbol, type(ast[1].expr))
+        self.assertEqual(Symbol, type(ast[2].expr[0]))
+        self.assertEqual(GlobalRef, type(ast[2].expr[1].expr))
+
+    def test_lambda_formals(self):
+        ast = resolve(parse('(λ (a b . c) (list c b a))'))
+        self.assertEqual([('c', 0, 2), ('b', 0, 1), ('a', 0, 0)], local_refs(ast))
+
+    def test_nested_scopes(self):
+        ast = resolve(parse('(λ (x y) (λ (z) (list x z y)))'))
+        self.assertEqual([('x', 1, 0), ('z', 0, 0), ('y', 1, 1)], local_refs(ast))
+
+    def test_let_expr_resolved_in_enclosing_scope(self):
+        ast = resolve(parse('(λ (x) (let (x (inc x)) x))'))
+        self.assertEqual([('x', 0, 0), ('x', 0, 0)], local_refs(ast))
+
+    def test_let_STAR_frame_per_binding(self):
+        ast = resolve(parse('(let* ((a 1) (b a) (a b)) (list a b))'))
+        self.assertEqual([('a', 0, 0), ('b', 0, 0), ('a', 0, 0), ('b', 1, 0)], local_refs(ast))
+
+    def test_letrec_single_frame(self):
+        ast = resolve(parse('(letrec ((f (λ () g)) (g (λ () f))) f)'))
+        self.assertEqual([('g', 0, 1), ('f', 0, 0), ('f', 0, 0)], local_refs(ast))
+
+    def test_empty_formals_add_no_frame(self):
+        ast = resolve(parse('(λ (x) (delay (λ () x)))'))
+        self.assertEqual([('x', 0, 0)], local_refs(ast))
+
+    def test_define_sugar(self):
+        ast = resolve(parse('(define (f n) ;^ docs\n (inc n))'))
+        self.assertEqual([('n', 0, 0)], local_refs(ast))
+        self.assertEqual(';^ docs', ast[2])
+
+    def test_quoted_forms_untouched(self):
+        ast = resolve(parse("(λ (x) '(x y))"))
+        self.assertEqual([], local_refs(ast))
+
+    def test_unquoted_forms_resolved(self):
+        ast = resolve(parse("(λ (x) '(x ~x ~@x))"))
+        self.assertEqual([('x', 0, 0), ('x', 0, 0)], local_refs(ast))
+
+    def test_syntax_quote_id_frame(self):
+        ast = resolve(parse("(λ (x) `(x ~x (y ~`(~x))))"))
+        self.assertEqual([('x', 1, 0), ('x', 1, 0)], local_refs(ast))
+
+    def test_shadowed_special_form_is_applied(self):
+        ast = resolve(parse("(λ (if) (if 1 2))"))
+        self.assertEqual([('if', 0, 0)], local_refs(ast))
+
+    def test_branding_preserved(self):
+        ast = resolve(parse('(λ (x) x)'))
+        ref = ast[2]
+        self.assertEqual(7, ref.__location__)
+        self.assertEqual('(λ (x) x)', ref.__source__)
+
+    def test_idempotent(self):
+        ast = resolve(parse('(λ (x y) (λ (z) (list x z y)))'))
+        self.assertEqual(local_refs(ast), local_refs(resolve(ast)))
+
+    def test_evaluation(self):
+        for text, expected in [
+                ('((λ (a b . c) (fold + 0 c)) 1 2 3 4)', 7),
+                ('(let* ((a 1) (b (inc a)) (a (+ a b))) (* a b))', 6),
+                ('(letrec ((f (λ (n) (if (zero? n) 0 (+ n (f (dec n))))))) (f 10))', 55),
+                ('(let (n 0) (set! n 5) ((λ () n)))', 5),
+                ('(nth (map (λ (x) (* x x)) (range 10)) 7)', 49),
+                ('(second ((λ (x) `(x ~x)) 3))', 3)]:
+            self.assertEqual(expected, resolve(parse(text)).eval(ENV))
+
+    def test_lookup_falls_back_to_name(self):
+        ref = LocalRef('x', 3, 1)
+        env = Env().extend_frame(('y', 'x'), [1, 2])
+        self.assertEqual(2, ref.eval(env))
+
+
+if __name__ == '__main__':
+    unittest.main()
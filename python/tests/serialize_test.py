@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+import pickle
+import unittest
+import yalix.utils as utils
+from yalix.globals import create_initial_env, interop, __engines__
+from yalix.interpreter import Repr, make_list, realize
+from yalix.reader import read_form
+from yalix.serialize import dump, dumps, load, loads, referenced_names
+
+with utils.capture():
+    ENGINES = dict((engine, create_initial_env(engine=engine)) for engine in __engines__)
+    OTHER = create_initial_env()
+
+
+def evaluate(text, env, engine='interpreter'):
+    return __engines__[engine](read_form(text))(env)
+
+
+def show(value, env):
+    return Repr(value).eval(env)
+
+
+class SerializeTests(unittest.TestCase):
+
+    def test_closures(self):
+        for engine, env in ENGINES.items():
+            add_3 = evaluate('((lambda (n) (lambda (x) (+ x n))) 3)', env, engine)
+            restored = loads(dumps(add_3, env), OTHER)
+            OTHER['restored-add-3'] = restored
+            self.assertEqual(13, evaluate('(restored-add-3 10)', OTHER))
+
+    def test_globals_by_name(self):
+        env = ENGINES['interpreter']
+        self.assertIs(OTHER['map'], loads(dumps(env['map'], env), OTHER))
+        self.assertIs(OTHER['+'], loads(dumps(env['+'], env), OTHER))
+        # Numbers are not written by name, even if bound to one
+        self.assertEqual(20, loads(dumps(env['*print-length*'], env), OTHER))
+
+    def test_free_variables_only(self):
+        env = ENGINES['interpreter']
+        closure = evaluate('(let* ((big (range 5000)) (n 2)) (lambda (x) (* x n)))', env)
+        data = dumps(closure, env)
+        self.assertLess(len(data), len(dumps(evaluate('(range 5000)', env), env)))
+        OTHER['restored-double'] = loads(data, OTHER)
+        self.assertEqual(42, evaluate('(restored-double 21)', OTHER))
+        self.assertTrue({'x', 'n', '*'} <= referenced_names(closure.func))
+
+    def test_mutual_recursion(self):
+        env = ENGINES['interpreter']
+        closure = evaluate("""
+            (letrec ((ev? (lambda (n) (if (= n 0) #t (od? (- n 1)))))
+                     (od? (lambda (n) (if (= n 0) #f (ev? (- n 1))))))
+              ev?)""", env)
+        OTHER['restored-even?'] = loads(dumps(closure, env), OTHER)
+        self.assertTrue(evaluate('(restored-even? 10)', OTHER))
+
+    def test_lazy_sequences(self):
+        for engine, env in ENGINES.items():
+            squares = evaluate('(map (lambda (x) (* x x)) (iterate inc 0))', env, engine)
+            OTHER['restored-squares'] = loads(dumps(squares, env), OTHER)
+            self.assertEqual('(0 1 4 9)', show(evaluate('(take 4 restored-squares)', OTHER), OTHER))
+
+    def test_long_lists(self):
+        env = ENGINES['interpreter'].overlay()
+        strict = make_list(list(range(10000)))
+        realized = evaluate('(let (xs (range 10000)) (fold + 0 xs) xs)', env)
+        self.assertTrue(realized.realized)
+        for value in [strict, realized]:
+            restored = loads(dumps(value, env), OTHER)
+            self.assertEqual(list(range(10000)), realize(restored, OTHER))
+
+        # Only the realized prefix is flattened: the rest stays lazy
+        partial = evaluate('(let (xs (range 10000)) (nth xs 5000) xs)', env)
+        restored = loads(dumps(partial, env), OTHER)
+        self.assertEqual(list(range(10000)), realize(restored, OTHER))
+
+    def test_ast_nodes(self):
+        env = ENGINES['interpreter']
+        ast = loads(dumps(read_form('(fold + 0 (map (lambda (x) (* x x)) (range 4)))'), env), OTHER)
+        for engine in __engines__:
+            self.assertEqual(14, __engines__[engine](ast)(OTHER))
+
+    def test_unbound_global(self):
+        env = ENGINES['interpreter'].overlay()
+        evaluate('(define (only-here x) x)', env)
+        with self.assertRaises(pickle.UnpicklingError):
+            loads(dumps(env['only-here'], env), OTHER)
+
+    def test_unpicklable(self):
+        env = ENGINES['interpreter']
+        with self.assertRaises((pickle.PicklingError, AttributeError)):
+            dumps(interop(lambda x: x, 1), env)
+
+    def test_format(self):
+        out = io.BytesIO()
+        dump([1, 2], OTHER, out)
+        self.assertEqual([1, 2], load(io.BytesIO(out.getvalue()), OTHER))
+        with self.assertRaises(ValueError):
+            loads(pickle.dumps((-1, None)), OTHER)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from yalix.server import Server, evaluate
+from tests.support import ENV
+
+
+class EvaluateTests(unittest.TestCase):
+
+    def test_values_and_output(self):
+        response = evaluate(ENV, {'source': '(define (sq x) (* x x)) (print (sq 3)) (map sq (range 4))'})
+        self.assertEqual(['sq', 'None', '(0 1 4 9)'], response['values'])
+        self.assertEqual('9\n', response['output'])
+        self.assertIsNone(response['error'])
+
+    def test_isolation(self):
+        evaluate(ENV, {'source': '(define only-in-request 1)'})
+        response = evaluate(ENV, {'source': 'only-in-request'})
+        self.assertEqual('EvaluationError', response['error']['type'])
+        self.assertFalse('only-in-request' in ENV)
+
+    def test_errors(self):
+        self.assertEqual('ReadError', evaluate(ENV, {'source': '(+ 1'})['error']['type'])
+        self.assertEqual('FileNotFoundError', evaluate(ENV, {'file': '/nonexistent.ylx'})['error']['type'])
+
+
+class ServerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'yalix.sock')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def serve(self, client, workers=2):
+        async def main():
+            server = Server(workers=workers, timeout=5.0, env=ENV)
+            await server.start(self.path)
+            try:
+                return await client(server)
+            finally:
+                await server.close()
+        return asyncio.run(main())
+
+    async def request(self, *requests):
+        reader, writer = await asyncio.open_unix_connection(self.path)
+        responses = []
+        for request in requests:
+            writer.write(json.dumps(request).encode('utf-8') + b'\n')
+            await writer.drain()
+            responses.append(json.loads(await reader.readline()))
+        writer.close()
+        await writer.wait_closed()
+        return responses
+
+    def test_concurrent_clients(self):
+        async def client(server):
+            return await asyncio.gather(*[self.request({'source': '(define n {0}) (* n n)'.format(i)})
+                                          for i in range(6)])
+        responses = self.serve(client)
+        self.assertEqual([['n', str(i * i)] for i in range(6)], [r[0]['values'] for r in responses])
+
+    def test_timeout(self):
+        async def client(server):
+            return await self.request({'source': '(fold + 0 (iterate inc 0))', 'timeout': 0.2},
+                                      {'source': '(+ 1 2)'},
+                                      {'metrics': True})
+        timed_out, after, metrics = self.serve(client, workers=1)
+        self.assertEqual('TimeoutError', timed_out['error']['type'])
+        self.assertEqual(['3'], after['values'])
+        self.assertEqual(1, metrics['timeouts'])
+        self.assertEqual(2, metrics['requests'])
+        self.assertEqual(1, metrics['workers'])
+
+    def test_malformed_request(self):
+        async def client(server):
+            reader, writer = await asyncio.open_unix_connection(self.path)
+            writer.write(b'(+ 1 2)\n')
+            response = json.loads(await reader.readline())
+            writer.close()
+            return response
+        self.assertEqual('ValueError', self.serve(client)['error']['type'])
+
+    def test_invalid_timeout(self):
+        async def client(server):
+            return await self.request({'source': '(+ 1 2)', 'timeout': 'x'},
+                                      {'source': '(+ 1 2)', 'timeout': -1},
+                                      {'source': '(+ 40 2)', 'timeout': None})
+        invalid, negative, after = self.serve(client, workers=1)
+        self.assertEqual('ValueError', invalid['error']['type'])
+        self.assertEqual('ValueError', negative['error']['type'])
+        self.assertEqual(['42'], after['values'])
+
+    def test_worker_replaced_after_failure(self):
+        async def client(server):
+            worker = server.workers[0]
+
+            async def call(request, timeout):
+                # Fails once the request has been sent, leaving its response unread
+                worker.conn.send(request)
+                raise RuntimeError('failed')
+
+            worker.call = call
+            responses = await self.request({'source': '(+ 1 2)'}, {'source': '(+ 40 2)'})
+            self.assertFalse(worker in server.workers)
+            return responses
+        failure, after = self.serve(client, workers=1)
+        self.assertEqual('RuntimeError', failure['error']['type'])
+        self.assertEqual(['42'], after['values'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+from yalix.environment import Env
+from yalix.globals import create_initial_env, interop, __engines__
+from yalix.interpreter import Repr
+from yalix.reader import read_form
+from yalix.snapshot import snapshot, restore
+from yalix.utils import capture
+
+
+class SnapshotTests(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'env.snapshot')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def evaluate(self, env, text, engine='interpreter'):
+        return Repr(__engines__[engine](read_form(text))(env)).eval(env)
+
+    def round_trip(self, engine):
+        with capture():
+            env = create_initial_env(engine=engine)
+        self.evaluate(env, '(define (add-n n) (lambda (x) (+ x n)))', engine)
+        self.evaluate(env, '(define add-3 (add-n 3))', engine)
+        self.evaluate(env, '(define naturals (iterate inc 0))', engine)
+        self.evaluate(env, '(nth naturals 3)', engine)
+        snapshot(env, self.path)
+        return restore(self.path)
+
+    def test_engines(self):
+        for engine in __engines__:
+            env = self.round_trip(engine)
+            self.assertEqual('(1 2 3 4 5)', self.evaluate(env, '(take 5 (map inc (iterate inc 0)))', engine))
+            self.assertEqual('13', self.evaluate(env, '(add-3 10)', engine))
+            self.assertEqual('(0 1 2 3 4 5)', self.evaluate(env, '(take 6 naturals)', engine))
+            self.assertEqual('True', self.evaluate(env, '(< 1 2 3)', engine))
+
+    def test_docstrings_and_source(self):
+        env = self.round_trip('interpreter')
+        with capture() as out:
+            self.evaluate(env, '(doc map)')
+            self.evaluate(env, '(doc +)')
+            self.evaluate(env, '(source add-n)')
+        self.assertTrue('map (f xs)' in out[0])
+        self.assertTrue('+ (. xs)' in out[0])
+        self.assertTrue('add-n' in out[0])
+
+    def test_separate_from_original(self):
+        with capture():
+            env = create_initial_env()
+        snapshot(env, self.path)
+        restored = restore(self.path)
+        self.evaluate(restored, '(define only-restored 1)')
+        self.assertFalse('only-restored' in env)
+        self.assertTrue('only-restored' in restored)
+
+    def test_gensym_counter(self):
+        with capture():
+            env = create_initial_env()
+        snapshot(env, self.path)
+        counter = Env.counter
+        Env.counter = 0
+        try:
+            restore(self.path)
+            self.assertEqual(counter, Env.counter)
+        finally:
+            Env.counter = max(Env.counter, counter)
+
+    def test_unpicklable_interop(self):
+        env = Env()
+        env['square'] = interop(lambda x: x * x, 1)
+        with self.assertRaises((pickle.PicklingError, AttributeError)):
+            snapshot(env, self.path)
+
+    def test_format(self):
+        with open(self.path, 'wb') as f:
+            pickle.dump((-1, 0, Env()), f)
+        with self.assertRaises(ValueError):
+            restore(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+The fixtures shared by the tests: an environment bootstrapped once, quietly,
+for every test module to evaluate in (overlay it to keep definitions private
+to a test), and a tracer recording what it is told.
+"""
+
+import yalix.utils as utils
+from yalix.globals import create_initial_env, interpret
+from yalix.reader import read_form
+from yalix.tracing import Tracer
+
+
+def bootstrap(engine='interpreter'):
+    """ A freshly bootstrapped environment, without the progress being logged """
+    with utils.capture():
+        return create_initial_env(engine=engine)
+
+
+ENV = bootstrap()
+
+
+def run(text, env=ENV):
+    """ The value of the (first) form in the text, interpreted in the environment """
+    return interpret(read_form(text))(env)
+
+
+class RecordingTracer(Tracer):
+    """ Records each entry and exit, with the name applied and its arguments or value """
+
+    def __init__(self):
+        self.events = []
+
+    def enter(self, depth, caller, func, args):
+        self.events.append(('enter', caller.funexp.name, args))
+
+    def exit(self, depth, caller, func, value):
+        self.events.append(('exit', caller.funexp.name, value))
+
+    def entered(self):
+        """ The names applied, in order """
+        return [name for event, name, _ in self.events if event == 'enter']
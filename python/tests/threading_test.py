@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+import unittest
+import yalix.utils as utils
+from yalix.environment import GlobalFrame, binding
+from yalix.exceptions import EvaluationError
+from yalix.globals import interop
+from yalix.interpreter import List, Repr, set_thread_tracer, clear_thread_tracer
+from tests.support import ENV, RecordingTracer, run
+
+
+def on_threads(count, target):
+    """ Runs the target on each of count threads at once, returning their results in order """
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def start(index):
+        barrier.wait()
+        results[index] = target(index)
+
+    threads = [threading.Thread(target=start, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class PromiseTests(unittest.TestCase):
+
+    def test_forced_once(self):
+        calls = []
+
+        def slow():
+            calls.append(None)
+            time.sleep(0.01)
+            return len(calls)
+
+        env = ENV.overlay()
+        env['slow'] = interop(slow, 0)
+        run('(define p (delay (slow)))', env)
+        self.assertEqual([1] * 8, on_threads(8, lambda _: run('(force p)', env)))
+        self.assertEqual(1, len(calls))
+
+    def test_lazy_list_shared(self):
+        env = ENV.overlay()
+        run('(define xs (map inc (range 200)))', env)
+        expected = sum(range(1, 201))
+        self.assertEqual([expected] * 4, on_threads(4, lambda _: run('(fold + 0 xs)', env)))
+
+
+class DefinitionTests(unittest.TestCase):
+
+    def test_concurrent_definitions(self):
+        env = ENV.overlay()
+        version = env.global_frame.version
+
+        def define(index):
+            for n in range(50):
+                run('(define t{0}-{1} {1})'.format(index, n), env)
+
+        on_threads(4, define)
+        self.assertEqual(version + 200, env.global_frame.version)
+        self.assertEqual(49, run('t3-49', env))
+
+
+class BindingTests(unittest.TestCase):
+
+    def test_binding_form(self):
+        self.assertEqual(5, run('(binding ((*print-length* 5)) *print-length*)'))
+        self.assertEqual(20, run('*print-length*'))
+
+    def test_define_within_binding(self):
+        self.assertEqual(7, run('(binding ((*print-length* 5)) (define *print-length* 7) *print-length*)'))
+        self.assertEqual(20, run('*print-length*'))
+
+    def test_not_dynamic(self):
+        with self.assertRaises(EvaluationError):
+            run('(binding ((inc 1)) (inc 1))')
+
+    def test_print_length_per_thread(self):
+        xs = run('(range 10)')
+
+        def show(index):
+            with binding({'*print-length*': index + 1}):
+                time.sleep(0.01)
+                return Repr(xs).eval(ENV)
+
+        self.assertEqual(['(0 ...)', '(0 1 ...)', '(0 1 2 ...)'], on_threads(3, show))
+        self.assertEqual(20, ENV['*print-length*'])
+
+    def test_debug_per_thread(self):
+        self.assertIsNone(List.tracer)
+        with utils.capture() as out:
+            with binding({'*debug*': True}):
+                run('(inc 41)')
+            run('(dec 41)')
+
+        self.assertTrue('-> (inc 41)' in out[0])
+        self.assertFalse('dec' in out[0])
+        self.assertIsNone(List.tracer)
+        self.assertEqual(List.untraced_tail_eval, List.tail_eval)
+        self.assertFalse(ENV['*debug*'])
+
+    def test_thread_tracers(self):
+        tracers = [RecordingTracer(), None]
+
+        def trace(index):
+            set_thread_tracer(tracers[index])
+            try:
+                return run('(inc {0})'.format(index))
+            finally:
+                clear_thread_tracer()
+
+        self.assertEqual([1, 2], on_threads(2, trace))
+        self.assertEqual(['inc', 'add'], tracers[0].entered())
+        self.assertEqual(List.untraced_tail_eval, List.tail_eval)
+
+    def test_dynamic_names(self):
+        self.assertEqual({'*debug*', '*print-length*'}, GlobalFrame.dynamic)
+
+
+if __name__ == '__main__':
+    unittest.main()
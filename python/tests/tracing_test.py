@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import unittest
+import yalix.utils as utils
+from yalix.globals import create_initial_env, interop
+from yalix.interpreter import Cons, List, Symbol, frame_tracer, set_tracer
+from yalix.tracing import PrintTracer, describe
+from tests.support import ENV, RecordingTracer, run
+
+
+class TracingTests(unittest.TestCase):
+
+    def tearDown(self):
+        set_tracer(None)
+
+    def test_untraced_by_default(self):
+        self.assertIsNone(List.tracer)
+        self.assertEqual(List.untraced_tail_eval, List.tail_eval)
+
+    def test_enter_and_exit(self):
+        run('(define (trace-square x) (* x x))')
+        tracer = RecordingTracer()
+        set_tracer(tracer)
+        self.assertEqual(9, run('(trace-square (+ 1 2))'))
+        self.assertEqual([('enter', '+', [1, 2]),
+                          ('exit', '+', 3),
+                          ('enter', 'trace-square', [3]),
+                          ('enter', '*', [3, 3]),
+                          ('exit', '*', 9),
+                          ('exit', 'trace-square', 9)], tracer.events)
+
+    def test_special_forms_not_traced(self):
+        tracer = RecordingTracer()
+        set_tracer(tracer)
+        self.assertEqual(2, run('(if #t (let (x 2) x) 3)'))
+        self.assertEqual([], tracer.events)
+
+    def test_uninstalled(self):
+        tracer = RecordingTracer()
+        set_tracer(tracer)
+        set_tracer(None)
+        run('(inc 1)')
+        self.assertEqual([], tracer.events)
+        self.assertEqual(List.untraced_tail_eval, List.tail_eval)
+
+    def test_debug_watch(self):
+        env = ENV.overlay()
+        with utils.capture() as out:
+            run('(define *debug* #t)', env)
+            self.assertIsInstance(frame_tracer(env.global_frame), PrintTracer)
+            self.assertIsNone(List.tracer)
+            run('(inc 41)', env)
+            run('(define *debug* #f)', env)
+            self.assertIsNone(frame_tracer(env.global_frame))
+            run('(dec 41)', env)
+
+        self.assertTrue('-> (inc 41)' in out[0])
+        self.assertTrue('<- inc: 42' in out[0])
+        self.assertFalse('dec' in out[0])
+        self.assertEqual(List.untraced_tail_eval, List.tail_eval)
+
+    def test_debug_per_environment(self):
+        traced, untraced = ENV.overlay(), ENV.overlay()
+        with utils.capture() as out:
+            run('(define *debug* #t)', traced)
+            try:
+                run('(dec 41)', untraced)
+                # Bootstrapping another environment leaves tracing as it was
+                create_initial_env()
+                run('(inc 41)', traced)
+                self.assertEqual(sum(range(300)), run('(fold + 0 (range 300))', traced))
+            finally:
+                run('(define *debug* #f)', traced)
+
+        self.assertTrue('-> (inc 41)' in out[0])
+        self.assertFalse('dec' in out[0])
+        self.assertTrue('<- fold: 44850' in out[0])
+
+    def test_function_evaluated_once(self):
+        traced, untraced = ENV.overlay(), ENV.overlay()
+        calls = []
+        untraced['counted-inc'] = interop(lambda: calls.append(None) or untraced['inc'], 0)
+        with utils.capture():
+            run('(define *debug* #t)', traced)
+            try:
+                # Traced evaluation is installed, but no tracer applies here
+                self.assertEqual(42, run('((counted-inc) 41)', untraced))
+            finally:
+                run('(define *debug* #f)', traced)
+        self.assertEqual(1, len(calls))
+
+    def test_tail_calls(self):
+        tracer = RecordingTracer()
+        set_tracer(tracer)
+        self.assertEqual(sum(range(3000)), run('(fold + 0 (range 3000))'))
+        # Each iteration exits (with the value of the last) once the fold returns
+        exits = [event for event in tracer.events if event[:2] == ('exit', 'fold')]
+        self.assertEqual(3001, len(exits))
+        self.assertTrue(all(value == sum(range(3000)) for _, _, value in exits))
+
+    def test_describe(self):
+        self.assertEqual('nil', describe(None))
+        self.assertEqual('#t', describe(True))
+        self.assertEqual('"abc"', describe('abc'))
+        self.assertEqual('x', describe(Symbol('x')))
+        self.assertEqual('(1 ...)', describe(Cons(1, Cons(2))))
+        self.assertEqual('(1 ...)', describe(Cons(1, thunk=object())))
+        self.assertEqual('<closure>', describe(run('inc')))
+        self.assertEqual('<native>', describe(run('car')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Non-interactive evaluation of yalix programs, as run from scripts and job
+schedulers: each file (or standard input, named -) is evaluated in turn
+against a single bootstrapped environment, a top-level form at a time. There
+is no readline, history or prompting, and the bootstrap is quiet.
+
+    python main.py [--engine vm] [--no-cache] [--snapshot FILE] [--print] [file.ylx ...]
+
+The exit status is 0 once every file has been evaluated, or else that of the
+first failure: evaluation errors exit with status 1, while a program that
+cannot be read (or a file or snapshot that cannot be opened) exits with status 2.
+"""
+
+import argparse
+import pickle
+import sys
+
+from pyparsing import ParseException
+from .exceptions import EvaluationError, ReadError
+from .globals import __engines__, __readers__
+from .interpreter import Repr
+from .repl import initial_env
+from .source_view import source_view
+from .utils import capture
+
+EVALUATION_ERROR = 1
+READ_ERROR = 2
+
+
+def evaluate(stream, env, engine='interpreter', reader='reader', echo=None):
+    """
+    Evaluates each form read from the stream, as soon as it has been read,
+    passing the printed representation of its value to echo (if given)
+    """
+    prepare = __engines__[engine]
+    for ast in __readers__[reader](stream):
+        result = prepare(ast)(env)
+        if echo is not None:
+            echo(Repr(result).eval(env))
+
+
+def report(name, ex, err):
+    err.write('{0}: {1}: {2}\n'.format(name, type(ex).__name__, ex))
+    view = source_view(getattr(ex, 'primitive', None))
+    if view:
+        err.write(view + '\n')
+
+
+def run(files, engine='interpreter', reader='reader', cache=True, snapshot=None, echo=None, err=None):
+    """ Evaluates the files in order, stopping at the first failure, and returns the exit status """
+    err = err or sys.stderr
+    try:
+        with capture() as out:
+            env = initial_env(engine, reader, cache, snapshot)
+    except EvaluationError as ex:
+        err.write(out[0])
+        report('bootstrap', ex, err)
+        return EVALUATION_ERROR
+    except (OSError, ValueError, EOFError, pickle.UnpicklingError) as ex:
+        # A missing, truncated or incompatible snapshot (or core library)
+        report(snapshot or 'bootstrap', ex, err)
+        return READ_ERROR
+
+    for name in files:
+        try:
+            if name == '-':
+                evaluate(sys.stdin, env, engine, reader, echo)
+            else:
+                with open(name, encoding='utf-8') as f:
+                    evaluate(f, env, engine, reader, echo)
+
+        except EvaluationError as ex:
+            report(name, ex, err)
+            return EVALUATION_ERROR
+
+        except (ParseException, ReadError, OSError) as ex:
+            report(name, ex, err)
+            return READ_ERROR
+
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='yalix', description=__doc__.strip().split('\n\n')[0])
+    parser.add_argument('files', nargs='*', default=['-'], metavar='file',
+                        help='the programs to evaluate, in order (default: standard input)')
+    parser.add_argument('--engine', choices=list(__engines__), default='interpreter')
+    parser.add_argument('--reader', choices=list(__readers__), default='reader')
+    parser.add_argument('--no-cache', dest='cache', action='store_false',
+                        help='read the core libraries afresh, rather than from their cache')
+    parser.add_argument('--snapshot', metavar='FILE', help='restore the environment from a snapshot')
+    parser.add_argument('--print', dest='echo', action='store_true',
+                        help='print the value of each top-level form')
+    args = parser.parse_args(argv)
+
+    # Written out in blocks, rather than a line at a time, even to a terminal
+    if hasattr(sys.stdout, 'reconfigure'):
+        sys.stdout.reconfigure(line_buffering=False)
+    try:
+        return run(args.files, args.engine, args.reader, args.cache, args.snapshot, print if args.echo else None)
+    finally:
+        sys.stdout.flush()
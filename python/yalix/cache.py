@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+A cache of the forms read from source files: a library which has not changed
+since it was last loaded is unpickled, rather than read again. The cache files
+are kept in the directory named by the YALIX_CACHE_DIR environment variable,
+or else in yalix under the user's cache directory ($XDG_CACHE_HOME, by default
+~/.cache), so that nothing is written alongside the sources
+"""
+
+import hashlib
+import io
+import os
+import pickle
+
+# Part of each cache's key: a cache holds the pickled AST nodes (with their
+# __source__ references) as a reader produced them, and one written with a
+# different FORMAT is read afresh, not an error
+FORMAT = 1
+
+CACHE_DIR_VARIABLE = 'YALIX_CACHE_DIR'
+
+
+def cache_dir():
+    """ The directory the cache files are kept in """
+    if os.environ.get(CACHE_DIR_VARIABLE):
+        return os.environ[CACHE_DIR_VARIABLE]
+    user_cache = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(user_cache, 'yalix')
+
+
+def cache_path(path):
+    """ Where the forms read from the source file at path are cached """
+    # Name the cache file after the full path, so that same-named files in
+    # different directories do not clobber each other's caches
+    full_path = os.path.abspath(path)
+    digest = hashlib.sha1(full_path.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_dir(), '{0}-{1}c'.format(digest, os.path.basename(path)))
+
+
+def read_cached(path, reader, read):
+    """
+    Returns a list of the forms in the source file at path. If the cache is
+    fresh - written by the same reader, for a file with the same mtime and
+    content hash - the forms are loaded from it; otherwise they are read from
+    the file with read (which takes a stream), and the cache is rewritten
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+        mtime = os.fstat(f.fileno()).st_mtime_ns
+    key = (FORMAT, reader, mtime, hashlib.sha256(data).hexdigest())
+
+    forms = _load(cache_path(path), key)
+    if forms is None:
+        forms = list(read(io.StringIO(data.decode('utf-8'), newline=None)))
+        _store(cache_path(path), key, forms)
+    return forms
+
+
+def _load(filename, key):
+    try:
+        with open(filename, 'rb') as f:
+            cached_key, forms = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        # Corrupt, truncated or otherwise unreadable: it will be rewritten
+        return None
+    return forms if cached_key == key else None
+
+
+def _store(filename, key, forms):
+    # Written to a temporary file first, and then moved into place, so that a
+    # concurrent reader never sees a partly written cache
+    temp = '{0}.{1}.tmp'.format(filename, os.getpid())
+    try:
+        os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+        with open(temp, 'wb') as f:
+            pickle.dump((key, forms), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp, filename)
+    except (OSError, pickle.PicklingError):
+        # The cache is only an optimization: an unwritable location just
+        # means the file will be read again next time
+        try:
+            os.remove(temp)
+        except OSError:
+            pass
@@ -0,0 +1,360 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+An alternative execution engine: rather than walking the AST on every
+evaluation, each form is compiled once into a tree of nested Python closures,
+with all of the analysis (special form dispatch, lexical addressing, lambda
+formals and arity) done up-front. Compiled code and interpreted code share
+the same environments and runtime objects, so each may call the other.
+"""
+
+from .exceptions import EvaluationError
+from .interpreter import Closure, Define, Lambda, List, Promise, SpecialForm, \
+    Symbol, Atom, GlobalRef, LocalRef, Unbound, TailCall, make_list, trampoline
+from .resolver import extend, resolve, _brand_as
+
+
+def compile(ast):
+    """ Compiles the AST into a callable, which evaluates it under an environment """
+    return _compile(ast, None, False)
+
+
+class Code(object):
+    """ A lambda, analysed once at compile time """
+
+    __slots__ = ('func', 'body', 'names', 'arity', 'variadic', 'scope')
+
+    def __init__(self, func, body, names, arity, variadic, scope):
+        self.func = func
+        self.body = body
+        self.names = names
+        self.arity = arity
+        self.variadic = variadic
+        self.scope = scope
+
+    def __reduce__(self):
+        # The compiled body is a Python closure, which cannot be pickled: it is
+        # compiled again from the lambda when unpickled
+        return _code, (self.func.formals, self.func.body.body, self.scope)
+
+
+class CompiledClosure(Closure):
+    """ What a compiled lambda evaluates to """
+
+    def __init__(self, env, code):
+        self.env = env
+        self.func = code.func
+        self.code = code
+
+    def check_arity(self, caller, supplied):
+        code = self.code
+        if supplied != code.arity and not (code.variadic and supplied > code.arity):
+            Closure.check_arity(self, caller, supplied)
+
+    def apply_tail(self, env, caller):
+        self.check_arity(caller, len(caller.params))
+        extended_env = Closure.bind(self.env, self.func.formals, caller.params, env)
+        extended_env.stack_depth = env.stack_depth + 1
+        return TailCall(self.code.body, extended_env)
+
+    def apply_values(self, env, caller, values):
+        code = self.code
+        supplied = len(values)
+        if supplied != code.arity:
+            self.check_arity(caller, supplied)
+        if code.variadic:
+            values = list(values[:code.arity]) + [make_list(values[code.arity:])]
+
+        extended_env = self.env.extend_frame(code.names, values)
+        extended_env.stack_depth = env.stack_depth + 1
+        return TailCall(code.body, extended_env)
+
+
+def _compile(ast, scope, tail):
+    """
+    Returns a callable of env. When compiled in tail position, calling it may
+    return a TailCall, to be run by the caller's trampoline
+    """
+    if isinstance(ast, LocalRef):
+        return _interpreted(ast, scope, tail)
+
+    elif isinstance(ast, Symbol):
+        return _symbol(ast, scope)
+
+    elif isinstance(ast, Atom):
+        value = ast.value
+        return lambda env: value
+
+    elif isinstance(ast, List) and len(ast) > 0:
+        head = ast.funexp
+        if isinstance(head, Symbol) and head.name in __special_forms__ and \
+                (scope is None or scope.address(head.name) is None):
+            proc = __special_forms__[head.name](ast, scope, tail)
+            if proc is not None:
+                return proc
+
+        return _application(ast, scope, tail)
+
+    # Quotes, unquotes and anything else is left to the interpreter
+    return _interpreted(ast, scope, tail)
+
+
+def _interpreted(ast, scope, tail):
+    """ Falls back to evaluating the (resolved) AST with the interpreter """
+    node = resolve(ast, scope)
+    return node.tail_eval if tail else node.eval
+
+
+def _symbol(ast, scope):
+    name = ast.name
+    address = scope.address(name) if scope else None
+
+    if address is None:
+        return _brand_as(GlobalRef(name), ast).eval
+
+    depth, slot = address
+    if depth == 0:
+        return lambda env: env.frame.values[slot]
+    elif depth == 1:
+        return lambda env: env.frame.parent.values[slot]
+
+    def local_ref(env):
+        frame = env.frame
+        for _ in range(depth):
+            frame = frame.parent
+        return frame.values[slot]
+    return local_ref
+
+
+def _application(ast, scope, tail):
+    funexp = _compile(ast.funexp, scope, False)
+    params = [_compile(param, scope, False) for param in ast.params]
+
+    def apply(env):
+        value = funexp(env)
+        if isinstance(value, SpecialForm):
+            # Not known to be a special form until now: params stay unevaluated
+            result = value.apply_tail(env, ast)
+        else:
+            try:
+                apply_values = value.apply_values
+            except AttributeError:
+                raise EvaluationError(ast, 'Cannot invoke with: \'{0}\'', value)
+            result = apply_values(env, ast, [param(env) for param in params])
+
+        return result if tail else trampoline(result)
+
+    return apply
+
+
+def _body(exprs, scope, tail):
+    if not exprs:
+        return lambda env: None
+
+    init = [_compile(expr, scope, False) for expr in exprs[:-1]]
+    last = _compile(exprs[-1], scope, tail)
+    if not init:
+        return last
+
+    def body(env):
+        for expr in init:
+            expr(env)
+        return last(env)
+    return body
+
+
+def _formals(formals):
+    """ Returns the names, arity and variadic flag, or None if invalid """
+    if not isinstance(formals, List) or not all(isinstance(f, Symbol) for f in formals):
+        return None
+
+    variadic = Lambda.VARIADIC_MARKER in formals
+    if variadic and (sum(1 for f in formals if f == Lambda.VARIADIC_MARKER) > 1 or
+                     formals.index(Lambda.VARIADIC_MARKER) != len(formals) - 2):
+        return None
+
+    names = tuple(f.name for f in formals if f != Lambda.VARIADIC_MARKER)
+    if len(names) != len(set(names)):
+        return None
+
+    arity = len(names) - 1 if variadic else len(names)
+    return names, arity, variadic
+
+
+def _code(formals, body, scope):
+    analysis = _formals(formals)
+    if analysis is None:
+        return None
+    names, arity, variadic = analysis
+    func = Lambda(formals, *body)
+    return Code(func, _body(body, extend(scope, names), True), names, arity, variadic, scope)
+
+
+def _lambda(ast, scope, tail):
+    if len(ast.params) < 1:
+        return None
+    code = _code(ast.params[0], ast.params[1:], scope)
+    if code is None:
+        # Invalid formals are reported by the interpreter, when evaluated
+        return None
+    return lambda env: CompiledClosure(env, code)
+
+
+def _define(ast, scope, tail):
+    node = Define(*ast.params) if ast.params else None
+    if node is None:
+        return None
+
+    symbol = node.name()
+    body = node.body()
+    if isinstance(ast.params[0], List):
+        code = _code(List(*ast.params[0].args[1:]), body, scope)
+        if code is None:
+            return None
+        expr = lambda env: CompiledClosure(env, code)  # noqa: E731
+    elif len(body) > 1:
+        return None
+    elif len(body) == 0:
+        expr = lambda env: Unbound()  # noqa: E731
+    else:
+        expr = _compile(body[0], scope, False)
+
+    def define(env):
+        obj = expr(env)
+        node.set_docstring_on(obj)
+        node.set_source_on(obj)
+        env[symbol.name] = obj
+        return symbol
+    return define
+
+
+def _begin(ast, scope, tail):
+    return _body(ast.params, scope, tail)
+
+
+def _if(ast, scope, tail):
+    if len(ast.params) not in [2, 3]:
+        return None
+
+    test_expr = _compile(ast.params[0], scope, False)
+    then_expr = _compile(ast.params[1], scope, tail)
+    else_expr = _compile(ast.params[2], scope, tail) if len(ast.params) == 3 else lambda env: None
+
+    def if_(env):
+        if test_expr(env):
+            return then_expr(env)
+        else:
+            return else_expr(env)
+    return if_
+
+
+def _binding(binding):
+    if isinstance(binding, List) and len(binding) == 2 and isinstance(binding[0], Symbol):
+        return binding[0].name, binding[1]
+    return None
+
+
+def _let(ast, scope, tail):
+    binding = _binding(ast.params[0]) if ast.params else None
+    if binding is None:
+        return None
+
+    name, expr = binding
+    names = (name,)
+    expr = _compile(expr, scope, False)
+    body = _body(ast.params[1:], extend(scope, names), tail)
+
+    def let(env):
+        extended_env = env.extend_frame(names, [expr(env)])
+        extended_env.stack_depth = env.stack_depth + 1
+        return body(extended_env)
+    return let
+
+
+def _let_STAR(ast, scope, tail):
+    if not ast.params or not isinstance(ast.params[0], List):
+        return None
+
+    # Each binding is pushed into a frame of its own
+    bindings = []
+    for binding in ast.params[0]:
+        binding = _binding(binding)
+        if binding is None:
+            return None
+        name, expr = binding
+        bindings.append(((name,), _compile(expr, scope, False)))
+        scope = extend(scope, [name])
+
+    body = _body(ast.params[1:], scope, tail)
+
+    def let_STAR(env):
+        extended_env = env
+        for names, expr in bindings:
+            extended_env = extended_env.extend_frame(names, [expr(extended_env)])
+        extended_env.stack_depth = env.stack_depth + 1
+        return body(extended_env)
+    return let_STAR
+
+
+def _letrec(ast, scope, tail):
+    if not ast.params or not isinstance(ast.params[0], List):
+        return None
+
+    bindings = [_binding(binding) for binding in ast.params[0]]
+    if None in bindings:
+        return None
+
+    names = tuple(name for name, _ in bindings)
+    if len(names) != len(set(names)):
+        # Reported by the interpreter, when evaluated
+        return None
+
+    # All bindings share the one frame, and are visible to every expression
+    scope = extend(scope, names)
+    exprs = [_compile(expr, scope, False) for _, expr in bindings]
+    body = _body(ast.params[1:], scope, tail)
+
+    def letrec(env):
+        extended_env = env.extend_frame(names, [None] * len(names))
+        values = extended_env.frame.values
+        for slot, expr in enumerate(exprs):
+            values[slot] = expr(extended_env)
+        extended_env.stack_depth = env.stack_depth + 1
+        return body(extended_env)
+    return letrec
+
+
+def _set_PLING(ast, scope, tail):
+    if len(ast.params) != 2 or not isinstance(ast.params[0], Symbol):
+        return None
+
+    name = ast.params[0].name
+    expr = _compile(ast.params[1], scope, False)
+
+    def set_PLING(env):
+        value = expr(env)
+        try:
+            env.set_local(name, value)
+        except ValueError as ex:
+            raise EvaluationError(ast, str(ex))
+    return set_PLING
+
+
+def _delay(ast, scope, tail):
+    code = _code(List(), ast.params, scope)
+    return lambda env: Promise(CompiledClosure(env, code))
+
+
+__special_forms__ = {
+    'lambda': _lambda,
+    'λ': _lambda,
+    'define': _define,
+    'begin': _begin,
+    'if': _if,
+    'let': _let,
+    'let*': _let_STAR,
+    'letrec': _letrec,
+    'set!': _set_PLING,
+    'delay': _delay,
+}
@@ -1,68 +1,322 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import contextlib
 import threading
 
 
+class Frame(object):
+    """
+    The values bound by a single binding form (a lambda application, or a let,
+    let* or letrec binding), chained to the frame of the enclosing scope. The
+    resolver assigns each local variable reference a (depth, slot) lexical
+    address, which indexes directly into this chain.
+    """
+
+    __slots__ = ('names', 'values', 'parent')
+
+    def __init__(self, names, values, parent=None):
+        self.names = names
+        self.values = values
+        self.parent = parent
+
+
+class GlobalFrame(dict):
+    """
+    The global definitions, optionally layered over a parent frame which is
+    shared with other environments. Definitions are only ever written to this
+    layer, so any number of environments can share one bootstrapped parent
+    without seeing each other's definitions; names not defined in this layer
+    are looked up in the parent.
+
+    Each definition bumps the frame's version, so that a value cached from a
+    lookup (see GlobalRef) can be revalidated without looking it up again. A
+    definition made in a frame shared with overlays bumps shared_version as
+    well, as it may be visible through any of them.
+
+    Definitions are atomic: each is written, and the version bumped, under
+    one lock, so that definitions made concurrently on several threads are
+    neither lost nor stamped out of order. The dynamic variables, such as
+    *debug*, may be rebound on a thread of their own (see binding).
+    """
+
+    parent = None
+    version = 0
+    shared = False
+    shared_version = 0
+
+    def __init__(self, parent=None):
+        super(GlobalFrame, self).__init__()
+        self.parent = parent
+
+    # Callbacks, by name, which are called with the frame and the new value
+    # whenever that name is defined in any global frame (see watch)
+    watchers = {}
+
+    # The names which may be bound per thread, rather than only globally
+    dynamic = {'*debug*', '*print-length*'}
+
+    lock = threading.RLock()
+
+    def __setitem__(self, name, value):
+        if name in GlobalFrame.dynamic and _rebind(name, value):
+            return
+        with GlobalFrame.lock:
+            # The value is written before the version is bumped, so that a
+            # concurrent lookup can never cache an old value under a new version
+            dict.__setitem__(self, name, value)
+            self.touch()
+        watcher = GlobalFrame.watchers.get(name)
+        if watcher is not None:
+            watcher(self, value)
+
+    def __delitem__(self, name):
+        with GlobalFrame.lock:
+            dict.__delitem__(self, name)
+            self.touch()
+
+    @classmethod
+    def watch(cls, name, callback):
+        """
+        Calls the callback with the frame and the new value whenever name is
+        defined, so that its effect can be confined to that frame (and the
+        environments evaluating under it). Whenever it is bound on (or
+        defined while bound on) the current thread only, the frame is None;
+        on leaving the outermost binding, the value is ROOT, as the global
+        definition applies again
+        """
+        cls.watchers[name] = callback
+
+    def __getstate__(self):
+        # The tracer is installed again as *debug* is restored (see tracing.watch_debug)
+        state = self.__dict__.copy()
+        state.pop('tracer', None)
+        return state
+
+    def touch(self):
+        self.version += 1
+        if self.shared:
+            GlobalFrame.shared_version += 1
+
+    def __missing__(self, name):
+        if self.parent is None:
+            raise KeyError(name)
+        return self.parent[name]
+
+    def __contains__(self, name):
+        return dict.__contains__(self, name) or (self.parent is not None and name in self.parent)
+
+    def get(self, name, default=None):
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def merged(self):
+        """ A flattened copy of the definitions in every layer """
+        layers = []
+        frame = self
+        while frame is not None:
+            layers.append(frame)
+            frame = getattr(frame, 'parent', None)
+
+        merged = dict()
+        for layer in reversed(layers):
+            merged.update(dict.items(layer))
+        return merged
+
+
+# Passed to a watcher when a thread leaves its outermost binding of the name
+ROOT = object()
+
+_thread = threading.local()
+
+
+def thread_bindings():
+    """ The dynamic variables bound on the current thread, by name """
+    return getattr(_thread, 'bindings', {})
+
+
+def _notify(name, value):
+    watcher = GlobalFrame.watchers.get(name)
+    if watcher is not None:
+        watcher(None, value)
+
+
+def _rebind(name, value):
+    """ Updates the current thread's binding of the name, if it has one """
+    bindings = thread_bindings()
+    if name not in bindings:
+        return False
+    bindings[name] = value
+    _notify(name, value)
+    return True
+
+
+@contextlib.contextmanager
+def binding(values):
+    """
+    Binds the dynamic variables to the values (a dict, by name) on the current
+    thread only, for the extent of the with block. Lookups of them on this
+    thread see these values, as do definitions of them: they update the
+    binding, not the global frame. Other threads are unaffected.
+    """
+    for name in values:
+        if name not in GlobalFrame.dynamic:
+            raise ValueError('\'{0}\' is not a dynamic variable'.format(name))
+
+    outer = thread_bindings()
+    bindings = dict(outer)
+    bindings.update(values)
+    _thread.bindings = bindings
+    for name, value in values.items():
+        _notify(name, value)
+    try:
+        yield
+    finally:
+        _thread.bindings = outer
+        for name in values:
+            _notify(name, outer.get(name, ROOT))
+
+
 class Env(object):
 
     counter = 0
     lock = threading.Lock()
 
-    def __init__(self, local_stack=None, global_frame=None):
-        self.local_stack = local_stack if local_stack else list()
-        self.global_frame = global_frame if global_frame else dict()
-        self.lvar = set(name for name, _ in self.local_stack)
+    def __init__(self, frame=None, global_frame=None):
+        self.frame = frame
+        self.global_frame = global_frame if global_frame is not None else GlobalFrame()
         self.stack_depth = 0
 
+    def overlay(self):
+        """
+        A new (top-level) environment whose global frame is a private layer
+        over this environment's: it sees all of the definitions made here,
+        but its own definitions are not visible here, nor to any other
+        overlay. Definitions made here afterwards are visible to the overlay,
+        so this environment should be fully bootstrapped first.
+        Note: closures defined here continue to look up globals here, so
+        redefining a name in the overlay does not affect them.
+        """
+        self.global_frame.shared = True
+        return Env(global_frame=GlobalFrame(self.global_frame))
+
     def extend(self, name, value):
         """
-        Extend the local stack with the given name/value.
+        Extend the local stack with the given name/value, in a frame of its
+        own. This is constant time: the new frame points back at the existing
+        frames, which are shared (not copied) with this environment.
         Note 2: global frame is shared across extended environments.
         """
+        return Env(Frame((name,), [value], self.frame), self.global_frame)
 
-        # Prune any shadow bindings, before pushing new name/value
-        new_stack = [pair for pair in self.local_stack if pair[0] != name]
-        new_stack.append((name, value))
+    def extend_frame(self, names, values):
+        """
+        Extend the environment with a new lexical frame binding each of the
+        names to the corresponding value. An empty set of names does not
+        introduce a frame (the resolver does not count it when assigning
+        lexical addresses).
+        """
+        if not names:
+            return Env(self.frame, self.global_frame)
 
-        return Env(new_stack, self.global_frame)
+        return Env(Frame(names, values, self.frame), self.global_frame)
+
+    @property
+    def local_stack(self):
+        """
+        The visible local bindings as (name, value) pairs, outermost first;
+        shadowed bindings are omitted
+        """
+        seen = set()
+        stack = []
+        frame = self.frame
+        while frame is not None:
+            for slot in range(len(frame.names) - 1, -1, -1):
+                name = frame.names[slot]
+                if name not in seen:
+                    seen.add(name)
+                    stack.append((name, frame.values[slot]))
+            frame = frame.parent
+        stack.reverse()
+        return stack
+
+    def find_frame(self, name):
+        """
+        Traverses the frames, innermost first, returning the first frame and
+        slot which binds name, else (None, None)
+        """
+        frame = self.frame
+        while frame is not None:
+            if name in frame.names:
+                return frame, frame.names.index(name)
+            frame = frame.parent
+        return None, None
+
+    def lookup(self, name, depth, slot):
+        """
+        Fetch the value at the given lexical address, without searching by
+        name. Should the address not hold the named binding (e.g. when
+        evaluating a resolved form under an unexpected environment), falls
+        back to looking up by name.
+        """
+        frame = self.frame
+        while depth and frame is not None:
+            frame = frame.parent
+            depth -= 1
+
+        if frame is not None and slot < len(frame.names) and frame.names[slot] == name:
+            return frame.values[slot]
+
+        return self[name]
 
     def set_local(self, name, value):
         """
-        Traverses the local stack and sets the first instance of name with value
+        Traverses the local frames and sets the first instance of name with
+        value. As frames are shared, the update is visible to every
+        environment (and so every closure) extended from that frame.
         """
-        if name in self.lvar:
-            stack = self.local_stack
-            for i in range(1, len(stack) + 1):
-                if self.local_stack[-i][0] == name:
-                    self.local_stack[-i] = (name, value)
-                    return
+        frame, slot = self.find_frame(name)
+        if frame is None:
+            raise ValueError('Assignment disallowed: \'{0}\' is unbound in local environment'.format(name))
 
-        raise ValueError('Assignment disallowed: \'{0}\' is unbound in local environment'.format(name))
+        frame.values[slot] = value
 
     def __contains__(self, name):
         """
-        Look in the local stack first for the named item, then try the global frame
+        Look in the local frames first for the named item, then try the global frame
         """
-        return name in self.lvar or name in self.global_frame
+        frame = self.frame
+        while frame is not None:
+            if name in frame.names:
+                return True
+            frame = frame.parent
+
+        return name in self.global_frame or name in thread_bindings()
 
     def __getitem__(self, name):
         """
-        Look in the local stack first for the named item, then try the global frame
+        Look in the local frames first for the named item, then try the global frame
         """
-        if name in self.lvar:
-            stack = self.local_stack
-            while stack:
-                peek = stack[-1]
-                if peek[0] == name:
-                    return peek[1]
-                else:
-                    stack = stack[:-1]
+        frame = self.frame
+        while frame is not None:
+            if name in frame.names:
+                return frame.values[frame.names.index(name)]
+            frame = frame.parent
 
-        if name not in self.global_frame:
-            raise ValueError('\'{0}\' is unbound in environment'.format(name))
+        return self.lookup_global(name)
 
-        return self.global_frame[name]
+    def lookup_global(self, name):
+        """ Look in the global frame only for the named item, or this thread's binding of it """
+        if name in GlobalFrame.dynamic:
+            bindings = thread_bindings()
+            if name in bindings:
+                return bindings[name]
+        try:
+            return self.global_frame[name]
+        except KeyError:
+            raise ValueError('\'{0}\' is unbound in environment'.format(name))
 
     def __setitem__(self, name, value):
         """
@@ -71,6 +325,9 @@ class Env(object):
         self.global_frame[name] = value
 
     def items(self):
+        """ The global definitions, including those of any shared layers beneath """
+        if isinstance(self.global_frame, GlobalFrame):
+            return self.global_frame.merged().items()
         return self.global_frame.items()
 
     @classmethod
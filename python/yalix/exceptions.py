@@ -17,3 +17,19 @@ class EvaluationError(Exception):
         if line and col:
             msg += " at line:{0}, col:{1}".format(line, col)
         return msg
+
+
+class ReadError(Exception):
+    """ Reader specific error handling """
+
+    def __init__(self, message, source, location):
+        self.message = message
+        self.__source__ = source
+        self.__location__ = location
+
+    def __str__(self):
+        msg = self.message
+        line, col = source_view.line_col(self)
+        if line and col:
+            msg += " at line:{0}, col:{1}".format(line, col)
+        return msg
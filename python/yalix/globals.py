@@ -11,17 +11,45 @@ import math
 import time
 
 from .utils import log_progress
-from .parser import scheme_parser
+from . import parser
+from .cache import read_cached
+from .reader import read_form, read_stream
+from .resolver import resolve
+from .tracing import watch_debug
+from .compiler import compile
+from .parallel import pmap, pfilter, preduce
+from . import vm
 from .environment import Env
 from .exceptions import EvaluationError
-from .interpreter import Atom, InterOp, Lambda, List, \
-    Realize, Symbol, SpecialForm, Promise, __special_forms__
+from .interpreter import Atom, Cons, EnvProcedure, List, NativeProcedure, VariadicInterOp, \
+    Symbol, cons, is_pair, SpecialForm, Promise, __special_forms__
 
 
 __core_libraries__ = ['core', 'hof', 'num', 'macros', 'repr', 'test']
 
 
-def create_initial_env():
+def interpret(ast):
+    """ The default engine: walks the (resolved) AST on each evaluation """
+    return resolve(ast).eval
+
+
+# Each engine takes a parsed form, and returns a callable which evaluates
+# it under an environment
+__engines__ = {
+    'interpreter': interpret,
+    'compiler': compile,
+    'vm': vm.compile
+}
+
+# Each reader takes a stream of program text (such as a file object), and
+# returns an iterator over the parsed forms
+__readers__ = {
+    'reader': read_stream,
+    'pyparsing': parser.read_stream
+}
+
+
+def create_initial_env(engine='interpreter', reader='reader', cache=True):
     env = Env()
     with log_progress("Creating initial environment"):
         bootstrap_special_forms(env)
@@ -29,7 +57,7 @@ def create_initial_env():
 
     for lib in __core_libraries__:
         with log_progress("Loading library: " + lib):
-            bootstrap_lisp_functions(env, "../core/{0}.ylx".format(lib))
+            bootstrap_lisp_functions(env, "../core/{0}.ylx".format(lib), engine, reader, cache, fallbacks=True)
 
     return env
 
@@ -39,18 +67,26 @@ def gensym(prefix='G__'):
 
 
 def interop(fun, arity, variadic=False):
-    """ Helper to create a lisp function from a python function """
-    bind_variables = [gensym() for _ in range(arity)]
-
+    """
+    Helper to create a lisp function from a python function, called directly
+    with the evaluated arguments. The last argument of a variadic function
+    takes the remaining arguments, realized into a list
+    """
     if variadic:
-        # Insert the variadic marker at the last-but one position
-        formals = list(bind_variables)
-        formals.insert(-1, Lambda.VARIADIC_MARKER)
-        bind_variables[-1] = Realize(bind_variables[-1])
-    else:
-        formals = bind_variables
+        return VariadicInterOp(fun, arity - 1)
+    return NativeProcedure(fun, arity)
 
-    return Lambda(List(*formals), InterOp(fun, *bind_variables))
+
+def native(fun, arity, variadic=False, docstring=None, with_env=False):
+    """
+    Helper to create a lisp function which applies a python function directly
+    to its evaluated arguments (a variadic function takes at least arity),
+    preceded by the environment of the call if with_env
+    """
+    proc = EnvProcedure(fun, arity) if with_env else NativeProcedure(fun, arity, variadic)
+    if docstring:
+        proc.__docstring__ = docstring
+    return proc
 
 
 def doc(value):
@@ -87,6 +123,37 @@ def format_(format_spec, args=None):
     return format_spec.format(*args)
 
 
+def plus(*xs):
+    return functools.reduce(operator.add, xs, 0)
+
+
+def minus(x, *xs):
+    if not xs:
+        return operator.neg(x)
+    return functools.reduce(operator.sub, xs, x)
+
+
+def multiply(*xs):
+    return functools.reduce(operator.mul, xs, 1)
+
+
+def divide(x, *xs):
+    if not xs:
+        return operator.truediv(1, x)
+    return functools.reduce(operator.truediv, xs, x)
+
+
+def comparison(op):
+    """ An n-ary comparison, true if op holds for each successive pair of values """
+    def compare(x, *xs):
+        for y in xs:
+            if not op(x, y):
+                return False
+            x = y
+        return True
+    return compare
+
+
 def error(msg):
     raise EvaluationError(None, msg)
 
@@ -97,7 +164,7 @@ def atom_QUESTION(value):
 
 
 def pair_QUESTION(value):
-    return isinstance(value, tuple)
+    return is_pair(value)
 
 
 def promise_QUESTION(value):
@@ -105,37 +172,75 @@ def promise_QUESTION(value):
 
 
 def realized_QUESTION(value):
-    return promise_QUESTION(value) and value.realized
+    """ Checks if a promise has been forced, or a lazy sequence's tail has been """
+    return (promise_QUESTION(value) or isinstance(value, Cons)) and value.realized
 
 
 def read_string(value):
-    return scheme_parser().parseString(value, parseAll=True).asList()[0]
+    return read_form(value)
 
 
 def car(value):
     if value is None:
         return None
-    elif isinstance(value, tuple):
-        return value[0]
+    elif isinstance(value, Cons):
+        return value.head
     else:
         raise EvaluationError(
             value, "Cannot car on non-cons cell: '{0}'", value)
 
 
 def cdr(value):
+    """ The tail of a cons cell, which is left as a promise until forced """
     if value is None:
         return None
-    elif isinstance(value, tuple):
-        return value[1]
+    elif isinstance(value, Cons):
+        thunk = value.thunk
+        if thunk is not None and not thunk.realized:
+            return thunk
+        return value.tail()
     else:
         raise EvaluationError(
             value, "Cannot cdr on non-cons cell: '{0}'", value)
 
 
-def bootstrap_lisp_functions(env, from_file):
-    for ast in scheme_parser().parseFile(from_file, parseAll=True).asList():
-        # TODO: brand AST nodes with filename
-        ast.eval(env)
+def rest(value):
+    """ The (forced) tail of a cons cell: the thunk is then dropped from the cell """
+    if isinstance(value, Cons):
+        return value.tail()
+    return cdr(value)
+
+
+def defined_name(ast):
+    """ The name defined by a (parsed) define form, else None """
+    if isinstance(ast, List) and len(ast) > 1 and getattr(ast[0], 'name', None) == 'define':
+        target = ast[1]
+        if isinstance(target, List) and len(target) > 0:
+            target = target[0]
+        return getattr(target, 'name', None)
+    return None
+
+
+def bootstrap_lisp_functions(env, from_file, engine='interpreter', reader='reader', cache=True, fallbacks=False):
+    prepare = __engines__[engine]
+
+    def load(ast):
+        # In the core libraries, a lisp definition of a name bound to a native
+        # is its fallback, so is only made where the native is not bootstrapped
+        if not (fallbacks and isinstance(env.global_frame.get(defined_name(ast)), NativeProcedure)):
+            prepare(ast)(env)
+
+    if cache:
+        # Unchanged files are loaded from the cache, rather than read again
+        for ast in read_cached(from_file, reader, __readers__[reader]):
+            load(ast)
+        return
+
+    with open(from_file, encoding='utf-8') as f:
+        # Each form is evaluated as soon as it has been read
+        for ast in __readers__[reader](f):
+            # TODO: brand AST nodes with filename
+            load(ast)
 
 
 class EvalWrapper(object):
@@ -156,6 +261,8 @@ def bootstrap_special_forms(env):
 def bootstrap_python_functions(env):
     env = EvalWrapper(env)
 
+    # Defining *debug* as a truth value switches on tracing
+    watch_debug()
     env['*debug*'] = Atom(False)
     env['nil'] = Atom(None)
     env['nil?'] = interop(lambda x: x is None, 1)
@@ -163,9 +270,11 @@ def bootstrap_python_functions(env):
     env['pair?'] = interop(pair_QUESTION, 1)
     env['promise?'] = interop(promise_QUESTION, 1)
     env['realized?'] = interop(realized_QUESTION, 1)
-    env['cons'] = interop(lambda x, y: (x, y), 2)
+    env['cons'] = interop(cons, 2)
     env['car'] = interop(car, 1)
     env['cdr'] = interop(cdr, 1)
+    env['rest'] = interop(rest, 1)
+    env['next'] = interop(rest, 1)
     env['gensym'] = interop(gensym, 0)
     env['symbol'] = interop(lambda x: Symbol(x), 1)
     env['symbol?'] = interop(lambda x: isinstance(x, Symbol), 1)
@@ -179,6 +288,18 @@ def bootstrap_python_functions(env):
     env['error'] = interop(error, 1)
     env['epoch-time'] = interop(time.time, 0)
 
+    # Parallel Higher-order Functions, over a pool of worker processes
+    env['pmap'] = native(pmap, 2, with_env=True,
+                         docstring='pmap (f xs)\n  Returns a list of f applied to each element of the (finite)'
+                                   ' sequence,\n  evaluated in parallel, in chunks. f should not have side-effects.')
+    env['pfilter'] = native(pfilter, 2, with_env=True,
+                            docstring='pfilter (pred xs)\n  Returns a list of the elements of the (finite) sequence'
+                                      ' for\n  which pred is true, evaluated in parallel, in chunks.')
+    env['preduce'] = native(preduce, 3, with_env=True,
+                            docstring='preduce (f val xs)\n  As fold, but each chunk of the (finite) sequence is'
+                                      ' reduced\n  in parallel, then the results combined in order: f must be'
+                                      ' associative.')
+
     # Basic Arithmetic Functions
     env['add'] = interop(operator.add, 2)
     env['sub'] = interop(operator.sub, 2)
@@ -187,6 +308,18 @@ def bootstrap_python_functions(env):
     env['quot'] = interop(operator.floordiv, 2)
     env['negate'] = interop(operator.neg, 1)
 
+    # Variadic Arithmetic Functions (see core/num.ylx for the lisp equivalents)
+    env['+'] = native(plus, 0, variadic=True,
+                      docstring='+ (. xs)\n  Returns the sum of numbers. (+) returns 0.')
+    env['-'] = native(minus, 1, variadic=True,
+                      docstring='- (x . xs)\n  If just one argument is supplied, returns the negation of that value,'
+                                '\n  else subtracts the values successively.')
+    env['*'] = native(multiply, 0, variadic=True,
+                      docstring='* (. xs)\n  Returns the product of the numbers. (*) returns 1.')
+    env['/'] = native(divide, 1, variadic=True,
+                      docstring='/ (x . xs)\n  If just one argument is supplied, returns the reciprocal of that value,'
+                                '\n  else divides the values successively.')
+
     # String / Sequence Functions
     env['contains?'] = interop(operator.contains, 2)
 
@@ -203,11 +336,11 @@ def bootstrap_python_functions(env):
 
     # Comparison & Ordering
     env['not='] = interop(operator.ne, 2)
-    env['<'] = interop(operator.lt, 2)
-    env['<='] = interop(operator.le, 2)
-    env['='] = interop(operator.eq, 2)
-    env['>='] = interop(operator.ge, 2)
-    env['>'] = interop(operator.gt, 2)
+    env['<'] = native(comparison(operator.lt), 1, variadic=True)
+    env['<='] = native(comparison(operator.le), 1, variadic=True)
+    env['='] = native(comparison(operator.eq), 1, variadic=True)
+    env['>='] = native(comparison(operator.ge), 1, variadic=True)
+    env['>'] = native(comparison(operator.gt), 1, variadic=True)
 
     env['random'] = interop(random.random, 0)
 
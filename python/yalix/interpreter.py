@@ -6,12 +6,44 @@ Takes an AST (abstract syntax tree) and an environment in order to
 evaluate the AST under the environment
 """
 
-from . import utils
+import io
+import threading
+import weakref
+
 from abc import ABCMeta, abstractmethod
-from .environment import Env
+from .environment import Env, GlobalFrame, binding
 from .exceptions import EvaluationError
 
 
+class TailCall(object):
+    """
+    A call in tail position: rather than being made directly (and so consuming
+    a Python stack frame), it is handed back to the enclosing trampoline, which
+    then makes the call once the caller's frame has unwound.
+    """
+
+    __slots__ = ('func', 'args')
+
+    def __init__(self, func, *args):
+        self.func = func
+        self.args = args
+
+
+def trampoline(result):
+    """ Runs tail calls until a value is produced """
+    while type(result) is TailCall:
+        result = result.func(*result.args)
+    return result
+
+
+def make_list(values):
+    """ A (strict) linked list of cons cells holding the values """
+    result = None
+    for value in reversed(values):
+        result = Cons(value, result)
+    return result
+
+
 class Primitive(object):
     __metaclass__ = ABCMeta
 
@@ -22,9 +54,27 @@ class Primitive(object):
     def eval(self, env):
         raise NotImplementedError()
 
+    def tail_eval(self, env):
+        """
+        Evaluate in tail position: may return a TailCall, which must be
+        passed to trampoline() to produce a value
+        """
+        return self.eval(env)
+
     def apply(self, env, caller):
         raise EvaluationError(self, 'Cannot invoke with: \'{0}\'', self)
 
+    def apply_tail(self, env, caller):
+        """ Apply in tail position: may return a TailCall """
+        return self.apply(env, caller)
+
+    def apply_values(self, env, caller, values):
+        """
+        Apply to arguments which have already been evaluated (as compiled code
+        does), in tail position: may return a TailCall
+        """
+        raise EvaluationError(self, 'Cannot invoke with: \'{0}\'', self)
+
     def quoted_form(self, env):
         return self.eval(env)
 
@@ -44,6 +94,73 @@ class InterOp(Primitive):
             raise EvaluationError(self, str(ex))
 
 
+class NativeProcedure(Primitive):
+    """
+    A Python function, applied directly to the evaluated arguments without
+    extending the environment. A variadic procedure takes at least arity
+    arguments.
+    """
+
+    def __init__(self, func, arity, variadic=False):
+        self.func = func
+        self.arity = arity
+        self.variadic = variadic
+
+    def eval(self, env):
+        return self
+
+    def check_arity(self, caller, supplied):
+        if supplied < self.arity or (not self.variadic and supplied != self.arity):
+            raise EvaluationError(self,
+                                  'Call to \'{0}\' applied with insufficient arity: {1} args expected, {2} supplied',
+                                  getattr(caller.funexp, 'name', caller.funexp),
+                                  self.arity,
+                                  supplied)
+
+    def apply(self, env, caller):
+        return self.apply_values(env, caller, [param.eval(env) for param in caller.params])
+
+    def apply_values(self, env, caller, values):
+        self.check_arity(caller, len(values))
+        try:
+            return self.func(*values)
+        except TypeError as ex:
+            raise EvaluationError(caller, str(ex))
+
+
+class VariadicInterOp(NativeProcedure):
+    """
+    A Python function applied directly to the first arity (evaluated)
+    arguments, plus the remaining arguments realized into a list - or None,
+    if there are none.
+    """
+
+    def __init__(self, func, arity):
+        super(VariadicInterOp, self).__init__(func, arity, variadic=True)
+
+    def apply_values(self, env, caller, values):
+        self.check_arity(caller, len(values))
+        rest = [realize(value, env) for value in values[self.arity:]]
+        try:
+            return self.func(*(list(values[:self.arity]) + [rest or None]))
+        except TypeError as ex:
+            raise EvaluationError(caller, str(ex))
+
+
+class EnvProcedure(NativeProcedure):
+    """
+    A Python function applied directly to the environment it is called in,
+    followed by the evaluated arguments
+    """
+
+    def apply_values(self, env, caller, values):
+        self.check_arity(caller, len(values))
+        try:
+            return self.func(env, *values)
+        except TypeError as ex:
+            raise EvaluationError(caller, str(ex))
+
+
 class SpecialForm(Primitive):
     """ A proxy for other built-in types """
 
@@ -57,6 +174,9 @@ class SpecialForm(Primitive):
         """ Don't evaluate params for special forms """
         return self.impl(*caller.params).eval(env)
 
+    def apply_tail(self, env, caller):
+        return self.impl(*caller.params).tail_eval(env)
+
 
 class Atom(Primitive):
     """ An atom """
@@ -84,44 +204,67 @@ class Closure(Primitive):
     @classmethod
     def bind(cls, env_to_extend, formals, params, caller_env):
         """
-        Extend the closure's environment by binding the
+        Extend the closure's environment with a new frame, binding the
         params to the functions formals
         """
+        names = []
+        values = []
         for i, bind_variable in enumerate(formals):
             if bind_variable == Lambda.VARIADIC_MARKER:  # variadic arg indicator
                 # Use the next formal as the /actual/ bind variable,
                 # evaluate the remaining arguments into a list (NOTE offset from i)
                 # and dont process any more arguments
                 bind_variable = formals[i + 1]
-                value = List.make_lazy_list(params[i:]).eval(caller_env)
-                env_to_extend = env_to_extend.extend(bind_variable.name, value)
+                names.append(bind_variable.name)
+                values.append(make_list([param.eval(caller_env) for param in params[i:]]))
                 break
             else:
-                value = params[i].eval(caller_env)
-                env_to_extend = env_to_extend.extend(bind_variable.name, value)
-        return env_to_extend
+                names.append(bind_variable.name)
+                values.append(params[i].eval(caller_env))
+        return env_to_extend.extend_frame(tuple(names), values)
 
-    def apply(self, env, caller):
-        if not self.func.has_sufficient_arity(caller.params):
+    @classmethod
+    def bind_values(cls, env_to_extend, formals, values):
+        """
+        As bind, but the values have already been evaluated: any variadic
+        values are packed into a list
+        """
+        try:
+            i = formals.index(Lambda.VARIADIC_MARKER)
+        except ValueError:
+            names = [f.name for f in formals]
+        else:
+            names = [f.name for f in formals[:i]] + [formals[i + 1].name]
+            values = list(values[:i]) + [make_list(values[i:])]
+        return env_to_extend.extend_frame(tuple(names), values)
+
+    def check_arity(self, caller, supplied):
+        arity = self.func.arity()
+        variadic = self.func.is_variadic()
+
+        if supplied < arity or (not variadic and supplied != arity):
             raise EvaluationError(self,
                                   'Call to \'{0}\' applied with insufficient arity: {1} args expected, {2} supplied',
                                   # FIXME: probably ought rely on __repr__ of symbol here....
-                                  caller.funexp.name,
-                                  self.func.arity(),
-                                  len(caller.params))
+                                  getattr(caller.funexp, 'name', caller.funexp),
+                                  arity,
+                                  supplied)
 
-        if not self.func.is_variadic() and len(self.func.formals) != len(caller.params):
-            raise EvaluationError(self,
-                                  'Call to \'{0}\' applied with excessive arity: {1} args expected, {2} supplied',
-                                  # FIXME: probably ought rely on __repr__ of symbol here....
-                                  caller.funexp.name,
-                                  self.func.arity(),
-                                  len(caller.params))
+    def apply(self, env, caller):
+        return trampoline(self.apply_tail(env, caller))
 
+    def apply_tail(self, env, caller):
+        self.check_arity(caller, len(caller.params))
         extended_env = Closure.bind(
             self.env, self.func.formals, caller.params, env)
         extended_env.stack_depth = env.stack_depth + 1
-        return self.func.body.eval(extended_env)
+        return TailCall(self.func.body.tail_eval, extended_env)
+
+    def apply_values(self, env, caller, values):
+        self.check_arity(caller, len(values))
+        extended_env = Closure.bind_values(self.env, self.func.formals, values)
+        extended_env.stack_depth = env.stack_depth + 1
+        return TailCall(self.func.body.tail_eval, extended_env)
 
 
 class ForwardRef(Primitive):
@@ -142,6 +285,12 @@ class ForwardRef(Primitive):
         """ Don't evaluate params for special forms """
         return self.reference.apply(env, caller)
 
+    def apply_tail(self, env, caller):
+        return self.reference.apply_tail(env, caller)
+
+    def apply_values(self, env, caller, values):
+        return self.reference.apply_values(env, caller, values)
+
 
 # http://code.activestate.com/recipes/474088/
 class List(Primitive):
@@ -171,9 +320,8 @@ class List(Primitive):
     @classmethod
     def make_lazy_list(cls, arr):
         t = Atom(None)
-        while arr:
-            t = List(Symbol('cons'), arr[-1], Delay(t))
-            arr = arr[:-1]
+        for arg in reversed(arr):
+            t = List(Symbol('cons'), arg, Delay(t))
         return t
 
     def splice_args(self, args, env):
@@ -190,16 +338,163 @@ class List(Primitive):
         return List.make_lazy_list([quote(a) for a in self.splice_args(self.args, env)]).eval(env)
 
     def eval(self, env):
+        return trampoline(self.tail_eval(env))
+
+    def untraced_tail_eval(self, env):
         if self.args:
             value = self.funexp.eval(env)
-            if env['*debug*']:
-                utils.debug('{0}{1} {2}', '  ' * env.stack_depth,
-                            self.funexp.name, self.params)
             try:
-                return value.apply(env, self)
+                apply_tail = value.apply_tail
             except AttributeError:
                 raise EvaluationError(
                     self, 'Cannot invoke with: \'{0}\'', value)
+            return apply_tail(env, self)
+
+    def traced_tail_eval(self, env):
+        """
+        As tail_eval, but reporting the application of a function to the
+        tracer: on entry, with the evaluated arguments, and on exit, with the
+        value returned. The call is still made in tail position: its exit is
+        reported once the trampoline produces its value (see _traced_step).
+        """
+        if not self.args:
+            return None
+
+        value = self.funexp.eval(env)
+        if type(value) is ForwardRef:
+            # A function bound by letrec, such as a recursive helper
+            value = value.reference
+        if not isinstance(value, (Closure, NativeProcedure)):
+            # Special forms (and the like) take their params unevaluated
+            try:
+                apply_tail = value.apply_tail
+            except AttributeError:
+                raise EvaluationError(
+                    self, 'Cannot invoke with: \'{0}\'', value)
+            return apply_tail(env, self)
+
+        # A thread tracing on its own (see set_thread_tracer) overrides the
+        # tracer, which overrides that of the global frame
+        tracer = getattr(_tracing, 'tracer', _UNSET)
+        if tracer is _UNSET:
+            tracer = List.tracer
+            if tracer is None:
+                tracer = frame_tracer(env.global_frame)
+        if tracer is None:
+            # Applied as untraced, without evaluating the function again
+            return value.apply_tail(env, self)
+
+        args = [param.eval(env) for param in self.params]
+        tracer.enter(env.stack_depth, self, value, args)
+        return _traced_step([(tracer, env.stack_depth, self, value)], TailCall(value.apply_values, env, self, args))
+
+    # Swapped for traced_tail_eval while a tracer is installed (see set_tracer),
+    # so that untraced evaluation pays nothing for tracing
+    tracer = None
+    tail_eval = untraced_tail_eval
+
+
+def _traced_step(pending, call):
+    """
+    Makes the call on behalf of the traced applications pending (innermost
+    last), which are reported as exited once it produces a value. A tail call
+    is handed back to the trampoline, with the applications still pending,
+    so that tracing consumes no more of the Python stack than evaluation does
+    """
+    try:
+        result = call.func(*call.args)
+    except BaseException:
+        for tracer, depth, caller, func in reversed(pending):
+            tracer.unwind(depth, caller, func)
+        raise
+
+    if type(result) is TailCall:
+        if result.func is _traced_step:
+            # A traced application in tail position: it is pending too
+            pending.extend(result.args[0])
+            result = result.args[1]
+        return TailCall(_traced_step, pending, result)
+
+    for tracer, depth, caller, func in reversed(pending):
+        tracer.exit(depth, caller, func, result)
+    return result
+
+
+# The tracers of threads tracing on their own, and how many there are
+_tracing = threading.local()
+_thread_tracers = 0
+# The global frames with a tracer, by id
+_traced_frames = weakref.WeakValueDictionary()
+_tracers_lock = threading.Lock()
+_UNSET = object()
+
+
+def _install():
+    traced = List.tracer is not None or _thread_tracers > 0 or len(_traced_frames) > 0
+    List.tail_eval = List.traced_tail_eval if traced else List.untraced_tail_eval
+
+
+def set_tracer(tracer):
+    """
+    Installs the tracer, to which the interpreter reports each application of
+    a function (see List.traced_tail_eval), whatever the environment; None
+    uninstalls it
+    """
+    with _tracers_lock:
+        List.tracer = tracer
+        _install()
+
+
+def set_thread_tracer(tracer):
+    """
+    Installs the tracer for the current thread only, in place of any installed
+    by set_tracer; None stops this thread tracing, whatever the other threads do
+    """
+    global _thread_tracers
+    with _tracers_lock:
+        if not hasattr(_tracing, 'tracer'):
+            _thread_tracers += 1
+        _tracing.tracer = tracer
+        _install()
+
+
+def set_frame_tracer(frame, tracer):
+    """
+    Installs the tracer for evaluation under the global frame only (and any
+    overlays of it which install none of their own); None uninstalls it
+    """
+    with _tracers_lock:
+        frame.tracer = tracer
+        if tracer is None:
+            _traced_frames.pop(id(frame), None)
+        else:
+            _traced_frames[id(frame)] = frame
+        _install()
+
+
+def frame_tracer(frame):
+    """ The tracer for evaluation under the global frame: that of the nearest layer to have one installed """
+    while frame is not None:
+        tracer = getattr(frame, 'tracer', _UNSET)
+        if tracer is not _UNSET:
+            return tracer
+        frame = getattr(frame, 'parent', None)
+    return None
+
+
+def thread_tracer(default=None):
+    """ The tracer installed for the current thread only, else the default """
+    return getattr(_tracing, 'tracer', default)
+
+
+def clear_thread_tracer():
+    """ The current thread goes back to the tracer installed by set_tracer """
+    global _thread_tracers
+    with _tracers_lock:
+        if hasattr(_tracing, 'tracer'):
+            del _tracing.tracer
+            _thread_tracers -= 1
+            _install()
 
 
 class BuiltIn(Primitive):
@@ -242,6 +537,82 @@ class Symbol(BuiltIn):
             return self
 
 
+class LocalRef(Symbol):
+    """
+    A reference to a local variable, whose lexical address (the number of
+    frames to walk up, and the slot within that frame) has been fixed ahead
+    of evaluation by the resolver.
+    """
+
+    def __init__(self, name, depth, slot):
+        self.name = name
+        self.depth = depth
+        self.slot = slot
+
+    def eval(self, env):
+        try:
+            return env.lookup(self.name, self.depth, self.slot)
+        except ValueError as ex:
+            raise EvaluationError(self, str(ex))
+
+
+class GlobalRef(Symbol):
+    """
+    A reference to a global variable: the resolver found no lexical binding
+    for it, so the local frames are not searched. The value is cached along
+    with the global frame it was read from and that frame's version stamps,
+    and is only looked up again once a definition has been made since.
+    Dynamic variables are never cached, as their value depends on the thread.
+    """
+
+    _uncached = (None, None, None, None)
+
+    def __init__(self, name):
+        self.name = name
+        self.cache = GlobalRef._uncached
+
+    def __getstate__(self):
+        # Cached values (and the frames they came from) are not part of the AST
+        state = self.__dict__.copy()
+        state.pop('cache', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.cache = GlobalRef._uncached
+
+    def lookup(self, env):
+        """ The value of the global, raising a ValueError if it is unbound """
+        frame = env.global_frame
+        cached_frame, version, shared_version, value = self.cache
+        if cached_frame is frame and version == frame.version and shared_version == GlobalFrame.shared_version:
+            return value
+        return self.refresh(env)
+
+    def refresh(self, env):
+        """ Looks up the value of the global again, and caches it """
+        frame = env.global_frame
+        # The stamps are read before the value, so a definition made meanwhile
+        # invalidates what is cached
+        version, shared_version = getattr(frame, 'version', None), GlobalFrame.shared_version
+        value = env.lookup_global(self.name)
+        if isinstance(frame, GlobalFrame) and self.name not in GlobalFrame.dynamic:
+            self.cache = (frame, version, shared_version, value)
+        return value
+
+    def eval(self, env):
+        # As lookup, with the cache check inlined: this is the most frequent
+        # operation when evaluating
+        frame = env.global_frame
+        cached_frame, version, shared_version, value = self.cache
+        if cached_frame is frame and version == frame.version and shared_version == GlobalFrame.shared_version:
+            return value
+        try:
+            return self.refresh(env)
+        except ValueError as ex:
+            raise EvaluationError(self, str(ex))
+
+
 class Quote(BuiltIn):
     """ Makes no effort to call the supplied expression when evaluated """
 
@@ -297,10 +668,14 @@ class Body(BuiltIn):
         self.body = body
 
     def eval(self, env):
-        result = None
-        for expr in self.body:
-            result = expr.eval(env)
-        return result
+        return trampoline(self.tail_eval(env))
+
+    def tail_eval(self, env):
+        if not self.body:
+            return None
+        for expr in self.body[:-1]:
+            expr.eval(env)
+        return self.body[-1].tail_eval(env)
 
 
 class Let(BuiltIn):
@@ -312,10 +687,13 @@ class Let(BuiltIn):
         self.body = Body(*body)
 
     def eval(self, env):
+        return trampoline(self.tail_eval(env))
+
+    def tail_eval(self, env):
         value = self.expr.eval(env)
-        extended_env = env.extend(self.binding_form.name, value)
+        extended_env = env.extend_frame((self.binding_form.name,), [value])
         extended_env.stack_depth = env.stack_depth + 1
-        return self.body.eval(extended_env)
+        return self.body.tail_eval(extended_env)
 
 
 class Let_STAR(BuiltIn):
@@ -326,13 +704,16 @@ class Let_STAR(BuiltIn):
         self.body = Body(*body)
 
     def eval(self, env):
+        return trampoline(self.tail_eval(env))
+
+    def tail_eval(self, env):
         extended_env = env
         for symbol, expr in self.bindings:
             value = expr.eval(extended_env)
-            extended_env = extended_env.extend(symbol.name, value)
+            extended_env = extended_env.extend_frame((symbol.name,), [value])
 
         extended_env.stack_depth = env.stack_depth + 1
-        return self.body.eval(extended_env)
+        return self.body.tail_eval(extended_env)
 
 
 class LetRec(BuiltIn):
@@ -343,10 +724,11 @@ class LetRec(BuiltIn):
         self.body = Body(*body)
 
     def eval(self, env):
-        extended_env = env
+        return trampoline(self.tail_eval(env))
 
+    def tail_eval(self, env):
         # All names are created first and filled with forward
-        # references and bound to the environment
+        # references and bound to the environment, in a single frame
         forward_refs = {}
         for symbol, _ in self.bindings:
 
@@ -355,16 +737,18 @@ class LetRec(BuiltIn):
                 raise EvaluationError(
                     self, "'{0}' is not distinct in letrec", symbol)
 
-            ref = ForwardRef()
-            forward_refs[symbol] = ref
-            extended_env = extended_env.extend(symbol.name, ref)
+            forward_refs[symbol] = ForwardRef()
+
+        extended_env = env.extend_frame(
+            tuple(symbol.name for symbol in forward_refs),
+            list(forward_refs.values()))
 
         # Then the binding expressions are evaluated and set in the fwd-refs
         for symbol, expr in self.bindings:
             forward_refs[symbol].reference = expr.eval(extended_env)
 
         extended_env.stack_depth = env.stack_depth + 1
-        return self.body.eval(extended_env)
+        return self.body.tail_eval(extended_env)
 
 
 class Lambda(BuiltIn):
@@ -410,23 +794,146 @@ class Lambda(BuiltIn):
         return Closure(env, self)
 
 
+_promise_lock = threading.Lock()
+
+
 class Promise(Closure):
+    """
+    A delayed value, computed by the closure once only, even when forced on
+    several threads at once: the first to force it evaluates the closure, and
+    the others wait for (and share) its result.
+    """
 
     def __init__(self, closure):
         self.closure = closure
         self.realized = False
         self.result = None
+        self.lock = None
+
+    def __getstate__(self):
+        # Locks are not picklable, and are not needed once realized
+        state = self.__dict__.copy()
+        state.pop('lock', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = None
+
+    def forcing_lock(self):
+        """ The lock held while forcing, created when first forced """
+        lock = self.lock
+        if lock is None:
+            with _promise_lock:
+                if self.lock is None:
+                    # Re-entrant, so that a promise forcing itself fails as before,
+                    # rather than deadlocking
+                    self.lock = threading.RLock()
+                lock = self.lock
+        return lock
 
     def eval(self, env):
         return self
 
     def apply(self, env, caller):
         if not self.realized:
-            self.result = self.closure.apply(env, caller)
-            self.realized = True
+            with self.forcing_lock():
+                if not self.realized:
+                    self.result = self.closure.apply(env, caller)
+                    self.realize()
+
+        return self.result
+
+    def apply_tail(self, env, caller):
+        """ Forcing is never deferred, as the result must be cached """
+        return self.apply(env, caller)
+
+    def apply_values(self, env, caller, values):
+        if not self.realized:
+            with self.forcing_lock():
+                if not self.realized:
+                    self.result = trampoline(self.closure.apply_values(env, caller, values))
+                    self.realize()
 
         return self.result
 
+    def realize(self):
+        """ Once the result is cached, the closure (and its environment) is no longer needed """
+        self.realized = True
+        self.closure = None
+        self.lock = None
+
+    def force(self, env=None):
+        # Read once: another thread may realize the promise (dropping the closure) meanwhile
+        closure = self.closure
+        if env is None and closure is not None:
+            env = closure.env
+        return self.apply_values(env, None, [])
+
+
+class Cons(object):
+    """
+    A cons cell, pairing a head with a tail. The tail of a lazy sequence is
+    computed on demand by a thunk (a promise), which is dropped once forced
+    so that it - and the environment it closes over - can be reclaimed.
+    """
+
+    __slots__ = ('head', '_tail', 'thunk')
+
+    def __init__(self, head, tail=None, thunk=None):
+        self.head = head
+        self._tail = tail
+        self.thunk = thunk
+
+    @property
+    def realized(self):
+        return self.thunk is None
+
+    def tail(self, env=None):
+        # Read once: another thread may force the thunk (and drop it) meanwhile
+        thunk = self.thunk
+        if thunk is not None:
+            self._tail = thunk.force(env)
+            self.thunk = None
+        return self._tail
+
+    def __reduce__(self):
+        # The realized spine is written flat, as a list of its heads followed
+        # by the last cell's tail (or thunk), rather than a cell at a time:
+        # pickling nested cells recursively exhausts the stack on long lists
+        heads = [self.head]
+        cell = self
+        while cell.thunk is None and type(cell._tail) is Cons:
+            cell = cell._tail
+            heads.append(cell.head)
+        return _cons_spine, (heads, cell._tail, cell.thunk)
+
+
+def _cons_spine(heads, tail, thunk):
+    """ Rebuilds the cons cells written by Cons.__reduce__ """
+    cell = Cons(heads[-1], tail, thunk)
+    for head in reversed(heads[:-1]):
+        cell = Cons(head, cell)
+    return cell
+
+
+def cons(head, tail):
+    """ Delayed tails are held as a thunk, until forced """
+    if isinstance(tail, Promise):
+        if not tail.realized:
+            return Cons(head, thunk=tail)
+        tail = tail.result
+    return Cons(head, tail)
+
+
+def is_pair(value):
+    return type(value) is Cons
+
+
+def uncons(cell, env):
+    """ The head and (forced) tail of a cons cell """
+    return cell.head, cell.tail(env)
+
 
 class Delay(BuiltIn):
     """
@@ -451,10 +958,13 @@ class If(BuiltIn):
         self.else_expr = else_expr
 
     def eval(self, env):
+        return trampoline(self.tail_eval(env))
+
+    def tail_eval(self, env):
         if self.test_expr.eval(env):
-            return self.then_expr.eval(env)
+            return self.then_expr.tail_eval(env)
         else:
-            return self.else_expr.eval(env)
+            return self.else_expr.tail_eval(env)
 
 
 class Unbound(BuiltIn):
@@ -494,7 +1004,8 @@ class Define(BuiltIn):
 
     def set_docstring_on(self, obj):
         params = ''
-        if isinstance(obj, Closure) and obj.func.formals:
+        # A promise is a closure without a lambda of its own
+        if isinstance(obj, Closure) and not isinstance(obj, Promise) and obj.func.formals:
             params = ' ' + str(obj.func.formals).replace(',',
                                                          '').replace('\'', '')
 
@@ -508,6 +1019,13 @@ class Define(BuiltIn):
         if isinstance(obj, Closure):
             for attr in ['__source__', '__location__']:
                 setattr(obj, attr, getattr(self.name(), attr, None))
+            # The name it was first defined with, as reported by the profiler
+            if not hasattr(obj, '__name__'):
+                obj.__name__ = self.name().name
+            # Its body is named too, as the sampler finds the body being run
+            body = getattr(getattr(obj, 'func', None), 'body', None)
+            if isinstance(body, Body) and not hasattr(body, '__name__'):
+                body.__name__ = obj.__name__
 
     def eval(self, env):
         symbol = self.name()
@@ -533,6 +1051,48 @@ class Define(BuiltIn):
         return symbol
 
 
+class Profile(BuiltIn):
+    """
+    Evaluates the expression under the profiler, then prints a report of the
+    functions applied. Lazy lists in the value are not realized, so the work
+    to realize them later is not profiled.
+    """
+
+    def __init__(self, expr):
+        self.expr = expr
+
+    def eval(self, env):
+        from .profiler import Profiler
+
+        with Profiler() as profiler:
+            value = self.expr.eval(env)
+        profiler.report()
+        return value
+
+
+class Binding(BuiltIn):
+    """
+    Binds dynamic variables (such as *print-length*) on the current thread
+    only, while the body is evaluated: the global definitions, and the
+    bindings of other threads, are unaffected. Lazy lists in the value are
+    not realized, so are realized later under the bindings then in effect.
+    """
+
+    def __init__(self, bindings, *body):
+        self.bindings = bindings
+        self.body = Body(*body)
+
+    def eval(self, env):
+        values = {}
+        for symbol, expr in self.bindings:
+            if symbol.name not in GlobalFrame.dynamic:
+                raise EvaluationError(self, '\'{0}\' is not a dynamic variable', symbol.name)
+            values[symbol.name] = expr.eval(env)
+
+        with binding(values):
+            return self.body.eval(env)
+
+
 class Set_PLING(BuiltIn):
     """ Updates a local binding """
 
@@ -560,26 +1120,43 @@ class Realize(Primitive):
         self.value = value
 
     def eval(self, env):
-        if type(self.value) == tuple:
-            arr = []
-            current_head = self.value
-            while current_head is not None:
-                value = List(Symbol('first'), Atom(current_head)).eval(env)
-                arr.append(Realize(value).eval(env))
-                current_head = List(
-                    Symbol('rest'), Atom(current_head)).eval(env)
-            return arr
-        elif isinstance(self.value, Primitive):
-            return self.value.eval(env)
-        else:
-            return self.value
+        return realize(self.value, env)
+
+
+def realize(value, env):
+    """
+    Walks the cons cells directly, forcing any delayed tails, rather than
+    evaluating first/rest calls for each element. Nested lists are tracked
+    on an explicit stack. The tail of an improper list, such as (cons 1 2),
+    is kept as its last element.
+    """
+    if not is_pair(value):
+        return value
+
+    result = []
+    stack = [(value, result)]
+    while stack:
+        cell, arr = stack.pop()
+        while cell is not None:
+            if not is_pair(cell):
+                arr.append(cell)
+                break
+            head, cell = uncons(cell, env)
+            if is_pair(head):
+                # Resume this list once the nested one is realized
+                nested = []
+                arr.append(nested)
+                stack.append((cell, arr))
+                cell, arr = head, nested
+            else:
+                arr.append(head)
+    return result
 
 
 class Repr(Primitive):
     """
     A string representation of atoms/lists, implemented with iteration so as
-    not to blow Python's stack. Note nested lists are (presently) handled
-    with recursion - this may change to an explicit stack.
+    not to blow Python's stack: nested lists are tracked on an explicit stack.
 
     List traversal will not extend beyond the *print-length* (if not nil).
     """
@@ -591,33 +1168,62 @@ class Repr(Primitive):
         if '*print-length*' in env:
             return env['*print-length*']
 
-    # TODO: make this and Realize into one implementation
     def eval(self, env):
-        if type(self.value) == tuple:
-            current_head = self.value
-            max_iterations = self.print_length(env)
-            ret = '('
-            while current_head and (max_iterations is None or max_iterations > 0):
-                value = List(Symbol('first'), Atom(current_head)).eval(env)
-                ret += Repr(value).eval(env)
-                current_head = List(
-                    Symbol('rest'), Atom(current_head)).eval(env)
-                if max_iterations is not None:
-                    max_iterations -= 1
-                if current_head is not None:
-                    ret += ' '
-
-            if current_head is not None and max_iterations == 0:
-                ret += '...'
-
-            ret += ')'
-            return ret
-        elif isinstance(self.value, Primitive):
-            return self.value.eval(env)
-        elif isinstance(self.value, str):
-            return self.value
+        if not is_pair(self.value):
+            return repr_atom(self.value, env)
+
+        out = io.StringIO()
+        write_repr(self.value, out, env, self.print_length(env))
+        return out.getvalue()
+
+
+def repr_atom(value, env):
+    if isinstance(value, Symbol):
+        return value.name
+    elif isinstance(value, Primitive):
+        return value.eval(env)
+    elif isinstance(value, str):
+        return value
+    else:
+        return repr(value)
+
+
+def write_repr(value, out, env, print_length=None):
+    """
+    Writes the string representation of the value to the out stream, walking
+    the cons cells directly and forcing any delayed tails. Each list is
+    curtailed after print_length elements (if not None).
+    """
+    if not is_pair(value):
+        out.write(str(repr_atom(value, env)))
+        return
+
+    out.write('(')
+    # For each list being written: the next cell, the number of elements
+    # which may yet be written, and whether it is the first element
+    stack = [(value, print_length, True)]
+    while stack:
+        cell, remaining, first = stack.pop()
+        if cell is None:
+            out.write(')')
+            continue
+        if not is_pair(cell):
+            # An improper list, such as (cons 1 2)
+            out.write(' . {0})'.format(repr_atom(cell, env)))
+            continue
+        if not first:
+            out.write(' ')
+        if remaining == 0:
+            out.write('...)')
+            continue
+
+        head, tail = uncons(cell, env)
+        stack.append((tail, None if remaining is None else remaining - 1, False))
+        if is_pair(head):
+            out.write('(')
+            stack.append((head, print_length, True))
         else:
-            return repr(self.value)
+            out.write(str(repr_atom(head, env)))
 
 
 class Eval(BuiltIn):
@@ -642,5 +1248,7 @@ __special_forms__ = {
     'letrec': LetRec,
     'set!': Set_PLING,
     'delay': Delay,
-    'eval': Eval
+    'eval': Eval,
+    'profile': Profile,
+    'binding': Binding
 }
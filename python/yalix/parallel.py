@@ -0,0 +1,289 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Parallel versions of map, filter and fold (pmap, pfilter and preduce), which
+split a (finite) sequence into chunks, and apply the function to each chunk
+on a pool of worker processes, reassembling the results in order.
+
+The pool is forked from the current process, so each worker holds a copy of
+the core global frame of the environment they were called in (its bottom
+layer, shared by any overlays of it) as it was at the time. The function and
+chunks are sent to the workers (and the results sent back) in the format of
+yalix.serialize, with the globals the workers hold referred to by name; any
+definitions the function (or an element) refers to which they do not hold -
+those made in an overlay, or made since the fork - are sent along with them.
+So one pool serves every overlay of an environment, such as the requests of
+yalix.server, and is only forked afresh for another core environment.
+A function (or element, or result) which cannot be serialized is applied in
+this process instead, as is everything when processes cannot be forked.
+
+The functions may be called from several threads at once: a pool is only
+closed (on being replaced, or by shutdown) once no call is using it.
+
+The functions should be pure: any side-effects happen in the workers. The
+number of workers is that of the CPUs, or else is given by the
+YALIX_PARALLEL_WORKERS environment variable.
+"""
+
+import atexit
+import functools
+import multiprocessing
+import os
+import pickle
+import threading
+
+from .environment import Env, GlobalFrame
+from .exceptions import EvaluationError
+from .interpreter import Closure, Lambda, List, Promise, Symbol, make_list, uncons
+from .serialize import dumps, loads, referenced_names
+from .vm import call
+
+WORKERS_VARIABLE = 'YALIX_PARALLEL_WORKERS'
+
+# Chunks per worker: more balance the load better, fewer cost less to send
+CHUNKS_PER_WORKER = 4
+
+# Values too deeply nested to pickle (such as a reversed list, each of whose
+# delayed tails closes over the next cell) are unserializable too
+_UNSERIALIZABLE = (pickle.PicklingError, TypeError, AttributeError, RecursionError)
+_MISSING = object()
+
+# Guards the replacement of the pool, and the count of its users
+_lock = threading.Lock()
+_pool = None
+# In a worker, the environment of the frame forked with
+_env = None
+_in_worker = False
+
+
+def _frames(env):
+    """ The chain of global frames that the environment looks up globals in, innermost first """
+    frames = []
+    frame = env.global_frame
+    while frame is not None:
+        frames.append(frame)
+        frame = getattr(frame, 'parent', None)
+    return frames
+
+
+class _Pool(object):
+    """ Worker processes forked with a core global frame """
+
+    def __init__(self, frame, workers):
+        self.frame = frame
+        # The definitions as forked, which the workers hold
+        self.forked = GlobalFrame()
+        dict.update(self.forked, frame)
+        self.workers = workers
+        self.users = 0
+        self.retired = False
+        self.pool = None
+
+    def start(self):
+        self.pool = multiprocessing.get_context('fork').Pool(
+            self.workers, initializer=_init_worker, initargs=(Env(global_frame=self.frame),))
+
+    def serves(self, env):
+        """ Whether the workers hold the core global frame of the environment """
+        return _frames(env)[-1] is self.frame
+
+    def close(self):
+        self.pool.terminate()
+        self.pool.join()
+
+
+def _workers():
+    return int(os.environ.get(WORKERS_VARIABLE) or os.cpu_count() or 1)
+
+
+def _acquire(env):
+    """
+    A pool whose workers hold the environment's core global frame, in use by
+    the caller until released; or None if one cannot be forked
+    """
+    global _pool
+    with _lock:
+        if _pool is None or not _pool.serves(env):
+            _retire()
+            try:
+                pool = _Pool(_frames(env)[-1], _workers())
+                pool.start()
+            except (ValueError, OSError):
+                return None
+            _pool = pool
+        _pool.users += 1
+        return _pool
+
+
+def _release(pool):
+    with _lock:
+        pool.users -= 1
+        if pool.retired and pool.users == 0:
+            pool.close()
+
+
+def _retire():
+    """ Replaces the pool: it is closed once no call is using it. The lock must be held """
+    global _pool
+    if _pool is not None:
+        _pool.retired = True
+        if _pool.users == 0:
+            _pool.close()
+        _pool = None
+
+
+def shutdown():
+    """ Stops the worker processes, if started, once no call is using them """
+    with _lock:
+        _retire()
+
+
+atexit.register(shutdown)
+
+
+def _init_worker(env):
+    global _env, _in_worker, _pool
+    _env = env
+    _in_worker = True
+    # The pool of the process forked from is not this process's to use
+    _pool = None
+
+
+def _global_names(values):
+    """ The names which the closures among the values (or those they close over) may look up as globals """
+    names = set()
+    seen = set()
+    stack = list(values)
+    while stack:
+        value = stack.pop()
+        if not isinstance(value, Closure) or id(value) in seen:
+            continue
+        seen.add(id(value))
+        if isinstance(value, Promise):
+            stack.append(value.closure)
+            continue
+        if isinstance(getattr(value, 'func', None), Lambda):
+            names |= referenced_names(value.func)
+        env = getattr(value, 'env', None)
+        frame = env.frame if isinstance(env, Env) else None
+        while frame is not None and id(frame) not in seen:
+            seen.add(id(frame))
+            stack.extend(frame.values)
+            frame = frame.parent
+    return names
+
+
+def _definitions(pool, env, values):
+    """
+    The definitions which the values refer to by name, directly or through
+    each other, that the workers do not hold: those made in an overlay of
+    the pool's frame, or made in it since the fork
+    """
+    frames = _frames(env)
+    definitions = {}
+    names = _global_names(values)
+    while names:
+        name = names.pop()
+        value = next((dict.__getitem__(frame, name) for frame in frames if dict.__contains__(frame, name)), _MISSING)
+        if value is _MISSING or value is dict.get(pool.forked, name, _MISSING):
+            continue
+        definitions[name] = value
+        names |= _global_names([value]) - definitions.keys()
+    return definitions
+
+
+def _apply(kind, func, values, env):
+    """ Applies the function to the values, as one chunk of a map, filter or reduce """
+    caller = List(Symbol(kind))
+    if kind == 'pmap':
+        return [call(func, env, caller, [value]) for value in values]
+    elif kind == 'pfilter':
+        return [value for value in values if call(func, env, caller, [value])]
+    else:
+        return functools.reduce(lambda acc, value: call(func, env, caller, [acc, value]), values)
+
+
+def _apply_chunk(kind, head, chunk):
+    """ Runs in a worker: the serialized result of a chunk, or the error which stopped it """
+    # The definitions sent are made in an overlay, private to the chunk
+    env = _env.overlay()
+    try:
+        definitions, func = loads(head, env)
+        for name, value in definitions.items():
+            env[name] = value
+        result = _apply(kind, func, loads(chunk, env), env)
+    except Exception as ex:
+        return 'error', '{0}: {1}'.format(type(ex).__name__, ex)
+    try:
+        return 'ok', dumps(result, env)
+    except _UNSERIALIZABLE:
+        return 'unserializable', None
+
+
+def _elements(xs):
+    """ The elements of a (finite) sequence, forcing any delayed tails """
+    values = []
+    while xs is not None:
+        head, xs = uncons(xs, None)
+        values.append(head)
+    return values
+
+
+def _parallel(kind, func, values, env):
+    """
+    The results of applying the function to each chunk of the values, in
+    order, or None if it cannot be applied in parallel
+    """
+    pool = None if _in_worker or len(values) < 2 else _acquire(env)
+    if pool is None:
+        return None
+    try:
+        return _run(pool, kind, func, values, env)
+    finally:
+        _release(pool)
+
+
+def _run(pool, kind, func, values, env):
+    # Written against the globals as forked, so only those are referred to by name
+    forked = Env(global_frame=pool.forked)
+    size = -(-len(values) // (pool.workers * CHUNKS_PER_WORKER))
+    try:
+        head = dumps((_definitions(pool, env, [func] + values), func), forked)
+        chunks = [dumps(values[i:i + size], forked) for i in range(0, len(values), size)]
+    except _UNSERIALIZABLE:
+        return None
+
+    results = []
+    for status, data in pool.pool.starmap(_apply_chunk, [(kind, head, chunk) for chunk in chunks]):
+        if status == 'error':
+            raise EvaluationError(None, 'Failed in parallel worker: {0}', data)
+        elif status == 'unserializable':
+            return None
+        results.append(loads(data, env))
+    return results
+
+
+def pmap(env, func, xs):
+    values = _elements(xs)
+    chunks = _parallel('pmap', func, values, env)
+    if chunks is None:
+        return make_list(_apply('pmap', func, values, env))
+    return make_list([value for chunk in chunks for value in chunk])
+
+
+def pfilter(env, pred, xs):
+    values = _elements(xs)
+    chunks = _parallel('pfilter', pred, values, env)
+    if chunks is None:
+        return make_list(_apply('pfilter', pred, values, env))
+    return make_list([value for chunk in chunks for value in chunk])
+
+
+def preduce(env, func, val, xs):
+    values = _elements(xs)
+    partials = _parallel('preduce', func, values, env)
+    if partials is None:
+        partials = values
+    # The partial results (of each chunk) are combined in order
+    return _apply('preduce', func, [val] + partials, env)
@@ -3,6 +3,8 @@
 
 """ Takes a stream of characters and produces an Abstract Syntax Tree"""
 
+import threading
+
 from pyparsing import ParserElement, Suppress, Regex, Optional, Keyword, Combine, WordStart, Word, \
     alphas, alphanums, dblQuotedString, Forward, ZeroOrMore
 from .interpreter import Atom, Symbol, Quote, SyntaxQuote, Unquote, UnquoteSplice, List
@@ -81,3 +83,25 @@ def scheme_parser(debug=False):
         var.setName(name)
 
     return ZeroOrMore(expr)
+
+
+_grammar = None
+_grammar_lock = threading.Lock()
+
+
+def read(text):
+    """
+    Reads all the forms in the text with the grammar, returning a list of ASTs.
+    The grammar is built once and shared; as parsing with it is not thread-safe
+    (the packrat cache is global), only one thread parses at a time
+    """
+    global _grammar
+    with _grammar_lock:
+        if _grammar is None:
+            _grammar = scheme_parser()
+        return _grammar.parseString(text, parseAll=True).asList()
+
+
+def read_stream(stream):
+    """ Reads all the forms from the stream (of lines) with the grammar """
+    return iter(read(''.join(stream)))
@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Profiling of Lisp-level functions, keyed by the name each was defined with and
+the location of its definition.
+
+The Profiler is deterministic: installed as the interpreter's tracer, it
+records every application of a function - call counts, inclusive and exclusive
+time, and the net number of memory blocks allocated - along with the time
+spent in each distinct call stack. The Sampler instead looks at what a thread
+is evaluating every so often, without tracing it, and counts the call stacks
+it finds. Both export their call stacks in the collapsed format read by flame
+graph tools (such as flamegraph.pl or speedscope): one line per stack, the
+frames separated by semicolons, followed by a weight.
+
+    with Profiler() as profiler:
+        ...
+    profiler.report()
+    profiler.write_collapsed('profile.folded')
+
+Only code run by the interpreter engine is profiled, and the Profiler only
+records the thread it is started on: other threads are evaluated as before.
+"""
+
+import collections
+import sys
+import threading
+import time
+
+from . import source_view
+from .interpreter import Body, EnvProcedure, List, NativeProcedure, TailCall, VariadicInterOp, \
+    clear_thread_tracer, set_thread_tracer, thread_tracer, trampoline, _traced_step
+from .tracing import Tracer, name
+
+
+class FunctionStats(object):
+    """ What was recorded of the applications of one function """
+
+    __slots__ = ('name', 'location', 'calls', 'inclusive', 'exclusive', 'allocations')
+
+    def __init__(self, name, location):
+        self.name = name
+        self.location = location
+        self.calls = 0
+        self.inclusive = 0.0
+        self.exclusive = 0.0
+        self.allocations = 0
+
+
+def function_key(func, caller):
+    """
+    The name and location (line:col, if known) of the function's definition.
+    Anonymous functions and natives take the name they were applied by
+    """
+    line, col = source_view.line_col(func)
+    location = '' if line is None else '{0}:{1}'.format(line, col)
+    return getattr(func, '__name__', None) or name(caller), location
+
+
+def write_collapsed(stacks, out):
+    """ Writes the call stacks (a mapping of stack to weight) in collapsed format """
+    for stack, weight in sorted(stacks.items()):
+        out.write('{0} {1}\n'.format(stack, int(round(weight))))
+
+
+_UNSET = object()
+
+
+class Profiler(Tracer):
+    """
+    Records every application of a function by the interpreter on the thread
+    it is started on, while started (or in a with block). Times are in
+    seconds; the call stacks are weighted by the time spent in (but not below)
+    them, in microseconds
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.functions = dict()
+        self.stacks = collections.Counter()
+        self._keys = dict()
+        self._active = collections.Counter()
+        self._frames = []
+        self._previous = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, type_, value, traceback):
+        self.stop()
+
+    def start(self):
+        # Any tracer of this thread's own is restored when stopped
+        self._previous = thread_tracer(_UNSET)
+        set_thread_tracer(self)
+
+    def stop(self):
+        if self._previous is _UNSET:
+            clear_thread_tracer()
+        else:
+            set_thread_tracer(self._previous)
+
+    def enter(self, depth, caller, func, args):
+        key = self._keys.get(func)
+        if key is None:
+            key = self._keys[func] = function_key(func, caller)
+
+        path = key[0] if not self._frames else self._frames[-1][1] + ';' + key[0]
+        self._active[key] += 1
+        # Each frame is the key, call stack, start time, time spent in
+        # callees and the number of memory blocks allocated on entry
+        self._frames.append([key, path, self.clock(), 0.0, sys.getallocatedblocks()])
+
+    def exit(self, depth, caller, func, value):
+        self._record()
+
+    def unwind(self, depth, caller, func):
+        self._record()
+
+    def _record(self):
+        key, path, start, callees, blocks = self._frames.pop()
+        elapsed = self.clock() - start
+
+        stats = self.functions.get(key)
+        if stats is None:
+            stats = self.functions[key] = FunctionStats(*key)
+        stats.calls += 1
+        stats.exclusive += elapsed - callees
+
+        # Inclusive measures are taken from the outermost of any recursive calls only
+        self._active[key] -= 1
+        if self._active[key] == 0:
+            stats.inclusive += elapsed
+            stats.allocations += sys.getallocatedblocks() - blocks
+
+        self.stacks[path] += (elapsed - callees) * 1e6
+        if self._frames:
+            self._frames[-1][3] += elapsed
+
+    def report(self, out=None, sort='exclusive', limit=20):
+        """ Writes a table of the functions, the most expensive (by the sort field) first """
+        out = out or sys.stdout
+        out.write('{0:>8s} {1:>14s} {2:>14s} {3:>12s}  {4}\n'.format(
+            'calls', 'inclusive (ms)', 'exclusive (ms)', 'allocations', 'function'))
+        functions = sorted(self.functions.values(), key=lambda stats: getattr(stats, sort), reverse=True)
+        for stats in functions[:limit]:
+            out.write('{0:8d} {1:14.3f} {2:14.3f} {3:12d}  {4}{5}\n'.format(
+                stats.calls, stats.inclusive * 1e3, stats.exclusive * 1e3, stats.allocations,
+                stats.name, ' (' + stats.location + ')' if stats.location else ''))
+
+    def write_collapsed(self, filename):
+        with open(filename, 'w', encoding='utf-8') as f:
+            write_collapsed(self.stacks, f)
+
+
+class Sampler(object):
+    """
+    Samples the call stack of a thread (by default, the one it is created
+    on) at an interval, while started (or in a with block), counting how often
+    each stack is seen (see lisp_stack)
+    """
+
+    def __init__(self, interval=0.001, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.stacks = collections.Counter()
+        self.samples = 0
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, type_, value, traceback):
+        self.stop()
+
+    def start(self):
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name='yalix-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        frame = sys._current_frames().get(self.thread_id)
+        stack = lisp_stack(frame)
+        self.samples += 1
+        if stack:
+            self.stacks[';'.join(stack)] += 1
+
+    def write_collapsed(self, filename):
+        with open(filename, 'w', encoding='utf-8') as f:
+            write_collapsed(self.stacks, f)
+
+
+_TRAMPOLINE_CODE = trampoline.__code__
+_NATIVE_CODES = (NativeProcedure.apply_values.__code__, VariadicInterOp.apply_values.__code__,
+                 EnvProcedure.apply_values.__code__)
+
+
+def running_body(call):
+    """ The body of the closure which the tail call (made by a trampoline) is running, if it is one """
+    if type(call) is not TailCall:
+        return None
+    if call.func is _traced_step:
+        call = call.args[1]
+    body = getattr(call.func, '__self__', None)
+    return body if isinstance(body, Body) else None
+
+
+def lisp_stack(frame):
+    """
+    The names of the functions being applied by the interpreter in the Python
+    stack, outermost first. Each trampoline contributes the closure whose body
+    it is running (a call in tail position having replaced its caller), by the
+    name it was defined with, or λ; natives appear while they are applied,
+    not while their arguments are evaluated
+    """
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        if code is _TRAMPOLINE_CODE:
+            body = running_body(frame.f_locals.get('result'))
+            if body is not None:
+                names.append(getattr(body, '__name__', 'λ'))
+        elif code in _NATIVE_CODES:
+            local_vars = frame.f_locals
+            caller = local_vars.get('caller')
+            if isinstance(caller, List) and caller.args:
+                names.append(name(caller))
+            else:
+                names.append(getattr(local_vars['self'].func, '__name__', '<native>'))
+        frame = frame.f_back
+    names.reverse()
+    return names
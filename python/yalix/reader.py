@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+A hand-written reader: a single regular expression tokenizes the text, and
+S-expressions are built up on an explicit stack, in one pass. It produces
+the same AST as the pyparsing grammar in yalix.parser - including the
+docstrings, and the source branding of each node - without the cost of
+building the grammar, or of memoizing every parse attempt.
+
+Streams are read a top-level form at a time, so that each may be evaluated
+before the rest has been read.
+"""
+
+import re
+
+from .exceptions import ReadError
+from .interpreter import Atom, Symbol, Quote, SyntaxQuote, Unquote, UnquoteSplice, List
+
+_PUNC = r"\-/_:*+=!?<>."
+_IDENT_CHARS = r"A-Za-z0-9_$"
+
+# The alternatives are tried in order at each position (as with the grammar,
+# the first to match wins, not the longest)
+_TOKEN = re.compile('|'.join([
+    r"(?P<whitespace>[ \t\r\n]+)",
+    r"(?P<comment>;(?!\^).*)",
+    r"(?P<docstring>;\^.*)",
+    r"(?P<real>[+-]?\d+\.\d*(?:[eE][+-]?\d+)?)",
+    r"(?P<hex>0x[0-9a-fA-F]+)",
+    r"(?P<integer>[+-]?\d+)L?",
+    r"(?P<boolean>(?<![{0}])#[tf](?![{0}]))".format(_IDENT_CHARS),
+    r'(?P<string>"(?:[^"\n\r\\]|""|\\(?:[^x]|x[0-9a-fA-F]+))*")',
+    r"(?P<symbol>(?<![A-Za-z{0}])[A-Za-z{0}][A-Za-z0-9{0}]*#*|(?<![{1}])λ(?![{1}]))".format(_PUNC, _IDENT_CHARS),
+    r"(?P<open>\()",
+    r"(?P<close>\))",
+    r"(?P<unquote_splice>~@)",
+    r"(?P<quote>')",
+    r"(?P<syntax_quote>`)",
+    r"(?P<unquote>~)"]))
+
+_ATOMS = {
+    'real': float,
+    'hex': lambda text: int(text, 0),
+    'integer': int,
+    'boolean': lambda text: text == '#t',
+    'string': lambda text: text[1:-1]
+}
+
+_READER_MACROS = {
+    'quote': Quote,
+    'syntax_quote': SyntaxQuote,
+    'unquote': Unquote,
+    'unquote_splice': UnquoteSplice
+}
+
+
+def _brand(obj, src, loc):
+    """ As the object was derived from some source, brand it so """
+    obj.__source__ = src
+    obj.__location__ = loc
+    return obj
+
+
+class Source(str):
+    """ Source text which starts part way into a stream, after line_offset lines """
+
+    def __new__(cls, text, line_offset=0):
+        source = str.__new__(cls, text)
+        source.line_offset = line_offset
+        return source
+
+
+def read(text):
+    """ Reads all the forms in the text, returning a list of ASTs """
+    return list(_forms(text))
+
+
+def read_form(text):
+    """
+    Reads the one form in the text (any further forms are read, but ignored).
+    A literal on its own, as data often is, is read directly
+    """
+    token = _TOKEN.match(text)
+    if token is not None and token.end() == len(text) and token.lastgroup in _ATOMS:
+        return _atom(token.lastgroup, token.group(token.lastgroup), text, 0)
+
+    forms = read(text)
+    if not forms:
+        raise ReadError('Expected a form', text, None)
+    return forms[0]
+
+
+def read_stream(stream):
+    """
+    Yields each top-level form as soon as it has been read from the stream
+    (a file object, or any iterable of lines). Only the lines of the form
+    currently being read are held in memory, and each form is branded with
+    just those lines as its source.
+    """
+    lines = []
+    line_offset = 0
+    depth = 0
+    awaiting_form = False
+
+    for line in stream:
+        lines.append(line)
+        depth, awaiting_form = _scan(line, depth, awaiting_form)
+        if depth <= 0 and not awaiting_form:
+            # The lines hold complete forms (or else an error, which will be raised)
+            for form in _forms(Source(''.join(lines), line_offset)):
+                yield form
+            line_offset += len(lines)
+            lines = []
+            depth = 0
+
+    if lines:
+        for form in _forms(Source(''.join(lines), line_offset)):
+            yield form
+
+
+def _scan(line, depth, awaiting_form):
+    """
+    Tracks the nesting depth of the forms across the line, and whether a reader
+    macro is still awaiting its form, without building them
+    """
+    pos = 0
+    end = len(line)
+    match = _TOKEN.match
+    while pos < end:
+        token = match(line, pos)
+        if token is None:
+            # Leave the error to be reported when the forms are read
+            return 0, False
+
+        kind = token.lastgroup
+        pos = token.end()
+        if kind == 'whitespace' or kind == 'comment':
+            continue
+        elif kind in _READER_MACROS:
+            awaiting_form = True
+            continue
+        elif kind == 'open':
+            depth += 1
+        elif kind == 'close':
+            depth -= 1
+        awaiting_form = False
+
+    return depth, awaiting_form
+
+
+def _atom(kind, text, src, loc):
+    if kind == 'symbol':
+        return _brand(Symbol(text), src, loc)
+    elif kind == 'docstring':
+        return text
+    return _brand(Atom(_ATOMS[kind](text)), src, loc)
+
+
+def _forms(text):
+    # Each entry is an open list or a reader macro awaiting its form, as a
+    # (node class, location, forms read) triple
+    stack = []
+    pos = 0
+    end = len(text)
+    match = _TOKEN.match
+
+    while pos < end:
+        token = match(text, pos)
+        if token is None:
+            raise ReadError("Unexpected character: '{0}'".format(text[pos]), text, pos)
+
+        kind = token.lastgroup
+        loc = pos
+        pos = token.end()
+
+        if kind == 'whitespace' or kind == 'comment':
+            continue
+        elif kind == 'open' or kind in _READER_MACROS:
+            stack.append((_READER_MACROS.get(kind, List), loc, []))
+            continue
+        elif kind != 'close':
+            form = _atom(kind, token.group(kind), text, loc)
+        elif stack and stack[-1][0] is List:
+            _, loc, forms = stack.pop()
+            form = _brand(List(*forms), text, loc)
+        else:
+            raise ReadError("Unexpected ')'", text, loc)
+
+        # Complete any reader macros awaiting this form
+        while stack and stack[-1][0] is not List:
+            cls, loc, _ = stack.pop()
+            form = _brand(cls(form), text, loc)
+
+        if stack:
+            stack[-1][2].append(form)
+        else:
+            yield form
+
+    if stack:
+        cls, loc, _ = stack[-1]
+        expected = "')'" if cls is List else 'a form'
+        raise ReadError('Expected {0} before end of input'.format(expected), text, loc)
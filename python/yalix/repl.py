@@ -2,19 +2,20 @@
 # -*- coding: utf-8 -*-
 
 import atexit
+import io
 import os
 import sys
 from datetime import datetime
 
 from pyparsing import ParseException
-from . import source_view
-from .exceptions import EvaluationError
+from .exceptions import EvaluationError, ReadError
 from .completer import Completer
+from .source_view import source_view
 from .interpreter import Repr
-from .parser import scheme_parser
 from .utils import log_progress, log, balance
 from .utils import red, green, blue, bold, highlight_syntax
-from .globals import create_initial_env
+from .globals import create_initial_env, __engines__, __readers__
+from .snapshot import restore
 
 
 def version():
@@ -170,10 +171,20 @@ def left_margin(text):
     return text.replace('\n', '\n\r        \r')
 
 
-def repl(inprompt=stdin_read, outprompt=stdout_prn):  # noqa: C901
+def initial_env(engine='interpreter', reader='reader', cache=True, snapshot=None):
+    """ The environment restored from the snapshot file if given, else a freshly bootstrapped one """
+    if snapshot is None:
+        return create_initial_env(engine, reader, cache)
+
+    with log_progress("Restoring snapshot: " + snapshot):
+        return restore(snapshot)
+
+
+def repl(inprompt=stdin_read, outprompt=stdout_prn, engine='interpreter', reader='reader', cache=True,  # noqa: C901
+         snapshot=None):
 
     try:
-        env = create_initial_env()
+        env = initial_env(engine, reader, cache, snapshot)
     except EvaluationError as ex:
         log("{0}: {1}", red(type(ex).__name__, style='bold'), ex)
         log(highlight_syntax(source_view(ex.primitive)))
@@ -187,13 +198,14 @@ def repl(inprompt=stdin_read, outprompt=stdout_prn):  # noqa: C901
     init_readline(env)
     ready()
 
-    parser = scheme_parser()
+    read = __readers__[reader]
+    prepare = __engines__[engine]
     count = 1
     while True:
         try:
             text = next(inprompt(count))
-            for ast in parser.parseString(text, parseAll=True).asList():
-                result = ast.eval(env)
+            for ast in read(io.StringIO(text)):
+                result = prepare(ast)(env)
                 # Evaluate lazy list representations
                 result = Repr(result).eval(env)
                 outprompt(result, count)
@@ -212,7 +224,7 @@ def repl(inprompt=stdin_read, outprompt=stdout_prn):  # noqa: C901
             log("{0}: {1}", red(type(ex).__name__, style='bold'), ex)
             log(highlight_syntax(source_view(ex.primitive)))
 
-        except ParseException as ex:
+        except (ParseException, ReadError) as ex:
             log("{0}: {1}", red(type(ex).__name__, style='bold'), ex)
 
         count += 1
@@ -0,0 +1,237 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+A resolver pass, run once over each top-level form produced by the parser
+before it is evaluated. Symbol references inside lambda, let, let* and letrec
+bodies are rewritten into lexical addresses (frame depth, slot), so that
+evaluating them walks a fixed number of frames rather than searching the
+environment by name. Free symbols are rewritten into global references, which
+skip the local frames and cache the value looked up from the global frame.
+"""
+
+from .interpreter import List, Symbol, LocalRef, GlobalRef, Lambda, Quote, SyntaxQuote, \
+    Unquote, UnquoteSplice
+
+
+class Scope(object):
+    """ The names bound by one frame, chained to the enclosing scope """
+
+    def __init__(self, names, parent=None):
+        self.names = names
+        self.parent = parent
+
+    def address(self, name):
+        """
+        Returns the (depth, slot) of the innermost binding of name, or
+        None if the name is not lexically bound
+        """
+        depth = 0
+        scope = self
+        while scope is not None:
+            if name in scope.names:
+                return depth, len(scope.names) - 1 - scope.names[::-1].index(name)
+            scope = scope.parent
+            depth += 1
+        return None
+
+
+def extend(scope, names):
+    """
+    An empty set of names does not introduce a frame at runtime (see
+    Env.extend_frame), so neither does it introduce a scope
+    """
+    return Scope(tuple(names), scope) if names else scope
+
+
+def resolve(ast, scope=None):
+    """
+    Returns a copy of the AST with local symbol references resolved; the
+    scope describes the frames the AST will be evaluated under, if any
+    """
+    return _resolve(ast, scope)
+
+
+def _brand_as(obj, original):
+    """ Carry the source branding across to the rewritten node """
+    for attr in ['__source__', '__location__']:
+        if hasattr(original, attr):
+            setattr(obj, attr, getattr(original, attr))
+    return obj
+
+
+def _is_symbol(obj):
+    return isinstance(obj, Symbol) and not isinstance(obj, (LocalRef, GlobalRef))
+
+
+def _resolve(ast, scope):
+    if _is_symbol(ast):
+        address = scope.address(ast.name) if scope else None
+        if address is None:
+            return _brand_as(GlobalRef(ast.name), ast)
+        return _brand_as(LocalRef(ast.name, *address), ast)
+
+    elif isinstance(ast, SyntaxQuote):
+        # The outermost syntax-quote binds a unique id in a frame of its own
+        if scope is None or scope.address(SyntaxQuote.ID) is None:
+            scope = extend(scope, [SyntaxQuote.ID])
+        return _brand_as(SyntaxQuote(_resolve_quoted(ast.expr, scope)), ast)
+
+    elif isinstance(ast, Quote):
+        return _brand_as(Quote(_resolve_quoted(ast.expr, scope)), ast)
+
+    elif isinstance(ast, Unquote) or isinstance(ast, UnquoteSplice):
+        return _brand_as(type(ast)(_resolve(ast.expr, scope)), ast)
+
+    elif isinstance(ast, List) and len(ast) > 0:
+        head = ast.funexp
+        if _is_symbol(head) and head.name in __special_forms__ and \
+                (scope is None or scope.address(head.name) is None):
+            args = __special_forms__[head.name](ast.params, scope)
+            if args is not None:
+                return _brand_as(List(head, *args), ast)
+            return ast
+
+        return _brand_as(List(*[_resolve(arg, scope) for arg in ast]), ast)
+
+    return ast
+
+
+def _resolve_quoted(ast, scope):
+    """
+    Quoted forms are not evaluated, except for any unquoted expressions
+    within them, which are evaluated in the enclosing scope
+    """
+    if isinstance(ast, Unquote) or isinstance(ast, UnquoteSplice):
+        return _brand_as(type(ast)(_resolve(ast.expr, scope)), ast)
+
+    elif isinstance(ast, List):
+        return _brand_as(List(*[_resolve_quoted(arg, scope) for arg in ast]), ast)
+
+    return ast
+
+
+def _resolve_all(exprs, scope):
+    return [_resolve(expr, scope) for expr in exprs]
+
+
+def _formal_names(formals):
+    if not isinstance(formals, List) or not all(_is_symbol(f) for f in formals):
+        return None
+    return [f.name for f in formals if f != Lambda.VARIADIC_MARKER]
+
+
+def _binding_pair(binding):
+    if isinstance(binding, List) and len(binding) == 2 and _is_symbol(binding[0]):
+        return binding[0], binding[1]
+    return None
+
+
+def _quote(params, scope):
+    return [_resolve_quoted(expr, scope) for expr in params]
+
+
+def _lambda(params, scope):
+    if not params:
+        return None
+    formals, body = params[0], params[1:]
+    names = _formal_names(formals)
+    if names is None:
+        return None
+    return [formals] + _resolve_all(body, extend(scope, names))
+
+
+def _define(params, scope):
+    if not params:
+        return None
+    first, rest = params[0], params[1:]
+    if isinstance(first, List):
+        # (define (name . formals) body...) sugar
+        names = _formal_names(List(*first.args[1:]))
+        if names is None:
+            return None
+        scope = extend(scope, names)
+
+    return [first] + [_resolve(expr, scope) for expr in rest]
+
+
+def _let(params, scope):
+    pair = _binding_pair(params[0]) if params else None
+    if pair is None:
+        return None
+    symbol, expr = pair
+    binding = _brand_as(List(symbol, _resolve(expr, scope)), params[0])
+    return [binding] + _resolve_all(params[1:], extend(scope, [symbol.name]))
+
+
+def _let_STAR(params, scope):
+    if not params or not isinstance(params[0], List):
+        return None
+
+    # Each binding is pushed into a frame of its own
+    bindings = []
+    for binding in params[0]:
+        pair = _binding_pair(binding)
+        if pair is None:
+            return None
+        symbol, expr = pair
+        bindings.append(_brand_as(List(symbol, _resolve(expr, scope)), binding))
+        scope = extend(scope, [symbol.name])
+
+    return [_brand_as(List(*bindings), params[0])] + _resolve_all(params[1:], scope)
+
+
+def _letrec(params, scope):
+    if not params or not isinstance(params[0], List):
+        return None
+
+    pairs = [_binding_pair(binding) for binding in params[0]]
+    if None in pairs:
+        return None
+
+    # All bindings share the one frame, and are visible to every expression
+    scope = extend(scope, [symbol.name for symbol, _ in pairs])
+    bindings = [_brand_as(List(symbol, _resolve(expr, scope)), binding)
+                for (symbol, expr), binding in zip(pairs, params[0])]
+
+    return [_brand_as(List(*bindings), params[0])] + _resolve_all(params[1:], scope)
+
+
+def _binding(params, scope):
+    if not params or not isinstance(params[0], List):
+        return None
+
+    # The names are dynamic variables, so only the values are resolved
+    pairs = [_binding_pair(binding) for binding in params[0]]
+    if None in pairs:
+        return None
+    bindings = [_brand_as(List(symbol, _resolve(expr, scope)), binding)
+                for (symbol, expr), binding in zip(pairs, params[0])]
+
+    return [_brand_as(List(*bindings), params[0])] + _resolve_all(params[1:], scope)
+
+
+def _set_PLING(params, scope):
+    return list(params[:1]) + _resolve_all(params[1:], scope)
+
+
+def _evaluated(params, scope):
+    return _resolve_all(params, scope)
+
+
+__special_forms__ = {
+    'quote': _quote,
+    'lambda': _lambda,
+    'λ': _lambda,
+    'define': _define,
+    'begin': _evaluated,
+    'if': _evaluated,
+    'let': _let,
+    'let*': _let_STAR,
+    'letrec': _letrec,
+    'set!': _set_PLING,
+    'delay': _evaluated,
+    'eval': _evaluated,
+    'profile': _evaluated,
+    'binding': _binding
+}
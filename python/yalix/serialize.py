@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+A serialization format for values (including closures and lazy sequences)
+and AST nodes, for shipping them to other processes or caching them on disk,
+and restoring them into an environment there.
+
+The format is a pickle of the value, with two kinds of reference to the
+environment it was serialized from, rather than copies of it:
+
+  * the global frame, which a closure (through its environment) looks up its
+    globals in, is written as a reference to "the global frame", and is
+    restored as that of the environment being restored into;
+
+  * a function (a closure, native procedure or special form) bound in the
+    global frame is written as its name, and is restored as whatever the
+    same name is bound to there.
+
+A closure captures only the local variables it refers to (by name, anywhere
+in its body): the frames it closes over are copied with every other value
+dropped, so that a closure created amid large local data does not carry it
+along. Lazy sequences are written as they are, the delayed tails as closures;
+the realized part of a list is written flat (see Cons.__reduce__), so long
+lists do not exhaust the stack.
+Anything else - such as a Python function bound other than by name in the
+global frame - must be picklable, or a PicklingError is raised.
+
+    data = dumps(value, env)
+    value = loads(data, other_env)
+"""
+
+import io
+import pickle
+import weakref
+
+from .environment import Env, Frame, GlobalFrame
+from .interpreter import Closure, NativeProcedure, Primitive, SpecialForm, Symbol
+
+# Paired with each serialized value: the persistent ids ('globals', and
+# ('global', name)) and the pruned closure state written by Pickler are what
+# Unpickler expects, so load refuses a value of a different FORMAT
+FORMAT = 1
+
+
+def _new(cls):
+    return cls.__new__(cls)
+
+
+_names_by_func = weakref.WeakKeyDictionary()
+
+
+def referenced_names(func):
+    """ The names of every symbol in the (lambda) AST, cached """
+    try:
+        return _names_by_func[func]
+    except (KeyError, TypeError):
+        pass
+
+    names = set()
+    seen = set()
+    stack = [func]
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        if isinstance(node, Symbol):
+            names.add(node.name)
+        if isinstance(node, (list, tuple)):
+            stack.extend(node)
+        elif isinstance(node, Primitive):
+            stack.extend(vars(node).values())
+
+    names = frozenset(names)
+    try:
+        _names_by_func[func] = names
+    except TypeError:
+        pass
+    return names
+
+
+class Pickler(pickle.Pickler):
+
+    def __init__(self, file, env):
+        super(Pickler, self).__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        # Only functions are written by name: the same number (say) may be
+        # bound to some name, but be quite unrelated to it
+        self.names = {id(value): name for name, value in env.items()
+                      if isinstance(value, (Closure, NativeProcedure, SpecialForm))}
+        self.global_frame = env.global_frame
+        self.frames = dict()
+
+    def persistent_id(self, obj):
+        if isinstance(obj, GlobalFrame):
+            return ('globals',)
+        name = self.names.get(id(obj))
+        if name is not None and self.global_frame.get(name) is obj:
+            return ('global', name)
+        return None
+
+    def reducer_override(self, obj):
+        env = getattr(obj, 'env', None)
+        if not isinstance(obj, Closure) or not isinstance(env, Env):
+            return NotImplemented
+
+        # Written as its state, so that closures referring to each other (as
+        # in a letrec) are only written once
+        state = dict(vars(obj))
+        state['env'] = Env(self.prune(env.frame, referenced_names(obj.func)), env.global_frame)
+        return _new, (type(obj),), state
+
+    def prune(self, frame, names):
+        """ A copy of the frames, holding only the values of the names """
+        if frame is None:
+            return None
+        key = (id(frame), names)
+        if key not in self.frames:
+            values = [value if name in names else None for name, value in zip(frame.names, frame.values)]
+            # The original is held too, so that its id is not reused
+            self.frames[key] = (frame, Frame(frame.names, values, self.prune(frame.parent, names)))
+        return self.frames[key][1]
+
+
+class Unpickler(pickle.Unpickler):
+
+    def __init__(self, file, env):
+        super(Unpickler, self).__init__(file)
+        self.env = env
+
+    def persistent_load(self, pid):
+        if pid == ('globals',):
+            return self.env.global_frame
+        try:
+            return self.env.global_frame[pid[1]]
+        except KeyError:
+            raise pickle.UnpicklingError('Unbound global: {0}'.format(pid[1]))
+
+
+def dump(value, env, file):
+    """ Writes the value to the (binary) file, with references into the environment """
+    Pickler(file, env).dump((FORMAT, value))
+
+
+def load(file, env):
+    """ Reads a value from the (binary) file, restoring its references into the environment """
+    version, value = Unpickler(file, env).load()
+    if version != FORMAT:
+        raise ValueError('Serialized with format {0}, expected {1}'.format(version, FORMAT))
+    return value
+
+
+def dumps(value, env):
+    out = io.BytesIO()
+    dump(value, env, out)
+    return out.getvalue()
+
+
+def loads(data, env):
+    return load(io.BytesIO(data), env)
@@ -0,0 +1,302 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+A long-running evaluation server, so that many short jobs share the cost of
+bootstrapping an environment. The environment is bootstrapped once, and a
+pool of worker processes forked from it; each request is evaluated by an idle
+worker in an overlay of that environment (see Env.overlay), so definitions
+made by one request are not visible to any other. A request that runs beyond
+its timeout has its worker killed, and a fresh one forked in its place.
+
+Clients connect over a Unix domain socket, or TCP on localhost, and send
+requests as JSON objects, one per line; a response is written for each, as a
+line of JSON, in the order they were sent:
+
+    {"source": "(map inc (range 3))"}
+    => {"values": ["(1 2 3)"], "output": "", "error": null, "elapsed": 0.0012}
+
+    {"file": "jobs/report.ylx", "timeout": 10}
+    => {"values": [...], "output": "...", "error": null, "elapsed": 1.52}
+
+    {"source": "(car 1)"}
+    => {"values": [], "output": "", "error": {"type": "EvaluationError", "message": "..."}, ...}
+
+    {"metrics": true}
+    => {"workers": 4, "busy": 1, "queued": 0, "requests": 3, "errors": 1, "timeouts": 0,
+        "latency_ms": {"mean": ..., "p50": ..., "p95": ..., "max": ...}}
+
+    python -m yalix.server --socket /tmp/yalix.sock --workers 4
+    python -m yalix.server --port 7000 --engine vm --timeout 30
+
+Workers are forked, so the server runs on Unix-like platforms only.
+"""
+
+import argparse
+import asyncio
+import collections
+import io
+import json
+import multiprocessing
+import signal
+import statistics
+import time
+import traceback
+
+from pyparsing import ParseException
+from .exceptions import EvaluationError, ReadError
+from .globals import __engines__, __readers__
+from .interpreter import Repr
+from .repl import initial_env
+from .utils import capture
+
+# The longest request line read, in bytes
+LIMIT = 2 ** 24
+
+
+def evaluate(env, request, engine='interpreter', reader='reader'):
+    """
+    Evaluates the source (or file) of the request in an overlay of the
+    environment, returning the printed values of its top-level forms, the
+    output written, and the error which stopped evaluation, if any
+    """
+    env = env.overlay()
+    prepare = __engines__[engine]
+    values, error = [], None
+    with capture() as out:
+        try:
+            if 'file' in request:
+                with open(request['file'], encoding='utf-8') as f:
+                    source = f.read()
+            else:
+                source = request.get('source', '')
+
+            for ast in __readers__[reader](io.StringIO(source)):
+                values.append(Repr(prepare(ast)(env)).eval(env))
+
+        except (EvaluationError, ParseException, ReadError, OSError) as ex:
+            error = {'type': type(ex).__name__, 'message': str(ex)}
+
+        except Exception as ex:
+            # Anything unexpected is reported too, rather than losing the worker
+            error = {'type': type(ex).__name__, 'message': str(ex), 'traceback': traceback.format_exc()}
+
+    return {'values': values, 'output': out[0], 'error': error}
+
+
+def check_timeout(timeout):
+    """ A request's timeout is a positive number of seconds, or null for none """
+    if timeout is None:
+        return
+    if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or not timeout > 0:
+        raise ValueError('timeout must be a positive number or null: {0!r}'.format(timeout))
+
+
+def failed(type_, message):
+    return {'values': [], 'output': '', 'error': {'type': type_, 'message': message}}
+
+
+def _serve(conn, env, engine, reader):
+    """ The worker process: evaluates each request received, sending back its response """
+    # Interrupts are for the server, which stops its workers itself
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            return
+        conn.send(evaluate(env, request, engine, reader))
+
+
+class Worker(object):
+    """ A forked process, evaluating one request at a time """
+
+    def __init__(self, context, env, engine, reader):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_serve, args=(child, env, engine, reader),
+                                       name='yalix-worker', daemon=True)
+        self.process.start()
+        child.close()
+
+    async def call(self, request, timeout):
+        """ The response to the request; raises asyncio.TimeoutError if there is none within the timeout """
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+        fileno = self.conn.fileno()
+        self.conn.send(request)
+        loop.add_reader(fileno, lambda: ready.done() or ready.set_result(None))
+        try:
+            await asyncio.wait_for(ready, timeout)
+        finally:
+            loop.remove_reader(fileno)
+        return self.conn.recv()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class Server(object):
+    """
+    Evaluates the requests of any number of concurrent clients on a pool of
+    worker processes, forked from a single bootstrapped environment
+    """
+
+    def __init__(self, workers=4, engine='interpreter', reader='reader', cache=True, snapshot=None,
+                 timeout=30.0, env=None):
+        self.engine = engine
+        self.reader = reader
+        self.timeout = timeout
+        self.env = env if env is not None else initial_env(engine, reader, cache, snapshot)
+        self.context = multiprocessing.get_context('fork')
+        self.workers = [self._fork() for _ in range(workers)]
+        self.idle = None
+        self.queued = 0
+        self.requests = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.latencies = collections.deque(maxlen=1000)
+        self._server = None
+
+    def _fork(self):
+        return Worker(self.context, self.env, self.engine, self.reader)
+
+    async def start(self, path=None, host='127.0.0.1', port=0):
+        """ Listens on the Unix domain socket at the path if given, else on the TCP host and port """
+        self.idle = asyncio.Queue()
+        for worker in self.workers:
+            self.idle.put_nowait(worker)
+
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self.handle, path=path, limit=LIMIT)
+        else:
+            self._server = await asyncio.start_server(self.handle, host=host, port=port, limit=LIMIT)
+        return self._server
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for worker in self.workers:
+            worker.kill()
+        self.workers = []
+
+    async def handle(self, reader, writer):
+        """ Serves a client connection, a request per line """
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError('expected a JSON object')
+                    check_timeout(request.get('timeout'))
+                except ValueError as ex:
+                    response = failed('ValueError', 'Malformed request: ' + str(ex))
+                else:
+                    response = self.metrics() if request.get('metrics') else await self.respond(request)
+                writer.write(json.dumps(response).encode('utf-8') + b'\n')
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def respond(self, request):
+        """ The response to the request, reporting any unexpected failure rather than dropping the client """
+        try:
+            return await self.submit(request)
+        except Exception as ex:
+            return failed(type(ex).__name__, str(ex))
+
+    async def submit(self, request):
+        """ Evaluates the request on the next idle worker """
+        start = time.perf_counter()
+        self.queued += 1
+        try:
+            worker = await self.idle.get()
+        finally:
+            self.queued -= 1
+
+        timeout = request.get('timeout', self.timeout)
+        try:
+            response = await worker.call(request, timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            worker = self._replace(worker)
+            response = failed('TimeoutError', 'Evaluation exceeded {0}s'.format(timeout))
+        except (EOFError, OSError):
+            worker = self._replace(worker)
+            response = failed('WorkerError', 'The worker exited during evaluation')
+        except BaseException:
+            # Cancelled, or failed unexpectedly: the worker may still owe a
+            # response, which it would otherwise send to the next request
+            worker = self._replace(worker)
+            raise
+        finally:
+            self.idle.put_nowait(worker)
+
+        elapsed = time.perf_counter() - start
+        self.requests += 1
+        self.errors += response['error'] is not None
+        self.latencies.append(elapsed)
+        response['elapsed'] = elapsed
+        return response
+
+    def _replace(self, worker):
+        worker.kill()
+        replacement = self._fork()
+        self.workers[self.workers.index(worker)] = replacement
+        return replacement
+
+    def metrics(self):
+        """ The size and load of the pool, and the latency (from receipt) of recent requests """
+        latencies = sorted(self.latencies)
+        if latencies:
+            latency = {'mean': statistics.fmean(latencies) * 1e3,
+                       'p50': latencies[len(latencies) // 2] * 1e3,
+                       'p95': latencies[int(len(latencies) * 0.95)] * 1e3,
+                       'max': latencies[-1] * 1e3}
+        else:
+            latency = None
+        return {'workers': len(self.workers),
+                'busy': len(self.workers) - self.idle.qsize(),
+                'queued': self.queued,
+                'requests': self.requests,
+                'errors': self.errors,
+                'timeouts': self.timeouts,
+                'latency_ms': latency}
+
+
+async def serve(server, path=None, host='127.0.0.1', port=0):
+    listener = await server.start(path, host, port)
+    try:
+        await listener.serve_forever()
+    finally:
+        await server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m yalix.server', description=__doc__.strip().split('\n\n')[0])
+    parser.add_argument('--socket', metavar='PATH', help='listen on a Unix domain socket')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=7000)
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--timeout', type=float, default=30.0, help='the default per-request timeout, in seconds')
+    parser.add_argument('--engine', choices=list(__engines__), default='interpreter')
+    parser.add_argument('--reader', choices=list(__readers__), default='reader')
+    parser.add_argument('--no-cache', dest='cache', action='store_false',
+                        help='read the core libraries afresh, rather than from their cache')
+    parser.add_argument('--snapshot', metavar='FILE', help='restore the environment from a snapshot')
+    args = parser.parse_args(argv)
+
+    server = Server(args.workers, args.engine, args.reader, args.cache, args.snapshot, args.timeout)
+    try:
+        asyncio.run(serve(server, args.socket, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
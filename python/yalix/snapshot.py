@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Snapshots of a bootstrapped environment: the global frame, with everything
+reachable from it (closures and their environments, promises, docstrings and
+source references), pickled to a file so that it can be restored in one load
+rather than by evaluating the core libraries again.
+
+The Python functions bound by bootstrap_python_functions are mostly lambdas,
+which cannot be pickled: they are written by name instead, and bound to the
+functions of a freshly bootstrapped environment when the snapshot is restored.
+"""
+
+import pickle
+
+from .environment import Env
+from .globals import bootstrap_special_forms, bootstrap_python_functions
+from .interpreter import NativeProcedure
+
+# Written first in a snapshot file, ahead of the Env.counter and the global
+# frame: closures, frames and promises are pickled by their attributes, so
+# restore refuses a snapshot written with a different FORMAT
+FORMAT = 2
+
+
+def _natives():
+    """ A fresh set of the Python functions, by name """
+    env = Env()
+    bootstrap_special_forms(env)
+    bootstrap_python_functions(env)
+    return {name: value for name, value in env.items() if isinstance(value, NativeProcedure)}
+
+
+class _Pickler(pickle.Pickler):
+
+    def __init__(self, file, env):
+        super(_Pickler, self).__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        # Only the natives still bound under their original names are known
+        self.names = {id(env.global_frame[name]): name
+                      for name in _natives()
+                      if isinstance(env.global_frame.get(name), NativeProcedure)}
+
+    def persistent_id(self, obj):
+        if isinstance(obj, NativeProcedure):
+            return self.names.get(id(obj))
+        return None
+
+
+class _Unpickler(pickle.Unpickler):
+
+    def __init__(self, file):
+        super(_Unpickler, self).__init__(file)
+        self.natives = _natives()
+
+    def persistent_load(self, name):
+        try:
+            return self.natives[name]
+        except KeyError:
+            raise pickle.UnpicklingError('Unknown native function: {0}'.format(name))
+
+
+def snapshot(env, filename):
+    """
+    Writes the environment's global frame to the file. Python functions bound
+    other than by the bootstrap (such as with interop) must be picklable
+    """
+    with open(filename, 'wb') as f:
+        _Pickler(f, env).dump((FORMAT, Env.counter, Env(global_frame=env.global_frame)))
+
+
+def restore(filename):
+    """ Returns a new environment, with the global frame read from the snapshot file """
+    with open(filename, 'rb') as f:
+        version, counter, env = _Unpickler(f).load()
+
+    if version != FORMAT:
+        raise ValueError('Snapshot {0} has format {1}, expected {2}'.format(filename, version, FORMAT))
+
+    # Symbols generated after the restore must not collide with those in the snapshot
+    with Env.lock:
+        Env.counter = max(Env.counter, counter)
+    return env
@@ -19,8 +19,9 @@ def location(primitive):
 def line_col(primitive):
     loc = location(primitive)
     src = source(primitive)
-    if src and loc:
-        return lineno(loc, src), col(loc, src)
+    if src and loc is not None:
+        # Source streamed in chunks records the lines preceding it
+        return lineno(loc, src) + getattr(src, 'line_offset', 0), col(loc, src)
     else:
         return None, None
 
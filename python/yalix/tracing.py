@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tracing of function applications. While a tracer is installed, the interpreter
+reports each application of a function to it: on entry, with the evaluated
+arguments, and on exit, with the value returned. While none is installed (as
+is usual), applications are evaluated without any check for one.
+
+Tracing is switched on and off by defining *debug* in a global frame, which
+installs (or removes) a PrintTracer for evaluation under that frame only (and
+overlays of it), or for every environment with set_tracer directly. Binding
+*debug* (see binding) switches tracing on or off for the current thread only.
+Calls in tail position are still eliminated while tracing, but the exits of
+the applications they replace are only reported once the iteration returns.
+"""
+
+from .environment import ROOT, GlobalFrame
+from .interpreter import Closure, NativeProcedure, Promise, Symbol, Cons, set_frame_tracer, set_thread_tracer, \
+    clear_thread_tracer
+from .utils import debug
+
+
+class Tracer(object):
+    """ Receives the applications traced by the interpreter; override as needed """
+
+    def enter(self, depth, caller, func, args):
+        """ The function (applied by the caller form) is about to be applied to the args """
+        pass
+
+    def exit(self, depth, caller, func, value):
+        """ The function (applied by the caller form) returned the value """
+        pass
+
+    def unwind(self, depth, caller, func):
+        """ The function (applied by the caller form) raised an exception """
+        pass
+
+
+class PrintTracer(Tracer):
+    """ Logs each application and its value, indented by stack depth """
+
+    def enter(self, depth, caller, func, args):
+        debug('{0}-> ({1})', '  ' * depth, ' '.join([name(caller)] + [describe(arg) for arg in args]))
+
+    def exit(self, depth, caller, func, value):
+        debug('{0}<- {1}: {2}', '  ' * depth, name(caller), describe(value))
+
+
+def name(caller):
+    return str(getattr(caller.funexp, 'name', caller.funexp))
+
+
+def describe(value):
+    """ A short description of the value, which does not force lazy lists """
+    if value is None:
+        return 'nil'
+    elif isinstance(value, bool):
+        return '#t' if value else '#f'
+    elif isinstance(value, str):
+        return '"{0}"'.format(value)
+    elif isinstance(value, Symbol):
+        return value.name
+    elif isinstance(value, Cons):
+        return '({0} ...)'.format(describe(value.head))
+    elif isinstance(value, Promise):
+        return '<promise>'
+    elif isinstance(value, Closure):
+        return '<closure>'
+    elif isinstance(value, NativeProcedure):
+        return '<native>'
+    return repr(value)
+
+
+def debug_changed(frame, value):
+    """
+    Watches *debug*: tracing is on while it is defined as a truth value, for
+    evaluation under the frame it is defined in, or while it is bound as one,
+    for the thread it is bound on
+    """
+    if frame is not None:
+        set_frame_tracer(frame, PrintTracer() if value else None)
+    elif value is ROOT:
+        clear_thread_tracer()
+    else:
+        set_thread_tracer(PrintTracer() if value else None)
+
+
+def watch_debug():
+    GlobalFrame.watch('*debug*', debug_changed)
@@ -0,0 +1,505 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+A bytecode compiler and stack virtual machine: an alternative execution engine
+which compiles each form into a flat array of instructions, then executes them
+in a single dispatch loop with an explicit value stack. Calls between VM
+functions push a frame onto an explicit call stack rather than recursing in
+Python, so deep (non-tail) recursion does not consume the Python stack.
+
+Compiled code (a Bytecode object) holds only instructions, constants and AST
+nodes, and so can be pickled; VM closures share environments and runtime
+objects with the other engines, so each may call the other.
+"""
+
+from .exceptions import EvaluationError
+from .interpreter import Closure, Define, Lambda, List, Promise, SpecialForm, \
+    Symbol, Atom, GlobalRef, LocalRef, Unbound, TailCall, make_list, trampoline
+from .resolver import extend, resolve
+from .compiler import _formals
+
+# Opcodes
+CONST = 0           # value              push value
+LOCAL = 1           # (depth, slot)      push a local variable
+GLOBAL = 2          # (ref, ast)         push a global variable, through its GlobalRef cache
+OPERATOR = 3        # (ref, ast, skip)   as GLOBAL, but a special form is applied directly
+INTERPRET = 4       # node               push the node as evaluated by the interpreter
+POP = 5             # -                  discard the top of stack
+JUMP = 6            # target             continue from target
+JUMP_IF_FALSE = 7   # target             pop, and if falsy continue from target
+CALL = 8            # (count, ast)       pop args and function, push the result of the call
+TAIL_CALL = 9       # (count, ast)       as CALL, but return the result
+RETURN = 10         # -                  pop, and return the value to the caller
+CLOSURE = 11        # bytecode           push a closure over the current env
+PROMISE = 12        # bytecode           push a promise over the current env
+ENTER = 13          # names              pop values, binding them to names in a new frame
+ENTER_REC = 14      # names              bind names to nil in a new frame
+STORE = 15          # slot               pop into the slot of the current frame
+LEAVE = 16          # -                  drop the frame ENTERed, keeping the top of stack
+SET = 17            # (name, ast)        pop, and assign to a local variable
+DEFINE = 18         # (symbol, node)     pop, and define a global
+
+__opnames__ = ['CONST', 'LOCAL', 'GLOBAL', 'OPERATOR', 'INTERPRET', 'POP', 'JUMP',
+               'JUMP_IF_FALSE', 'CALL', 'TAIL_CALL', 'RETURN', 'CLOSURE', 'PROMISE',
+               'ENTER', 'ENTER_REC', 'STORE', 'LEAVE', 'SET', 'DEFINE']
+
+
+class Bytecode(object):
+    """
+    The compiled form of a lambda (or of a top-level form, which is treated
+    as a lambda of no arguments). Calling it with an environment runs it.
+    """
+
+    __slots__ = ('func', 'instructions', 'names', 'arity', 'variadic')
+
+    def __init__(self, func=None, names=(), arity=0, variadic=False):
+        self.func = func
+        self.instructions = []
+        self.names = names
+        self.arity = arity
+        self.variadic = variadic
+
+    def emit(self, op, arg=None):
+        self.instructions.append((op, arg))
+        return len(self.instructions) - 1
+
+    def patch(self, index, arg):
+        self.instructions[index] = (self.instructions[index][0], arg)
+
+    def __call__(self, env):
+        return run(self, env)
+
+
+class VMClosure(Closure):
+    """ What a lambda compiled to bytecode evaluates to """
+
+    def __init__(self, env, code):
+        self.env = env
+        self.func = code.func
+        self.code = code
+
+    def bind(self, env, caller, values):
+        """ Binds the (evaluated) values in a new frame over the closure's env """
+        code = self.code
+        supplied = len(values)
+        if supplied != code.arity and not (code.variadic and supplied > code.arity):
+            Closure.check_arity(self, caller, supplied)
+
+        if code.variadic:
+            values = list(values[:code.arity]) + [make_list(values[code.arity:])]
+
+        extended_env = self.env.extend_frame(code.names, values)
+        extended_env.stack_depth = env.stack_depth + 1
+        return extended_env
+
+    def apply_tail(self, env, caller):
+        return self.apply_values(env, caller, [param.eval(env) for param in caller.params])
+
+    def apply_values(self, env, caller, values):
+        return TailCall(run, self.code, self.bind(env, caller, values))
+
+
+def call(func, env, caller, values):
+    """ Calls a function from outside the VM (interop, or another engine) """
+    try:
+        apply_values = func.apply_values
+    except AttributeError:
+        raise EvaluationError(caller, 'Cannot invoke with: \'{0}\'', func)
+    return trampoline(apply_values(env, caller, values))
+
+
+def run(code, env):  # noqa: C901
+    stack = []
+    frames = []  # The callers' (instructions, pc, env, base)
+    instructions = code.instructions
+    pc = 0
+    base = 0
+
+    while True:
+        op, arg = instructions[pc]
+        pc += 1
+
+        if op == LOCAL:
+            depth, slot = arg
+            frame = env.frame
+            while depth:
+                frame = frame.parent
+                depth -= 1
+            stack.append(frame.values[slot])
+
+        elif op == GLOBAL:
+            try:
+                stack.append(arg[0].lookup(env))
+            except ValueError as ex:
+                raise EvaluationError(arg[1], str(ex))
+
+        elif op == CONST:
+            stack.append(arg)
+
+        elif op == CALL or op == TAIL_CALL:
+            count, caller = arg
+            split = len(stack) - count
+            values = stack[split:]
+            del stack[split:]
+            func = stack.pop()
+
+            if type(func) is VMClosure:
+                extended_env = func.bind(env, caller, values)
+                if op == CALL:
+                    frames.append((instructions, pc, env, base))
+                    base = len(stack)
+                else:
+                    del stack[base:]
+                instructions = func.code.instructions
+                pc = 0
+                env = extended_env
+                continue
+
+            value = call(func, env, caller, values)
+            if op == CALL:
+                stack.append(value)
+                continue
+
+            # Tail call out of the VM: return its value
+            del stack[base:]
+            if not frames:
+                return value
+            instructions, pc, env, base = frames.pop()
+            stack.append(value)
+
+        elif op == JUMP_IF_FALSE:
+            if not stack.pop():
+                pc = arg
+
+        elif op == JUMP:
+            pc = arg
+
+        elif op == RETURN:
+            value = stack.pop()
+            del stack[base:]
+            if not frames:
+                return value
+            instructions, pc, env, base = frames.pop()
+            stack.append(value)
+
+        elif op == OPERATOR:
+            ref, caller, skip = arg
+            try:
+                value = ref.lookup(env)
+            except ValueError as ex:
+                raise EvaluationError(caller.funexp, str(ex))
+            if isinstance(value, SpecialForm):
+                # Not known to be a special form until now: params stay unevaluated
+                stack.append(value.apply(env, caller))
+                pc = skip
+            else:
+                stack.append(value)
+
+        elif op == ENTER:
+            split = len(stack) - len(arg)
+            values = stack[split:]
+            del stack[split:]
+            stack.append(env)
+            extended_env = env.extend_frame(arg, values)
+            extended_env.stack_depth = env.stack_depth + 1
+            env = extended_env
+
+        elif op == LEAVE:
+            value = stack.pop()
+            env = stack.pop()
+            stack.append(value)
+
+        elif op == CLOSURE:
+            stack.append(VMClosure(env, arg))
+
+        elif op == PROMISE:
+            stack.append(Promise(VMClosure(env, arg)))
+
+        elif op == POP:
+            stack.pop()
+
+        elif op == ENTER_REC:
+            stack.append(env)
+            extended_env = env.extend_frame(arg, [None] * len(arg))
+            extended_env.stack_depth = env.stack_depth + 1
+            env = extended_env
+
+        elif op == STORE:
+            env.frame.values[arg] = stack.pop()
+
+        elif op == INTERPRET:
+            stack.append(arg.eval(env))
+
+        elif op == SET:
+            name, caller = arg
+            try:
+                env.set_local(name, stack.pop())
+            except ValueError as ex:
+                raise EvaluationError(caller, str(ex))
+            stack.append(None)
+
+        elif op == DEFINE:
+            symbol, node = arg
+            obj = stack.pop()
+            node.set_docstring_on(obj)
+            node.set_source_on(obj)
+            env[symbol.name] = obj
+            stack.append(symbol)
+
+        else:
+            raise ValueError('Unknown opcode: {0}'.format(op))
+
+
+def compile(ast):
+    """ Compiles the AST into Bytecode, which evaluates it when called with an environment """
+    code = Bytecode()
+    _emit(ast, None, True, code)
+    return code
+
+
+def disassemble(code, indent=''):
+    """ A human-readable listing of the instructions """
+    lines = []
+    for pc, (op, arg) in enumerate(code.instructions):
+        if isinstance(arg, Bytecode):
+            lines.append('{0}{1:4d} {2}'.format(indent, pc, __opnames__[op]))
+            lines.append(disassemble(arg, indent + '       '))
+        else:
+            arg = '' if arg is None else arg
+            lines.append('{0}{1:4d} {2:14s}{3}'.format(indent, pc, __opnames__[op], arg))
+    return '\n'.join(lines)
+
+
+def _emit(ast, scope, tail, code):
+    """
+    Appends the instructions to evaluate the AST. In tail position, the
+    instructions also return the value (or make a tail call)
+    """
+    if isinstance(ast, Symbol) and not isinstance(ast, LocalRef):
+        address = scope.address(ast.name) if scope else None
+        if address is None:
+            code.emit(GLOBAL, (GlobalRef(ast.name), ast))
+        else:
+            code.emit(LOCAL, address)
+
+    elif isinstance(ast, Atom):
+        code.emit(CONST, ast.value)
+
+    elif isinstance(ast, List) and len(ast) > 0:
+        head = ast.funexp
+        if isinstance(head, Symbol) and head.name in __special_forms__ and \
+                (scope is None or scope.address(head.name) is None):
+            if __special_forms__[head.name](ast, scope, tail, code):
+                return
+
+        _application(ast, scope, tail, code)
+        return
+
+    else:
+        # Quotes, unquotes and anything else is left to the interpreter
+        code.emit(INTERPRET, resolve(ast, scope))
+
+    if tail:
+        code.emit(RETURN)
+
+
+def _application(ast, scope, tail, code):
+    head = ast.funexp
+    skip = None
+    if isinstance(head, Symbol) and not isinstance(head, LocalRef) and \
+            (scope is None or scope.address(head.name) is None):
+        skip = code.emit(OPERATOR)
+    else:
+        _emit(head, scope, False, code)
+
+    for param in ast.params:
+        _emit(param, scope, False, code)
+    code.emit(TAIL_CALL if tail else CALL, (len(ast.params), ast))
+
+    if skip is not None:
+        # An applied special form resumes after the call, returning its value if in tail position
+        code.patch(skip, (GlobalRef(head.name), ast, len(code.instructions)))
+        if tail:
+            code.emit(RETURN)
+
+
+def _body(exprs, scope, tail, code):
+    if not exprs:
+        code.emit(CONST, None)
+        if tail:
+            code.emit(RETURN)
+        return
+
+    for expr in exprs[:-1]:
+        _emit(expr, scope, False, code)
+        code.emit(POP)
+    _emit(exprs[-1], scope, tail, code)
+
+
+def _code(formals, body, scope):
+    """ Compiles a lambda into Bytecode of its own, or None if the formals are invalid """
+    analysis = _formals(formals)
+    if analysis is None:
+        return None
+    names, arity, variadic = analysis
+    lambda_code = Bytecode(Lambda(formals, *body), names, arity, variadic)
+    _body(body, extend(scope, names), True, lambda_code)
+    return lambda_code
+
+
+def _lambda(ast, scope, tail, code):
+    if len(ast.params) < 1:
+        return False
+    lambda_code = _code(ast.params[0], ast.params[1:], scope)
+    if lambda_code is None:
+        # Invalid formals are reported by the interpreter, when evaluated
+        return False
+    code.emit(CLOSURE, lambda_code)
+    if tail:
+        code.emit(RETURN)
+    return True
+
+
+def _define(ast, scope, tail, code):
+    if not ast.params:
+        return False
+
+    node = Define(*ast.params)
+    body = node.body()
+    if isinstance(ast.params[0], List):
+        lambda_code = _code(List(*ast.params[0].args[1:]), body, scope)
+        if lambda_code is None:
+            return False
+        code.emit(CLOSURE, lambda_code)
+    elif len(body) > 1:
+        return False
+    elif len(body) == 0:
+        code.emit(CONST, Unbound())
+    else:
+        _emit(body[0], scope, False, code)
+
+    code.emit(DEFINE, (node.name(), node))
+    if tail:
+        code.emit(RETURN)
+    return True
+
+
+def _begin(ast, scope, tail, code):
+    _body(ast.params, scope, tail, code)
+    return True
+
+
+def _if(ast, scope, tail, code):
+    if len(ast.params) not in [2, 3]:
+        return False
+
+    else_expr = ast.params[2] if len(ast.params) == 3 else Atom(None)
+    _emit(ast.params[0], scope, False, code)
+    jump_to_else = code.emit(JUMP_IF_FALSE)
+    _emit(ast.params[1], scope, tail, code)
+    jump_to_end = None if tail else code.emit(JUMP)
+    code.patch(jump_to_else, len(code.instructions))
+    _emit(else_expr, scope, tail, code)
+    if jump_to_end is not None:
+        code.patch(jump_to_end, len(code.instructions))
+    return True
+
+
+def _binding(binding):
+    if isinstance(binding, List) and len(binding) == 2 and isinstance(binding[0], Symbol):
+        return binding[0].name, binding[1]
+    return None
+
+
+def _let(ast, scope, tail, code):
+    binding = _binding(ast.params[0]) if ast.params else None
+    if binding is None:
+        return False
+
+    name, expr = binding
+    _emit(expr, scope, False, code)
+    code.emit(ENTER, (name,))
+    _body(ast.params[1:], extend(scope, [name]), tail, code)
+    if not tail:
+        code.emit(LEAVE)
+    return True
+
+
+def _let_STAR(ast, scope, tail, code):
+    if not ast.params or not isinstance(ast.params[0], List):
+        return False
+
+    bindings = [_binding(binding) for binding in ast.params[0]]
+    if None in bindings:
+        return False
+
+    # Each binding is pushed into a frame of its own
+    for name, expr in bindings:
+        _emit(expr, scope, False, code)
+        code.emit(ENTER, (name,))
+        scope = extend(scope, [name])
+
+    _body(ast.params[1:], scope, tail, code)
+    if not tail:
+        for _ in bindings:
+            code.emit(LEAVE)
+    return True
+
+
+def _letrec(ast, scope, tail, code):
+    if not ast.params or not isinstance(ast.params[0], List):
+        return False
+
+    bindings = [_binding(binding) for binding in ast.params[0]]
+    if None in bindings:
+        return False
+
+    names = tuple(name for name, _ in bindings)
+    if len(names) != len(set(names)):
+        # Reported by the interpreter, when evaluated
+        return False
+
+    # All bindings share the one frame, and are visible to every expression
+    scope = extend(scope, names)
+    code.emit(ENTER_REC, names)
+    for slot, (_, expr) in enumerate(bindings):
+        _emit(expr, scope, False, code)
+        code.emit(STORE, slot)
+
+    _body(ast.params[1:], scope, tail, code)
+    if not tail:
+        code.emit(LEAVE)
+    return True
+
+
+def _set_PLING(ast, scope, tail, code):
+    if len(ast.params) != 2 or not isinstance(ast.params[0], Symbol):
+        return False
+
+    _emit(ast.params[1], scope, False, code)
+    code.emit(SET, (ast.params[0].name, ast))
+    if tail:
+        code.emit(RETURN)
+    return True
+
+
+def _delay(ast, scope, tail, code):
+    code.emit(PROMISE, _code(List(), ast.params, scope))
+    if tail:
+        code.emit(RETURN)
+    return True
+
+
+__special_forms__ = {
+    'lambda': _lambda,
+    'λ': _lambda,
+    'define': _define,
+    'begin': _begin,
+    'if': _if,
+    'let': _let,
+    'let*': _let_STAR,
+    'letrec': _letrec,
+    'set!': _set_PLING,
+    'delay': _delay,
+}